@@ -0,0 +1,93 @@
+import asyncio
+import threading
+
+import numpy as np
+import pytest
+
+from ttt.batching import MoveBatcher
+from ttt.board import Board
+from ttt.solver import solve
+
+@pytest.fixture
+def batcher():
+    batcher = MoveBatcher(max_batch=16, max_delay=0.05)
+    yield batcher
+    batcher.close()
+
+def test_submit_returns_best_move(batcher):
+    """Tests whether a single request is answered with the solver's move"""
+    board = Board()
+    for position, marker in zip([1, 4, 2, 5], "XOXO"):
+        board.place(position, marker)
+
+    assert batcher.submit(board).result(timeout=5) == 3
+    assert batcher(board) == solve(board)[1]
+
+def test_requests_are_batched(batcher):
+    """Tests whether concurrent requests from many games share batches and each game gets
+    the answer for its own board"""
+    boards = []
+    for first in range(1, 10):
+        board = Board()
+        board.place(first, "X")
+        boards.append(board)
+
+    results = [None] * len(boards)
+    def ask(i):
+        results[i] = batcher(boards[i])
+    threads = [threading.Thread(target=ask, args=(i,)) for i in range(len(boards))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [solve(board)[1] for board in boards]
+    assert batcher.batches < len(boards)
+    assert batcher.mean_batch_size > 1
+
+def test_request_from_asyncio(batcher):
+    """Tests the coroutine interface"""
+    async def main():
+        return await asyncio.gather(*(batcher.request(Board()) for i in range(8)))
+
+    moves = asyncio.run(main())
+    assert len(set(moves)) == 1 and 1 <= moves[0] <= 9
+
+def test_evaluation_errors_reach_callers():
+    """Tests whether an exception of the evaluator is passed to every request of the batch"""
+    def failing(grids):
+        raise RuntimeError("broken model")
+
+    batcher = MoveBatcher(failing, max_delay=0)
+    with pytest.raises(RuntimeError):
+        batcher.submit(Board()).result(timeout=5)
+    batcher.close()
+    with pytest.raises(RuntimeError):
+        batcher.submit(Board())
+
+def test_wrong_shape_is_rejected(batcher):
+    """Tests whether boards of another size are rejected without stopping the worker"""
+    with pytest.raises(ValueError):
+        batcher.submit(Board(size=15, k=5))
+    assert batcher.submit(Board()).result(timeout=5) in range(1, 10)
+
+def test_submit_racing_close():
+    """Tests whether every request accepted while the batcher closes is still answered"""
+    batcher = MoveBatcher(max_delay=0)
+    futures, rejected = [], []
+
+    def submit():
+        for _ in range(200):
+            try:
+                futures.append(batcher.submit(Board()))
+            except RuntimeError:
+                rejected.append(1)
+
+    threads = [threading.Thread(target=submit) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    batcher.close()
+    for thread in threads:
+        thread.join()
+    assert all(future.result(timeout=5) in range(1, 10) for future in futures)
+    assert len(futures) + len(rejected) == 800
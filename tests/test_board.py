@@ -66,6 +66,31 @@ def test_str(empty_board):
 
     assert str(empty_board) != f"<{module}.{name} object at {hex(id(empty_board))}>"
 
+def test_str_patches_moves(empty_board):
+    """Tests whether the cached string representation follows moves and grid replacements"""
+    str(empty_board)
+    empty_board.place(5, "X")
+    empty_board.place(1, "O")
+
+    assert str(empty_board) == " O |   |   \n-----------\n   | X |   \n-----------\n   |   |   "
+
+    empty_board.grid = np.array([["X", "", ""], ["", "", ""], ["", "", "O"]])
+    assert str(empty_board).splitlines()[0] == " X |   |   "
+    assert str(empty_board).splitlines()[4] == "   |   | O "
+
+def test_delta_roundtrip(empty_board):
+    """Tests whether a board can be kept in sync by applying deltas"""
+    copy = Board()
+    assert empty_board.delta() == ""
+
+    for position, marker in [(5, "X"), (1, "O"), (9, "X")]:
+        empty_board.place(position, marker)
+        copy.apply_delta(empty_board.delta())
+
+    assert empty_board.delta() == "X9"
+    assert np.all(copy.grid == empty_board.grid)
+    assert str(copy) == str(empty_board)
+
 def test_is_valid_in_range(empty_board):
     """Tests the is_valid method for invalid positions outside allowed range"""
 
@@ -236,3 +261,55 @@ def test_no_win(empty_board):
     empty_board.place(np.random.randint(1, 10), np.random.choice(["X", "O"]))
     assert not empty_board.check_win(), f"Win detected although there was no win\n{empty_board}"
     
+
+def test_large_board_k_in_a_row():
+    """Check whether k markers in a row win on a larger board, in every direction"""
+    for positions in ([13, 14, 15, 16], [3, 9, 15, 21], [1, 8, 15, 22], [4, 9, 14, 19]):
+        board = Board(size=6, k=4)
+        for position in positions[:-1]:
+            board.place(position, "X")
+            assert not board.check_win(), f"Win detected too early\n{board}"
+        board.place(positions[-1], "X")
+        win_detected(board)
+
+    board = Board(size=6, k=4)
+    for position in [1, 2, 3, 5]:
+        board.place(position, "O")
+    assert not board.check_win(), f"Win detected across a gap\n{board}"
+
+def test_large_board_positions():
+    """Check the position range and rendering of a larger board"""
+    board = Board(size=15, k=5)
+    board.is_valid(225)
+    with pytest.raises(ValueError):
+        board.is_valid(226)
+
+    board.place(225, "O")
+    assert str(board).splitlines()[-1].endswith("| O ")
+    assert len(board.empty_positions()) == 224
+
+def test_remove_restores_board(empty_board):
+    """Check whether remove takes back a move"""
+    empty_board.place(1, "X")
+    rendered = str(empty_board)
+    empty_board.place(5, "O")
+    empty_board.remove(5, last_move=1)
+
+    assert empty_board.last_move == 1
+    assert str(empty_board) == rendered
+    assert empty_board.empty_positions() == [2, 3, 4, 5, 6, 7, 8, 9]
+
+def test_dirty_cells_stay_bounded():
+    """Check whether searching moves without rendering doesn't pile up dirty cells"""
+    board = Board(size=9, k=5)
+    for _ in range(100):
+        board.place(41, "X")
+        board.remove(41)
+    assert len(board._dirty) == 0
+
+    str(board)
+    for _ in range(100):
+        board.place(41, "X")
+        board.remove(41)
+    assert board._dirty == {41}
+    assert str(board) == str(Board(size=9, k=5)) and not board._dirty
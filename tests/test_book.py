@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from ttt.board import Board
+from ttt.book import BOOK_DTYPE, OpeningBook, grid_symmetries
+from ttt.game import Game
+from ttt.player import AIPlayer
+from ttt.search import AlphaBetaSearch
+
+@pytest.fixture(scope="module")
+def book():
+    return OpeningBook.build(Board(size=7, k=4), plies=3, search=AlphaBetaSearch(max_depth=2))
+
+def test_symmetries():
+    """Tests whether square boards have 8 symmetries and cubes 48"""
+    assert BOOK_DTYPE.itemsize == 14
+    perms = grid_symmetries((3, 3))
+    assert len(perms) == 8
+    assert sorted(perms[:, 4]) == [4] * 8
+    assert len(grid_symmetries((4, 4, 4))) == 48
+    with pytest.raises(ValueError):
+        grid_symmetries((3, 4))
+
+def test_canonical_is_symmetric(book):
+    """Tests whether all rotations and reflections of a position get the same key"""
+    keys = set()
+    for perm in grid_symmetries((7, 7)):
+        board = Board(size=7, k=4)
+        board.grid = np.array(["X"] * 2 + [""] * 46 + ["O"])[perm].reshape(7, 7)
+        keys.add(book.canonical(board)[0])
+    assert len(keys) == 1
+
+def test_build_folds_symmetries(book):
+    """Tests whether the book holds one entry per symmetry class of the first three plies"""
+    # The empty board, the centre, and the centre with an O next to it or diagonally next to it
+    assert len(book) == 4
+    assert len(book.slots) >= 2 * len(book)
+
+def test_lookup_transforms_moves(book):
+    """Tests whether book moves are mapped back onto the orientation of the board"""
+    board = Board(size=7, k=4)
+    assert book.lookup(board)[0] == 25
+    board.place(25, "X")
+    # The replies to the 4 symmetric O moves must lead to symmetric positions again
+    keys = set()
+    for diagonal in (17, 19, 31, 33):
+        board.place(diagonal, "O")
+        move, score, depth = book.lookup(board)
+        board.place(move, "X")
+        keys.add(book.canonical(board)[0])
+        board.remove(move, diagonal)
+        board.remove(diagonal, 25)
+    assert len(keys) == 1
+    board.place(1, "O")
+    assert book.lookup(board) is None
+    assert book.lookup(Board(size=9, k=4)) is None
+
+def test_save_and_load(book, tmp_path):
+    """Tests whether a book can be read into memory or memory-mapped"""
+    path = str(tmp_path / "book.bin")
+    book.save(path)
+    for mmap in (False, True):
+        loaded = OpeningBook.load(path, mmap=mmap)
+        assert isinstance(loaded.slots, np.memmap) == mmap
+        assert (loaded.shape, loaded.k, len(loaded)) == ((7, 7), 4, 4)
+        assert loaded.lookup(Board(size=7, k=4)) == book.lookup(Board(size=7, k=4))
+
+def test_search_answers_from_book(book, tmp_path):
+    """Tests whether an AI player with a book plays the book move without searching"""
+    search = AlphaBetaSearch(max_depth=2, book=book)
+    game = Game(AIPlayer("bot", "X", search), "alice", str(tmp_path / "stats.json"), board=Board(size=7, k=4))
+    game.make_move()
+    assert game.board.grid.flat[24] == "X"
+    assert search.last_result.nodes == 0 and book.hits >= 1
@@ -0,0 +1,114 @@
+import os
+import time
+
+import numpy as np
+import pytest
+
+from ttt.checkpoint import CheckpointLog, pack_game, unpack_game
+from ttt.clock import GameClock
+from ttt.game import Game
+from ttt.player import AIPlayer
+from ttt.qubic import QubicBoard
+from ttt.solver import TablePolicy
+
+@pytest.fixture
+def log_path(tmp_path):
+    return str(tmp_path / "games.wal")
+
+def make_game(moves, tmp_path, **kwargs):
+    """Creates a game and plays the given moves"""
+    game = Game("alice", "bob", str(tmp_path / "stats.json"), **kwargs)
+    for position in moves:
+        game.play(position)
+    return game
+
+def test_pack_round_trip(tmp_path):
+    """Tests whether a packed game is restored with its board, last move and player to move"""
+    game = make_game([5, 1, 9], tmp_path, clock=GameClock(60, increment=1))
+    restored = unpack_game(pack_game(game))
+    assert np.array_equal(restored.board.grid, game.board.grid)
+    assert restored.board.last_move == 9
+    assert restored._current.name == "bob" and restored._current.marker == "O"
+    assert restored.clock.turn == 1 and restored.clock.remaining[0] == pytest.approx(62, abs=0.5)
+
+    restored.play(7)
+    assert restored.board.last_move == 7 and restored.clock.turn == 0
+
+def test_qubic_round_trip(tmp_path):
+    """Tests whether a game on a QubicBoard is restored with all 64 cells and the names"""
+    statsfile = str(tmp_path / "stats.json")
+    game = Game("alice", "bob", statsfile, board=QubicBoard())
+    for position in (1, 64, 2, 48, 3):
+        game.play(position)
+    restored = unpack_game(pack_game(game), statsfile)
+    assert isinstance(restored.board, QubicBoard)
+    assert np.array_equal(restored.board.grid, game.board.grid)
+    assert (restored.player1.name, restored.player2.name) == ("alice", "bob")
+    assert restored.board.bits == game.board.bits and restored.board.last_move == 3
+    with pytest.raises(TimeoutError, match="alice wins"):
+        restored.play(32)
+        restored.play(4)
+
+def test_restore_after_reopen(log_path, tmp_path):
+    """Tests whether only the latest snapshots of unfinished games are restored"""
+    with CheckpointLog(log_path) as log:
+        for game_id in range(10):
+            game = make_game([], tmp_path)
+            for position in (1, 2, 3)[:game_id % 3 + 1]:
+                game.play(position)
+                log.checkpoint(game_id, game)
+        log.end(4)
+
+    with CheckpointLog(log_path) as log:
+        games = log.restore()
+    assert sorted(games) == [0, 1, 2, 3, 5, 6, 7, 8, 9]
+    assert games[2].board.last_move == 3 and games[2]._current.marker == "O"
+
+def test_restore_keeps_ai_players(log_path, tmp_path):
+    """Tests whether given Player objects replace the restored names"""
+    bot = AIPlayer("bot", "O", TablePolicy())
+    game = Game("alice", bot, str(tmp_path / "stats.json"))
+    game.play(1)
+    with CheckpointLog(log_path) as log:
+        log.checkpoint(0, game)
+        restored = log.restore(players={"bot": bot})[0]
+    assert restored.player2 is bot
+
+def test_torn_record_is_dropped(log_path, tmp_path):
+    """Tests whether a record cut off by a crash is ignored and removed"""
+    with CheckpointLog(log_path) as log:
+        log.checkpoint(1, make_game([1], tmp_path))
+        log.checkpoint(2, make_game([5], tmp_path))
+    size = os.path.getsize(log_path)
+    os.truncate(log_path, size - 3)
+
+    with CheckpointLog(log_path) as log:
+        assert list(log.snapshots) == [1]
+        log.checkpoint(3, make_game([9], tmp_path))
+    with CheckpointLog(log_path) as log:
+        assert sorted(log.snapshots) == [1, 3]
+
+def test_compaction(log_path, tmp_path):
+    """Tests whether compaction shrinks the log without losing live games"""
+    with CheckpointLog(log_path, compact_ratio=4, min_records=16) as log:
+        game = make_game([], tmp_path)
+        for game_id in range(3):
+            log.checkpoint(game_id, game)
+        for i in range(20):
+            log.checkpoint(0, game)
+        assert log.records < 16
+    with CheckpointLog(log_path) as log:
+        assert sorted(log.snapshots) == [0, 1, 2]
+
+def test_restore_thousands_quickly(log_path, tmp_path):
+    """Tests whether 5000 games are restored in well under a second"""
+    with CheckpointLog(log_path) as log:
+        game = make_game([5, 1, 9, 3], tmp_path)
+        for game_id in range(5000):
+            log.checkpoint(game_id, game)
+
+    start = time.perf_counter()
+    with CheckpointLog(log_path) as log:
+        games = log.restore()
+    assert len(games) == 5000
+    assert time.perf_counter() - start < 1.0
@@ -0,0 +1,117 @@
+import json
+
+import pytest
+
+from ttt.clock import FlagWatcher, GameClock, TimerWheel
+from ttt.game import Game
+from ttt.stats import StatsStore
+
+class FakeTime:
+    """A time source that only moves when told to"""
+
+    def __init__(self, start=1000.0):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def fake_time():
+    return FakeTime()
+
+def test_clock_increment(fake_time):
+    """Tests whether a move uses the mover's time and adds the increment"""
+    clock = GameClock(10, increment=2, now=fake_time)
+    clock.start()
+    fake_time.now += 3
+    assert clock.time_left() == 7
+    clock.press()
+    assert clock.remaining[0] == 9 and clock.turn == 1
+    fake_time.now += 1
+    assert clock.time_left() == 9 and clock.time_left(0) == 9
+    assert clock.deadline() == fake_time.now + 9
+
+def test_clock_flag(fake_time):
+    """Tests whether a player without time left is flagged"""
+    clock = GameClock(5, now=fake_time)
+    assert not clock.flagged()
+    clock.start()
+    fake_time.now += 5
+    assert clock.flagged()
+
+    with pytest.raises(ValueError):
+        GameClock(0)
+
+def test_wheel_fires_in_order(fake_time):
+    """Tests whether timers fire once, not early, and in deadline order across levels"""
+    wheel = TimerWheel(resolution=0.01, slots=8, levels=3, now=fake_time)
+    fired = []
+    for delay in (5.0, 0.05, 0.3, 0.05, 40.0):
+        wheel.schedule(fake_time.now + delay, fired.append, delay)
+    assert len(wheel) == 5
+
+    assert wheel.advance(fake_time.now + 0.04) == 0
+    assert wheel.advance(fake_time.now + 0.06) == 2
+    assert wheel.advance(fake_time.now + 4.99) == 1
+    assert wheel.advance(fake_time.now + 5.0) == 1
+    assert wheel.advance(fake_time.now + 100) == 1
+    assert fired == [0.05, 0.05, 0.3, 5.0, 40.0]
+    assert len(wheel) == 0
+
+def test_wheel_cancel(fake_time):
+    """Tests whether cancelled timers don't fire"""
+    wheel = TimerWheel(now=fake_time)
+    fired = []
+    timer = wheel.schedule(fake_time.now + 1, fired.append, 1)
+    wheel.schedule(fake_time.now + 2, fired.append, 2)
+    assert wheel.cancel(timer) and not timer.active
+    assert not wheel.cancel(timer)
+    wheel.advance(fake_time.now + 3)
+    assert fired == [2]
+
+def test_game_forfeits_on_time(fake_time, tmp_path):
+    """Tests whether a move after the flag fell loses the game"""
+    game = Game("a", "b", str(tmp_path / "stats.json"), clock=GameClock(10, now=fake_time))
+    game.play(1)
+    fake_time.now += 11
+    with pytest.raises(TimeoutError, match="b ran out of time"):
+        game.play(2)
+
+def test_watcher_flags_many_games(fake_time, tmp_path):
+    """Tests whether the watcher ends exactly the games whose player ran out of time"""
+    flagged = []
+    watcher = FlagWatcher(TimerWheel(now=fake_time), on_flag=lambda game, e: flagged.append(game))
+    games = [Game(f"a{i}", f"b{i}", str(tmp_path / "stats.json"), clock=GameClock(10, increment=5, now=fake_time))
+             for i in range(100)]
+    for game in games:
+        watcher.watch(game)
+
+    fake_time.now += 8
+    for game in games[:50]:
+        game.play(1)  # The move reschedules the timer for the other player's deadline
+    fake_time.now += 5
+    watcher.advance()
+    assert flagged == games[50:]
+    assert len(watcher) == 50
+
+    fake_time.now += 6
+    watcher.advance()
+    assert flagged == games[50:] + games[:50]
+
+def test_flagged_game_is_finished(fake_time, tmp_path):
+    """Tests whether a move after the watcher flagged a game doesn't count the win again"""
+    statsfile = str(tmp_path / "stats.json")
+    ratings = StatsStore()
+    flagged = []
+    watcher = FlagWatcher(TimerWheel(now=fake_time), on_flag=lambda game, e: flagged.append(game))
+    game = Game("a", "b", statsfile, ratings=ratings, clock=GameClock(10, now=fake_time))
+    watcher.watch(game)
+
+    fake_time.now += 11
+    watcher.advance()
+    assert flagged == [game] and game.finished
+    with pytest.raises(TimeoutError, match="already over"):
+        game.play(1)
+    with open(statsfile) as f:
+        assert json.load(f) == {"b": 1}
+    assert ratings.get("b")["wins"] == 1
@@ -0,0 +1,69 @@
+import json
+
+import pytest
+
+from ttt.counters import NodeCounter, leaderboard, main, merge_counters, read_counters
+from ttt.game import Game
+
+@pytest.fixture
+def node_files(tmp_path):
+    """Fixture that writes the counters of two hosts"""
+    paths = [str(tmp_path / "a.jsonl"), str(tmp_path / "b.jsonl")]
+    a, b = NodeCounter(paths[0], "a"), NodeCounter(paths[1], "b")
+    for player in ["alice", "alice", "bob"]:
+        a.increment(player)
+    b.increment("alice")
+    b.increment("carol", 3)
+    a.close()
+    b.close()
+    return paths
+
+def test_counter_reloads_own_counts(node_files):
+    """Tests whether a node keeps counting from its file"""
+    counter = NodeCounter(node_files[0], "a")
+    assert counter.wins == {"alice": 2, "bob": 1}
+    counter.increment("bob")
+    counter.compact()
+    assert read_counters(node_files[0]) == {("a", "alice"): 2, ("a", "bob"): 2}
+
+    with pytest.raises(ValueError):
+        counter.increment("bob", 0)
+
+def test_merge_sums_nodes(node_files):
+    """Tests whether merging adds up the hosts"""
+    counters, totals = merge_counters(node_files)
+    assert totals == {"alice": 3, "bob": 1, "carol": 3}
+    assert leaderboard(totals, 2) == [("alice", 3), ("carol", 3)]
+
+def test_merge_is_idempotent(node_files, tmp_path):
+    """Tests whether merging a file twice, or with earlier merges, changes nothing"""
+    merged = str(tmp_path / "merged.jsonl")
+    main(node_files + ["--stats", str(tmp_path / "stats.json"), "--counters", merged])
+    assert merge_counters(node_files + node_files + [merged])[1] == merge_counters(node_files)[1]
+
+    with open(tmp_path / "stats.json") as f:
+        assert json.load(f) == {"alice": 3, "bob": 1, "carol": 3}
+
+def test_torn_line_is_ignored(node_files):
+    """Tests whether an incomplete last line is skipped"""
+    with open(node_files[1], "a") as f:
+        f.write('["b", "alice", 9')
+    assert merge_counters(node_files)[1]["alice"] == 3
+
+def test_torn_line_is_cut_before_increment(node_files):
+    """Tests whether a restarted node drops a torn last line instead of appending to it"""
+    with open(node_files[1], "a") as f:
+        f.write('["b", "alice", 9')
+    counter = NodeCounter(node_files[1], "b")
+    counter.increment("alice")
+    counter.close()
+    assert merge_counters(node_files)[1]["alice"] == 4
+
+def test_game_counts_wins(tmp_path):
+    """Tests whether a game increments the host's counter of the winner"""
+    counter = NodeCounter(str(tmp_path / "node.jsonl"), "host")
+    game = Game("alice", "bob", str(tmp_path / "stats.json"), counter=counter)
+    with pytest.raises(TimeoutError):
+        for position in (1, 4, 2, 5, 3):
+            game.play(position)
+    assert counter.wins == {"alice": 1}
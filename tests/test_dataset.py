@@ -0,0 +1,82 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from ttt.board import Board
+from ttt.dataset import VALUE_UNKNOWN, ShardWriter, random_games, read_shards, replay
+from ttt.solver import solve
+
+def test_replay_detects_winner():
+    """Tests whether replay returns the positions before each move and the winner"""
+    grids, winner = replay([1, 4, 2, 5, 3])
+    assert winner == "X"
+    assert len(grids) == 5
+    assert grids[2][0, 0] == "X" and grids[2][1, 0] == "O" and grids[2][0, 1] == ""
+
+    with pytest.raises(ValueError):
+        replay([1, 4, 2, 5, 3, 6])
+
+def test_random_games_are_complete():
+    """Tests whether generated games end with a win or a full board"""
+    for moves in random_games(20, seed=0):
+        grids, winner = replay(moves)
+        assert winner or len(moves) == 9
+
+def test_shards_and_manifest(tmp_path):
+    """Tests whether examples are split into shards and described by the manifest"""
+    games = list(random_games(30, seed=1))
+    with ShardWriter(str(tmp_path), shard_size=16) as writer:
+        for moves in games:
+            writer.add_game(moves)
+
+    total = sum(len(moves) for moves in games)
+    with open(tmp_path / "manifest.json") as f:
+        manifest = json.load(f)
+    assert manifest["examples"] == total
+    assert [shard["examples"] for shard in manifest["shards"]][:-1] == [16] * (len(manifest["shards"]) - 1)
+    assert sorted(os.listdir(tmp_path)) == sorted([shard["file"] for shard in manifest["shards"]] + ["manifest.json"])
+
+    shards = list(read_shards(str(tmp_path)))
+    moves = np.concatenate([shard["move"] for shard in shards])
+    assert moves.tolist() == [move for game in games for move in game]
+
+def test_example_fields(tmp_path):
+    """Tests the content of the examples of a single game"""
+    with ShardWriter(str(tmp_path)) as writer:
+        writer.add_game([1, 4, 2, 5, 3])
+    shard = next(read_shards(str(tmp_path)))
+
+    assert shard["planes"].shape == (5, 2, 3, 3)
+    assert shard["to_move"].tolist() == [0, 1, 0, 1, 0]
+    assert shard["result"].tolist() == [1, -1, 1, -1, 1]
+    # Before the last move, X can win immediately
+    assert shard["value"][-1] == 1
+    assert shard["planes"][-1, 1].sum() == 2
+
+def test_values_match_solver(tmp_path):
+    """Tests whether the written values agree with solve on every position of random games"""
+    games = list(random_games(50, seed=3))
+    with ShardWriter(str(tmp_path)) as writer:
+        for moves in games:
+            writer.add_game(moves)
+    values = np.concatenate([shard["value"] for shard in read_shards(str(tmp_path))])
+
+    expected = []
+    for moves in games:
+        board = Board()
+        for i, position in enumerate(moves):
+            expected.append(solve(board)[0])
+            board.place(position, "XO"[i % 2])
+    assert values.tolist() == expected
+
+def test_large_board_values_unknown(tmp_path):
+    """Tests whether solver values are marked unknown on larger boards"""
+    with ShardWriter(str(tmp_path), size=7, k=4) as writer:
+        for moves in random_games(3, size=7, k=4, seed=2):
+            writer.add_game(moves)
+    shard = next(read_shards(str(tmp_path)))
+
+    assert shard["planes"].shape[1:] == (2, 7, 7)
+    assert np.all(shard["value"] == VALUE_UNKNOWN)
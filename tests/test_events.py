@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+
+from ttt.events import DRAW, MOVE, WIN, EventBus
+from ttt.game import Game
+
+@pytest.fixture
+def bus():
+    return EventBus()
+
+def test_immediate_delivery(bus):
+    """Tests whether events are delivered right away without a running event loop"""
+    subscription = bus.subscribe("game")
+    other = bus.subscribe("other")
+    bus.publish(MOVE, "game", position=5)
+    event = subscription.get_nowait()
+    assert event.kind == MOVE and event.data == {"position": 5}
+    assert subscription.get_nowait() is None and len(other) == 0
+
+def test_coalescing(bus):
+    """Tests whether a full queue replaces the oldest moves and keeps the result"""
+    subscription = bus.subscribe("game", maxsize=3)
+    for position in range(1, 6):
+        bus.publish(MOVE, "game", position=position)
+    bus.publish(WIN, "game", winner="alice")
+    events = subscription.drain()
+    assert [event.kind for event in events] == [MOVE, MOVE, WIN]
+    assert [event.data.get("position") for event in events] == [4, 5, None]
+    assert subscription.dropped == 3
+
+def test_coalescing_per_topic(bus):
+    """Tests whether an all-topics subscriber keeps the latest move of every game and all results"""
+    subscription = bus.subscribe(maxsize=3)
+    bus.publish(MOVE, "game1", position=1)
+    bus.publish(MOVE, "game1", position=2)
+    bus.publish(MOVE, "game2", position=3)
+    bus.publish(DRAW, "game3")
+    assert len(subscription) == 3
+    assert subscription.get_nowait().data["position"] == 2
+    bus.publish(WIN, "game4", winner="alice")
+    events = subscription.drain()
+    assert [(event.kind, event.topic) for event in events] == \
+        [(MOVE, "game2"), (DRAW, "game3"), (WIN, "game4")]
+    assert subscription.dropped == 1 and not subscription.closed
+
+def test_overflow_closes_subscription(bus):
+    """Tests whether a subscriber whose queue is full of results is closed instead of growing the queue"""
+    async def run():
+        subscription = bus.subscribe(maxsize=2)
+        for game in range(1, 101):
+            bus.publish(MOVE, f"game{game}", position=1)
+            bus.publish(MOVE, f"game{game}", position=2)
+            bus.publish(WIN, f"game{game}", winner="alice")
+        await asyncio.sleep(0)
+        return subscription, [event async for event in subscription]
+    subscription, events = asyncio.run(run())
+    assert [(event.kind, event.topic) for event in events] == [(MOVE, "game1"), (WIN, "game1")]
+    assert subscription.closed and subscription.overflowed and subscription.dropped == 2
+    bus.publish(WIN, "game0", winner="bob")
+    assert len(subscription) == 0
+
+def test_invalid_maxsize(bus):
+    """Tests whether a subscription without room raises a ValueError"""
+    with pytest.raises(ValueError):
+        bus.subscribe("game", maxsize=0)
+
+def test_batched_fan_out(bus):
+    """Tests whether the events of one loop iteration are delivered to many subscribers in one batch"""
+    async def run():
+        subscriptions = [bus.subscribe("game") for _ in range(100)]
+        for position in range(1, 4):
+            bus.publish(MOVE, "game", position=position)
+        assert all(len(subscription) == 0 for subscription in subscriptions)
+        events = [await subscription.get() for subscription in subscriptions]
+        return events, subscriptions
+    events, subscriptions = asyncio.run(run())
+    assert bus.batches == 1
+    assert all(event.data["position"] == 1 for event in events)
+    assert all(len(subscription) == 2 for subscription in subscriptions)
+
+def test_all_topics_and_unsubscribe(bus):
+    """Tests whether a subscription without topic gets every event until it is closed"""
+    subscription = bus.subscribe()
+    bus.publish(MOVE, "game1")
+    bus.publish(DRAW, "game2")
+    assert [event.topic for event in subscription.drain()] == ["game1", "game2"]
+    subscription.close()
+    bus.publish(MOVE, "game1")
+    assert len(subscription) == 0
+
+def test_game_events(bus, tmp_path):
+    """Tests whether a Game publishes its moves and the win"""
+    game = Game("alice", "bob", str(tmp_path / "stats.json"), events=bus)
+    subscription = bus.subscribe(game)
+    with pytest.raises(TimeoutError):
+        for position in (1, 4, 2, 5, 3):
+            game.play(position)
+    events = subscription.drain()
+    assert [event.kind for event in events] == [MOVE] * 5 + [WIN]
+    assert events[0].data == {"grid": "X........", "player": "alice", "marker": "X", "position": 1}
+    assert events[-1].data == {"grid": "XXXOO....", "winner": "alice"}
@@ -4,7 +4,8 @@ from unittest import mock
 from ttt.game import write_stats
 from ttt.game import Game
 
-from ttt.player import Player
+from ttt.player import AIPlayer, Player
+from ttt.solver import TablePolicy
 from ttt.board import Board
 from ttt.board import position_to_coordinates
 
@@ -225,5 +226,40 @@ def test_make_move_draws_game(game, draw_board, statsfile):
         with pytest.raises(TimeoutError):
             game.make_move()
 
+def test_play_without_input(game, statsfile):
+    """Tests whether play places markers, switches players and detects wins"""
+    game = game[0]
+
+    for position in [1, 4, 2, 5]:
+        game.play(position)
+    with pytest.raises(ValueError):
+        game.play(1)
+    assert game._current == game.player1
+
+    with pytest.raises(TimeoutError):
+        game.play(3)
+
+def test_game_rejects_player_with_wrong_marker(statsfile):
+    """Tests whether Player objects passed to Game must have the right marker"""
+    with pytest.raises(ValueError):
+        Game(Player("Alice", "O"), "Bob", statsfile)
 
+def test_game_rejects_equal_names(statsfile):
+    """Tests whether a game against oneself is rejected before anything is recorded"""
+    name = generate_name()
+    with pytest.raises(ValueError):
+        Game(name, name, statsfile)
+    assert not os.path.exists(statsfile)
+
+def test_make_move_asks_ai_player(statsfile):
+    """Tests whether an AI player moves without input and a perfect AI never loses"""
+    ai = AIPlayer("Robot", "O", TablePolicy())
+    game = Game(generate_name(), ai, statsfile)
+
+    mocked_input = mock.Mock(side_effect=["5", "1", "3", "8", "6", "4"])
+    with mock.patch("builtins.input", mocked_input):
+        with pytest.raises(TimeoutError) as error:
+            for i in range(9):
+                game.make_move()
 
+    assert "wins" not in str(error.value) or "Robot" in str(error.value)
@@ -0,0 +1,28 @@
+import json
+
+import pytest
+
+from ttt.journal import atomic_write, read_journal
+
+def test_read_journal_cuts_torn_line(tmp_path):
+    """Tests whether the complete records are read and an incomplete last line is cut off"""
+    path = tmp_path / "journal.jsonl"
+    path.write_text('["alice", 1]\n["bob", 2]\n["car')
+    assert list(read_journal(str(path))) == [["alice", 1], ["bob", 2]]
+    assert path.read_text() == '["alice", 1]\n["bob", 2]\n'
+    assert list(read_journal(str(tmp_path / "missing.jsonl"))) == []
+
+def test_atomic_write(tmp_path):
+    """Tests whether the file is replaced only once the block has finished"""
+    path = tmp_path / "stats.json"
+    with atomic_write(str(path)) as f:
+        json.dump({"alice": 1}, f)
+        assert not path.exists()
+    assert json.loads(path.read_text()) == {"alice": 1}
+
+    with pytest.raises(RuntimeError):
+        with atomic_write(str(path)) as f:
+            f.write("{")
+            raise RuntimeError()
+    assert json.loads(path.read_text()) == {"alice": 1}
+    assert [file.name for file in tmp_path.iterdir()] == ["stats.json"]
@@ -0,0 +1,60 @@
+import asyncio
+import json
+import random
+
+import pytest
+
+from ttt.loadtest import LoadTest, LocalGameServer, main, think_time
+
+def test_think_time():
+    """Tests whether think-time distributions are parsed and sampled"""
+    rng = random.Random(0)
+    assert think_time("0")(rng) == 0.0
+    assert think_time("const:0.5")(rng) == 0.5
+    assert 1 <= think_time("uniform:1:2")(rng) <= 2
+    assert think_time("exp:0.1")(rng) >= 0
+    with pytest.raises(ValueError):
+        think_time("gauss:1")
+    with pytest.raises(ValueError):
+        think_time("uniform:1")
+
+def test_server_plays_games(tmp_path):
+    """Tests whether the server applies moves and reports the end of a game"""
+    server = LocalGameServer(str(tmp_path / "stats.json"))
+
+    async def play():
+        game_id = await server.create_game("a", "b")
+        replies = [await server.move(game_id, position) for position in (1, 1, 4, 2, 5, 3)]
+        return [reply["status"] for reply in replies]
+
+    assert asyncio.run(play()) == ["ok", "invalid", "ok", "ok", "ok", "over"]
+    assert server.games == {}
+    with open(tmp_path / "stats.json") as f:
+        assert json.load(f) == {"a": 1}
+
+def test_load_test_report(tmp_path):
+    """Tests whether all matches are played and the report is consistent"""
+    test = LoadTest(LocalGameServer(str(tmp_path / "stats.json")), think="uniform:0:0.001",
+                    invalid_rate=0.1, seed=0)
+    report, = test.ramp([200], matches=2)
+    assert report["games"] == 400 and report["errors"] == 0 and report["error_rate"] == 0
+    assert 5 * 400 <= report["moves"] - report["rejected"] <= 9 * 400
+    assert report["rejected"] > 0
+    assert 0 <= report["p50_ms"] <= report["p90_ms"] <= report["p99_ms"] <= report["max_ms"]
+    assert report["games_per_second"] > 0
+
+def test_errors_are_counted(tmp_path):
+    """Tests whether exceptions in the server count as errors"""
+    server = LocalGameServer(str(tmp_path / "stats.json"))
+
+    async def broken(game_id, position):
+        raise RuntimeError("server down")
+
+    server.move = broken
+    report, = LoadTest(server).ramp([5])
+    assert report["errors"] == 5 and report["error_rate"] == 1.0 and report["games"] == 0
+
+def test_main(tmp_path, capsys):
+    """Tests whether the command line tool prints one line per level"""
+    main(["--levels", "1", "5", "--matches", "1", "--think", "0", "--statsfile", str(tmp_path / "s.json")])
+    assert len(capsys.readouterr().out.splitlines()) == 3
@@ -0,0 +1,54 @@
+import pytest
+
+from ttt.board import Board
+from ttt.parallel import ParallelSearch, _best_outcome, benchmark
+from ttt.search import WIN, SearchResult
+
+@pytest.fixture(scope="module")
+def search():
+    with ParallelSearch(workers=2, time_limit=5, max_depth=3) as search:
+        yield search
+
+def test_finds_win_on_large_board(search):
+    """Tests whether the parallel search finds the same forced win as the serial one"""
+    board = Board(size=15, k=5)
+    for i, position in enumerate([113, 114, 98, 99, 83, 84]):
+        board.place(position, "XO"[i % 2])
+
+    result = search.search(board)
+    assert result.move in (68, 128)
+    assert result.score >= WIN - 10
+    assert result.nodes > 0
+
+def test_threat_search_before_split(search):
+    """Tests whether a forced win found only by the threat search is played in parallel mode"""
+    board = Board(size=15, k=5)
+    # X can make two open threes at once at row 7, column 9
+    for i, (row, col) in enumerate([(7, 7), (0, 0), (7, 8), (0, 14), (8, 9), (14, 0), (9, 9), (14, 14)]):
+        board.place(row * 15 + col + 1, "XO"[i % 2])
+
+    result = search.search(board)
+    assert result.move == 7 * 15 + 9 + 1
+    assert result.score >= WIN - 10
+
+def test_single_candidate(search):
+    """Tests whether the empty board is answered without asking the workers"""
+    assert search(Board(size=15, k=5)) == 113
+    assert search.last_result.nodes == 0
+
+def test_best_outcome_compares_common_depth():
+    """Tests whether workers are compared at the depth all of them completed and placeholders are ignored"""
+    placeholder = (SearchResult(5, 0, 0, 10, 1.0), [])
+    shallow = (SearchResult(6, -40, 2, 100, 1.0), [(6, 30), (6, -40)])
+    deep = (SearchResult(7, -60, 3, 100, 1.0), [(7, 10), (7, 20), (7, -60)])
+    assert _best_outcome([placeholder, shallow, deep], 64) is deep
+    assert _best_outcome([placeholder, placeholder], 64) is placeholder
+
+    winning = (SearchResult(8, WIN - 5, 5, 100, 1.0), [(8, 0)] * 4 + [(8, WIN - 5)])
+    assert _best_outcome([shallow, winning], 64) is winning
+
+def test_benchmark_reports_speedup():
+    """Tests whether the benchmark reports both timings"""
+    stats = benchmark(workers=2, depth=1, threat_search=False)
+    assert stats["serial"] > 0 and stats["parallel"] > 0
+    assert stats["speedup"] == pytest.approx(stats["serial"] / stats["parallel"])
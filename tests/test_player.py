@@ -1,6 +1,7 @@
 import pytest
 
-from ttt.player import Player
+from ttt.player import AIPlayer, Player
+from ttt.board import Board
 
 import string
 import random
@@ -97,3 +98,18 @@ def test_marker_setter_invalid_marker(random_player):
         except ValueError:
             assert True
 
+
+def test_ai_player_uses_policy():
+    """Test that checks whether an AI player asks its policy for moves"""
+    boards = []
+    def policy(board):
+        boards.append(board)
+        return 5
+
+    player = AIPlayer("Robot", "o", policy)
+    board = Board()
+
+    assert player.marker == "O"
+    assert player.choose_move(board) == 5
+    assert boards == [board]
+    assert str(player) != str(Player("Robot", "O"))
@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+
+from ttt.board import Board
+from ttt.pool import GamePool, ONGOING, X_WINS, O_WINS, DRAW
+
+@pytest.fixture
+def pool():
+    return GamePool(capacity=2)
+
+def test_new_games_grows_pool(pool):
+    """Tests whether new_games hands out unique ids and grows beyond the initial capacity"""
+    game_ids = pool.new_games(np.arange(10), np.arange(10, 20))
+
+    assert len(set(game_ids.tolist())) == 10
+    assert len(pool) == 10
+    assert pool.capacity >= 10
+    assert np.all(pool.results(game_ids) == ONGOING)
+    assert np.all(pool.player2[game_ids] == np.arange(10, 20))
+    assert pool.nbytes == 16 * pool.capacity
+
+def test_release_reuses_slots(pool):
+    """Tests whether released slots are handed out again"""
+    game_ids = pool.new_games([1, 2], [3, 4])
+    pool.release(game_ids[:1])
+    assert len(pool) == 1
+
+    new_id = pool.new_games([5], [6])
+    assert new_id[0] == game_ids[0]
+    assert pool.player1[new_id[0]] == 5
+
+def test_release_rejects_duplicates(pool):
+    """Tests whether releasing a game twice in one call is rejected and changes nothing"""
+    game_ids = pool.new_games([1, 2], [3, 4])
+    with pytest.raises(ValueError):
+        pool.release([game_ids[0], game_ids[0]])
+    assert len(pool) == 2
+
+    pool.release(game_ids[:1])
+    with pytest.raises(ValueError):
+        pool.release(game_ids[:1])
+    new_ids = pool.new_games([5, 6], [7, 8])
+    assert len(set(new_ids.tolist())) == 2
+
+def test_apply_moves_detects_results(pool):
+    """Tests whether wins for both markers and draws are detected in one batch"""
+    game_ids = pool.new_games([0, 0, 0], [1, 1, 1])
+    # Game 0: X wins with the top row, game 1: O wins with the middle column,
+    # game 2 ends in a draw
+    moves = [[1, 1, 1], [4, 2, 2], [2, 3, 3], [5, 5, 5], [3, 4, 4], [None, 8, 6],
+             [None, None, 8], [None, None, 7], [None, None, 9]]
+
+    for row in moves:
+        ids = [game_ids[i] for i, move in enumerate(row) if move is not None]
+        positions = [move for move in row if move is not None]
+        pool.apply_moves(ids, positions)
+
+    assert pool.results(game_ids).tolist() == [X_WINS, O_WINS, DRAW]
+    assert sorted(pool.finished().tolist()) == sorted(game_ids.tolist())
+
+def test_apply_moves_rejects_invalid_batches(pool):
+    """Tests whether invalid moves are rejected without modifying any game"""
+    game_ids = pool.new_games([0, 0], [1, 1])
+    pool.apply_moves(game_ids, [5, 5])
+
+    assert pool.check_moves(game_ids, [5, 10]).tolist() == [False, False]
+    with pytest.raises(ValueError):
+        pool.apply_moves(game_ids, [1, 5])
+    with pytest.raises(ValueError):
+        pool.apply_moves([game_ids[0], game_ids[0]], [1, 2])
+
+    assert pool.x_bits[game_ids].tolist() == [1 << 4, 1 << 4]
+    assert pool.o_bits[game_ids].tolist() == [0, 0]
+
+def test_board_matches_single_game(pool):
+    """Tests whether the pool agrees with a Board object playing the same moves"""
+    game_id = pool.new_games([0], [1])
+    reference = Board()
+    for position, marker in zip([5, 1, 9, 3, 2], "XOXOX"):
+        pool.apply_moves(game_id, [position])
+        reference.place(position, marker)
+
+    board = pool.board(game_id[0])
+    assert np.all(board.grid == reference.grid)
+    assert board.last_move == reference.last_move
@@ -0,0 +1,61 @@
+import os
+from unittest import mock
+
+import pytest
+
+from ttt.main import cli
+from ttt.profiling import Profiler, main, play_games
+
+def test_profiler_reports_hot_functions(tmp_path):
+    """Tests whether the report lists the game functions and writes all three files"""
+    prefix = str(tmp_path / "prof")
+    with Profiler(interval=0.0005, top=50) as profiler:
+        assert play_games(200, str(tmp_path / "stats.json"), seed=0) >= 200 * 5
+    report = profiler.write_report(prefix)
+
+    names = [name for name, calls, own, cumulative in profiler.hot_functions()]
+    assert any("check_win" in name for name in names)
+    assert any("write_stats" in name for name in names)
+    assert profiler.allocation_sites()
+    assert "allocation site" in report
+    for extension in (".txt", ".pstats", ".collapsed"):
+        assert os.path.getsize(prefix + extension) > 0
+
+def test_collapsed_stacks(tmp_path):
+    """Tests whether sampled stacks are written as "frame;frame count" lines"""
+    prefix = str(tmp_path / "prof")
+    with Profiler(interval=0.0005, memory=False) as profiler:
+        play_games(300, str(tmp_path / "stats.json"), seed=1)
+    profiler.write_report(prefix)
+    with open(prefix + ".collapsed") as f:
+        lines = f.read().splitlines()
+    assert lines
+    stack, count = lines[0].rsplit(" ", 1)
+    assert int(count) >= 1 and "test_profiling.py:test_collapsed_stacks" in stack
+
+def test_profile_module(tmp_path, capsys):
+    """Tests whether a module can be profiled from the command line"""
+    prefix = str(tmp_path / "prof")
+    with pytest.raises(SystemExit) as exit:
+        main(["--output", prefix, "--no-memory", "--module", "timeit", "--", "-n", "1", "-r", "1", "pass"])
+    assert not exit.value.code
+    assert "function" in capsys.readouterr().out
+    assert os.path.exists(prefix + ".pstats")
+
+def test_profile_module_keeps_exit_status(tmp_path):
+    """Tests whether the exit status of a failing module is passed on after the report"""
+    prefix = str(tmp_path / "prof")
+    with pytest.raises(SystemExit) as exit:
+        main(["--output", prefix, "--no-memory", "--module", "timeit", "--", "--no-such-option"])
+    assert exit.value.code == 2
+    assert os.path.exists(prefix + ".txt")
+
+def test_main_profile_option(tmp_path):
+    """Tests whether ttt.main --profile plays the game and writes the report"""
+    prefix = str(tmp_path / "prof")
+    inputs = ["alice", "bob", str(tmp_path / "stats.json"), "1", "4", "2", "5", "3"]
+    with mock.patch("builtins.input", mock.Mock(side_effect=inputs)):
+        with pytest.raises(SystemExit):
+            cli(["--profile", prefix])
+    with open(prefix + ".txt") as f:
+        assert "make_move" in f.read()
@@ -0,0 +1,66 @@
+import pytest
+
+from ttt.game import Game
+from ttt.player import AIPlayer
+from ttt.qubic import CELL_MASKS, LINES, QubicBoard
+from ttt.search import AlphaBetaSearch, candidate_moves
+
+@pytest.fixture
+def board():
+    return QubicBoard()
+
+def test_lines():
+    """Tests whether there are 76 lines, with 7 through corners and centre cells and 4 elsewhere"""
+    assert len(LINES) == 76
+    assert len(CELL_MASKS[0]) == 7 and len(CELL_MASKS[21]) == 7 and len(CELL_MASKS[1]) == 4
+
+@pytest.mark.parametrize("line", [[1, 2, 3, 4], [1, 17, 33, 49], [1, 22, 43, 64], [4, 23, 42, 61], [13, 26, 39, 52]])
+def test_win_along_lines(board, line):
+    """Tests whether rows, verticals and space diagonals are wins"""
+    for position in line[:-1]:
+        board.place(position, "X")
+        assert not board.check_win()
+    board.place(line[-1], "X")
+    assert board.check_win()
+
+def test_place_and_remove(board):
+    """Tests whether markers are validated, placed and taken back"""
+    board.place(7, "O")
+    assert board.grid[0, 1, 2] == "O"
+    with pytest.raises(ValueError):
+        board.place(7, "X")
+    with pytest.raises(ValueError):
+        board.place(65, "X")
+    board.remove(7)
+    assert board.bits["O"] == 0 and board.last_move == 0
+    assert board.empty_positions() == list(range(1, 65))
+
+def test_full_board(board):
+    """Tests whether a board with all cells occupied is full"""
+    for position in range(1, 65):
+        board.place(position, "XO"[position % 2])
+    assert board.check_full()
+
+def test_search_blocks_and_wins(board):
+    """Tests whether the search takes a win and blocks an open line"""
+    for position, marker in [(1, "X"), (17, "O"), (2, "X"), (33, "O"), (3, "X")]:
+        board.place(position, marker)
+    search = AlphaBetaSearch(time_limit=5, max_depth=2)
+    assert len(candidate_moves(board)) == 59
+    assert search(board) == 4
+
+def test_game_on_qubic(tmp_path):
+    """Tests whether Game plays on a QubicBoard until a player wins"""
+    game = Game("alice", "bob", str(tmp_path / "stats.json"), board=QubicBoard())
+    with pytest.raises(TimeoutError, match="alice wins"):
+        for position in (1, 17, 2, 18, 3, 19, 4):
+            game.play(position)
+
+def test_ai_player_on_qubic(tmp_path):
+    """Tests whether an AI player with AlphaBetaSearch answers on a QubicBoard"""
+    game = Game("alice", AIPlayer("bot", "O", AlphaBetaSearch(max_depth=2)),
+                str(tmp_path / "stats.json"), board=QubicBoard())
+    for position in (1, 2, 3):
+        game.play(position)
+        game.make_move()
+    assert game.board.grid.flat[3] == "O"
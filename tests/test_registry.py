@@ -0,0 +1,83 @@
+import json
+
+import pytest
+
+from ttt.checkpoint import CheckpointLog
+from ttt.game import Game
+from ttt.registry import PlayerRegistry
+from ttt.stats import StatsStore
+
+def test_ids_are_stable(tmp_path):
+    """Tests whether ids are assigned in order and kept when the registry is loaded again"""
+    path = str(tmp_path / "players.jsonl")
+    registry = PlayerRegistry(path)
+    assert [registry.id(name) for name in ("alice", "bob", "alice", "carol")] == [0, 1, 0, 2]
+    registry.close()
+
+    loaded = PlayerRegistry(path)
+    assert loaded.names == ["alice", "bob", "carol"]
+    assert loaded.id("bob") == 1 and loaded.name(2) == "carol"
+    assert loaded.id("dave") == 3
+
+    with pytest.raises(ValueError):
+        loaded.id("")
+    with pytest.raises(IndexError):
+        loaded.name(10)
+
+def test_torn_tail_is_cut(tmp_path):
+    """Tests whether a name registered after a crash isn't glued onto a torn last line"""
+    path = str(tmp_path / "players.jsonl")
+    with open(path, "w") as f:
+        f.write('"alice"\n"bo')
+    registry = PlayerRegistry(path)
+    assert registry.id("carol") == 1
+    registry.close()
+    assert PlayerRegistry(path).names == ["alice", "carol"]
+
+def test_names_are_interned():
+    """Tests whether equal names built at runtime share one string object"""
+    registry = PlayerRegistry()
+    registry.id("".join(["ali", "ce"]))
+    assert registry.name(registry.id("".join(["al", "ice"]))) is registry.name(0)
+
+def test_players_are_shared(tmp_path):
+    """Tests whether games get the same Player object for the same name, id and marker"""
+    registry = PlayerRegistry()
+    game1 = Game("alice", "bob", str(tmp_path / "stats.json"), registry=registry)
+    game2 = Game(registry.id("alice"), "carol", str(tmp_path / "stats.json"), registry=registry)
+    assert game1.player1 is game2.player1
+    assert registry.player("bob", "o") is game1.player2
+    assert registry.player("alice", "O") is not game1.player1
+
+    with pytest.raises(ValueError):
+        Game("", "bob", str(tmp_path / "stats.json"), registry=registry)
+
+def test_stats_journal_stores_ids(tmp_path):
+    """Tests whether a StatsStore with a registry accepts ids and journals ids"""
+    registry = PlayerRegistry(str(tmp_path / "players.jsonl"))
+    path = str(tmp_path / "ratings.json")
+    store = StatsStore(path, registry=registry)
+    store.record_win("alice", "bob")
+    store.record_draw(registry.id("bob"), registry.id("alice"))
+    store.close()
+    with open(store.journal_path) as f:
+        assert [json.loads(line)[:2] for line in f] == [[0, 1], [1, 0]]
+
+    loaded = StatsStore(path, registry=registry)
+    assert loaded.get("alice")["wins"] == 1 and loaded.get(1)["draws"] == 1
+    assert loaded.rank(0) == 1
+
+def test_checkpoint_stores_ids(tmp_path):
+    """Tests whether checkpoints with a registry store ids and restore the shared players"""
+    registry = PlayerRegistry()
+    game = Game("alice", "bob", str(tmp_path / "stats.json"), registry=registry)
+    game.play(5)
+    with CheckpointLog(str(tmp_path / "games.wal"), registry=registry) as log:
+        log.checkpoint(0, game)
+    with CheckpointLog(str(tmp_path / "games.wal"), registry=registry) as log:
+        restored = log.restore()[0]
+    assert restored.player1 is game.player1 and restored._current is game.player2
+
+    with CheckpointLog(str(tmp_path / "games.wal")) as log:
+        with pytest.raises(ValueError):
+            log.restore()
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from ttt.board import Board
+from ttt.player import AIPlayer
+from ttt.rl import SelfPlayTrainer, ValueTable, solver_agreement
+from ttt.solver import build_tables, position_code
+
+@pytest.fixture(scope="module")
+def trained():
+    """Fixture that trains a table on 40000 games"""
+    trainer = SelfPlayTrainer(seed=0)
+    trainer.train(40000)
+    return trainer
+
+def test_terminal_values_are_exact():
+    """Tests whether won and drawn positions have their exact value in a new table"""
+    table = ValueTable()
+    board = Board()
+    for position in (1, 4, 2, 5, 3):
+        board.place(position, "X" if position < 4 else "O")
+    assert table.values[position_code(board)] == -1
+
+def test_training_reports_throughput(trained):
+    """Tests whether training counts the finished games and their rate"""
+    assert trained.games >= 40000
+    assert trained.games_per_second > 0
+
+def test_training_approaches_solver(trained):
+    """Tests whether the learned moves mostly agree with the solver and beat an untrained table"""
+    tables = build_tables()
+    assert solver_agreement(trained.table, tables) > 0.9
+    assert solver_agreement(trained.table, tables) > solver_agreement(ValueTable(), tables)
+
+def test_solver_values_agree_everywhere():
+    """Tests whether a table holding the solver values agrees with the solver on every position"""
+    values, moves = build_tables()
+    table = ValueTable(values.astype(np.float32))
+    assert solver_agreement(table, (values, moves)) == 1.0
+    # The reachable positions don't depend on the moves stored in the tables
+    assert solver_agreement(ValueTable(), (values, np.zeros_like(moves))) == \
+        solver_agreement(ValueTable(), (values, moves))
+
+def test_table_takes_a_win(trained):
+    """Tests whether the table completes a line when it can"""
+    board = Board()
+    for i, position in enumerate([1, 4, 2, 5]):
+        board.place(position, "XO"[i % 2])
+    assert trained.table(board) == 3
+
+def test_save_and_load(trained, tmp_path):
+    """Tests whether a saved table keeps its values up to the int8 quantization"""
+    path = str(tmp_path / "values.npy")
+    trained.table.save(path)
+    loaded = ValueTable.load(path)
+    assert np.allclose(loaded.values, np.clip(trained.table.values, -1, 1), atol=1 / 254 + 1e-6)
+    assert solver_agreement(loaded) > 0.9
+    assert AIPlayer("bot", "X", loaded).choose_move(Board()) in range(1, 10)
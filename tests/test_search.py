@@ -0,0 +1,84 @@
+import time
+
+import pytest
+
+from ttt.board import Board, line_windows
+from ttt.search import AlphaBetaSearch, WIN, candidate_moves, evaluate
+from ttt.solver import solve
+from ttt.transposition import EXACT, board_hash
+
+def play(board, moves):
+    """Helper function that plays the given positions alternately with X and O"""
+    for i, position in enumerate(moves):
+        board.place(position, "XO"[i % 2])
+    return board
+
+def test_line_windows():
+    """Tests whether all winning segments are listed"""
+    assert len(line_windows(3, 3)) == 8
+    # 15 by 15, five in a row: 11 * 15 rows and columns each, 11 * 11 diagonals each
+    assert len(line_windows(15, 5)) == 2 * 11 * 15 + 2 * 11 * 11
+
+def test_candidate_moves():
+    """Tests whether only cells next to markers are candidates"""
+    board = Board(size=9, k=5)
+    assert candidate_moves(board) == [41]
+
+    board.place(1, "X")
+    assert candidate_moves(board) == [2, 10, 11]
+    assert len(candidate_moves(board, radius=2)) == 8
+
+def test_evaluate_is_symmetric():
+    """Tests whether the evaluation is zero-sum"""
+    board = play(Board(size=9, k=5), [41, 42, 50])
+    assert evaluate(board, "X") == -evaluate(board, "O")
+    assert evaluate(board, "X") > 0
+
+@pytest.mark.parametrize("moves", [[1, 5, 9], [5, 1], [1, 4, 2, 5], [5, 1, 9, 3]])
+def test_agrees_with_solver(moves):
+    """Tests whether the search plays perfectly on the classic board"""
+    board = play(Board(), moves)
+    value, _ = solve(board)
+    result = AlphaBetaSearch(time_limit=5).search(board)
+
+    board.place(result.move, "XO"[len(moves) % 2])
+    if board.check_win():
+        assert value == 1
+    else:
+        board.remove(result.move)
+        assert solve(play(board, [result.move]))[0] == -value
+
+def test_finds_win_on_large_board():
+    """Tests whether an open three is turned into a forced win on a 15 by 15 board"""
+    board = play(Board(size=15, k=5), [113, 114, 98, 99, 83, 84])
+    before = str(board)
+    result = AlphaBetaSearch(time_limit=5).search(board)
+
+    assert result.move in (68, 128)
+    assert result.score >= WIN - 10
+    assert result.depth >= 1 and result.nodes > 0 and result.nps > 0
+    assert str(board) == before
+
+def test_respects_deadline():
+    """Tests whether the search stops at the deadline and still returns a move"""
+    board = play(Board(size=15, k=5), [113, 97, 115])
+    search = AlphaBetaSearch(time_limit=0.2)
+    start = time.monotonic()
+    result = search.search(board)
+
+    assert time.monotonic() - start <= 0.2 + 0.05
+    assert result.elapsed <= 0.2 + 0.05
+    assert result.move in board.empty_positions()
+    assert search(board) in board.empty_positions()
+
+def test_mate_scores_are_stored_relative_to_the_node():
+    """Tests whether a win found deeper in the tree is stored with its distance from that node,
+    so that it is scored correctly when the position is reached at another ply"""
+    board = play(Board(), [1, 4, 2, 5])
+    search = AlphaBetaSearch(time_limit=5, max_depth=2)
+    # If X plays 7 instead of winning, O wins at once: WIN - 1 from the root, WIN from there
+    assert search.search(board, root_moves=[7]).score == -(WIN - 1)
+
+    board.place(7, "X")
+    value, depth, bound, move = search.table.probe(board_hash(board, search._keys))
+    assert (value, bound, move) == (WIN, EXACT, 6)
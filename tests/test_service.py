@@ -0,0 +1,71 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from ttt.service import BestMoveService, make_server, parse_grid, parse_moves
+
+@pytest.fixture
+def service():
+    return BestMoveService(cache_size=2)
+
+def test_parse_grid_and_moves_agree():
+    """Tests whether both input formats describe the same board"""
+    assert (parse_grid("X...O...X").grid == parse_moves("1,5,9").grid).all()
+    assert (parse_moves([1, 5, 9]).grid == parse_moves("159").grid).all()
+
+def test_parse_grid_rejects_invalid():
+    """Tests whether malformed or unreachable grids are rejected"""
+    for text in ["X", "XX.......", "XOZ......", "OO.X....."]:
+        with pytest.raises(ValueError):
+            parse_grid(text)
+
+def test_query_finds_win(service):
+    """Tests whether the service returns the winning move"""
+    answer = service.query(parse_moves("1,4,2,5"))
+
+    assert answer["to_move"] == "X"
+    assert answer["value"] == 1
+    assert answer["best_move"] == 3
+    assert answer["legal_moves"] == [3, 6, 7, 8, 9]
+
+def test_symmetric_positions_share_cache(service):
+    """Tests whether rotated positions are answered from the same cache entry and the
+    best move is mapped back to the queried orientation"""
+    first = service.query(parse_grid("XX.OO...."))
+    rotated = service.query(parse_grid(".OX.OX..."))
+
+    assert first["best_move"] == 3
+    assert rotated["best_move"] == 9
+    assert service.metrics()["hits"] == 1
+    assert service.metrics()["misses"] == 1
+
+def test_cache_is_bounded(service):
+    """Tests whether the least recently used entry is evicted"""
+    for moves in ["", "5", "1", "5"]:
+        service.query(parse_moves(moves))
+    metrics = service.metrics()
+
+    assert metrics["size"] == 2
+    assert metrics["misses"] == 3
+    assert metrics["hit_rate"] == 0.25
+
+def test_http_endpoint(service):
+    """Tests the HTTP interface of the service"""
+    server = make_server(service, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        with urllib.request.urlopen(f"{url}/best?moves=1,4,2,5") as response:
+            assert json.loads(response.read())["best_move"] == 3
+        with urllib.request.urlopen(f"{url}/metrics") as response:
+            assert json.loads(response.read())["misses"] == 1
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(f"{url}/best?board=XXX")
+        assert error.value.code == 400
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,56 @@
+import json
+import os
+
+import pytest
+
+from ttt.game import Game
+from ttt.shards import ShardedStats, shard_of
+
+@pytest.fixture
+def store(tmp_path):
+    return ShardedStats(str(tmp_path / "stats"), shards=4)
+
+def test_shard_of_is_stable():
+    """Tests whether names are spread over the shards with a fixed hash"""
+    assert shard_of("alice", 16) == shard_of("alice", 16)
+    assert len({shard_of(f"player{i}", 16) for i in range(200)}) == 16
+
+def test_increment_touches_one_shard(store):
+    """Tests whether a win only writes the winner's shard"""
+    store.increment("alice")
+    store.increment("alice", 2)
+    files = [name for name in os.listdir(store.directory) if name.startswith("stats-")]
+    assert files == [os.path.basename(store.shard_path(shard_of("alice", 4)))]
+    assert store.get("alice") == 3 and store.get("bob") == 0
+
+def test_compact_writes_legacy_file(store, tmp_path):
+    """Tests whether compaction produces the single-file format of write_stats"""
+    for i in range(20):
+        store.increment(f"player{i}", i + 1)
+    statsfile = str(tmp_path / "stats.json")
+    store.compact(statsfile)
+    with open(statsfile) as f:
+        assert json.load(f) == {f"player{i}": i + 1 for i in range(20)}
+
+def test_from_legacy(tmp_path):
+    """Tests whether a legacy stats file is split into shards"""
+    statsfile = str(tmp_path / "stats.json")
+    with open(statsfile, "w") as f:
+        json.dump({"alice": 2, "bob": 5}, f)
+    store = ShardedStats.from_legacy(statsfile, str(tmp_path / "stats"), shards=8)
+    assert store.get("bob") == 5 and dict(store.items()) == {"alice": 2, "bob": 5}
+
+def test_shard_count_is_checked(store):
+    """Tests whether reopening a store with another number of shards fails"""
+    assert ShardedStats(store.directory, shards=4).shards == 4
+    with pytest.raises(ValueError):
+        ShardedStats(store.directory, shards=8)
+
+def test_game_records_wins(store, tmp_path):
+    """Tests whether a game records wins in sharded stats instead of the legacy stats file"""
+    game = Game("alice", "bob", str(tmp_path / "stats.json"), stats=store)
+    with pytest.raises(TimeoutError):
+        for position in (1, 4, 2, 5, 3):
+            game.play(position)
+    assert store.get("alice") == 1
+    assert not os.path.exists(tmp_path / "stats.json")
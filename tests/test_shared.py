@@ -0,0 +1,60 @@
+import multiprocessing
+
+import numpy as np
+import pytest
+
+from ttt.board import Board
+from ttt.shared import SharedArrays, save_arrays, shared_position_tables
+from ttt.solver import position_code
+
+@pytest.fixture
+def tables():
+    shared = shared_position_tables()
+    yield shared
+    shared.unlink()
+
+def _read_value(handle, code, results):
+    """Worker that attaches to the shared tables and reports one value"""
+    shared = SharedArrays.attach(handle)
+    results.put(int(shared["moves"][code]))
+    shared.close()
+
+def test_views_are_read_only(tables):
+    """Tests whether the shared arrays cannot be modified"""
+    with pytest.raises(ValueError):
+        tables["values"][0] = 1
+
+def test_attach_sees_same_data(tables):
+    """Tests whether a second handle sees the same memory"""
+    other = SharedArrays.attach(tables.handle)
+    assert np.array_equal(other["moves"], tables["moves"])
+    other.close()
+
+def test_worker_process_reads_tables(tables):
+    """Tests whether another process can read the tables by attaching"""
+    board = Board()
+    for position, marker in zip([1, 4, 2, 5], "XOXO"):
+        board.place(position, marker)
+    code = position_code(board)
+
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    worker = context.Process(target=_read_value, args=(tables.handle, code, results))
+    worker.start()
+    worker.join(timeout=30)
+
+    assert results.get(timeout=5) == 3
+    # The block must survive the worker exiting
+    assert tables["moves"][code] == 3
+
+def test_save_and_load(tmp_path):
+    """Tests whether arrays survive a round trip through a memory-mapped file"""
+    arrays = {"a": np.arange(10, dtype=np.int8), "b": np.ones((3, 4), dtype=np.uint64)}
+    path = tmp_path / "tables.bin"
+    save_arrays(path, arrays)
+
+    loaded = SharedArrays.load(path)
+    for name, array in arrays.items():
+        assert loaded[name].dtype == array.dtype
+        assert np.array_equal(loaded[name], array)
+    loaded.close()
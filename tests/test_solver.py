@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+
+from ttt import solver
+from ttt.board import FULL_MASK, Board, is_winning_mask
+
+@pytest.fixture
+def tables():
+    return solver.build_tables()
+
+def board_from_moves(moves):
+    """Helper function that plays the given positions alternately with X and O"""
+    board = Board()
+    for i, position in enumerate(moves):
+        board.place(position, "XO"[i % 2])
+    return board
+
+def test_position_code_roundtrip():
+    """Tests whether position codes can be converted back to bit masks"""
+    board = board_from_moves([5, 1, 9, 3])
+    code = solver.position_code(board)
+
+    assert code == 1 * 3**4 + 2 * 3**0 + 1 * 3**8 + 2 * 3**2
+    assert solver.code_to_masks(code) == (0b100010000, 0b000000101)
+    assert solver.masks_to_code(*solver.code_to_masks(code)) == code
+
+def test_position_codes_vectorized():
+    """Tests whether position_codes agrees with position_code"""
+    boards = [board_from_moves(moves) for moves in ([], [1], [5, 1, 9])]
+    codes = solver.position_codes(np.stack([board.grid for board in boards]))
+
+    assert codes.tolist() == [solver.position_code(board) for board in boards]
+
+def test_solve_empty_board_is_draw():
+    """Tests whether the empty board is a draw with perfect play"""
+    assert solver.solve(Board())[0] == 0
+
+def test_solve_finds_win():
+    """Tests whether the solver completes a row"""
+    value, move = solver.solve(board_from_moves([1, 4, 2, 5]))
+    assert value == 1
+    assert move == 3
+
+def test_solve_finished_game():
+    """Tests whether a won game has no best move"""
+    assert solver.solve(board_from_moves([1, 4, 2, 5, 3])) == (-1, 0)
+
+def test_build_tables_matches_solve(tables):
+    """Tests whether the precomputed tables agree with solving single positions"""
+    values, moves = tables
+    for sequence in ([], [5], [1, 2], [5, 1, 9], [1, 4, 2, 5]):
+        board = board_from_moves(sequence)
+        code = solver.position_code(board)
+        assert (values[code], moves[code]) == solver.solve(board)
+
+def reachable_codes():
+    """Helper function that returns the codes of all positions reachable from the empty board,
+    found by playing every legal move, together with whether the game is over there"""
+    reachable = {0: False}
+    frontier = [(0, 0)]
+    while frontier:
+        x_bits, o_bits = frontier.pop()
+        marker = solver.side_to_move(x_bits, o_bits)
+        for index in range(9):
+            bit = 1 << index
+            if (x_bits | o_bits) & bit:
+                continue
+            child = (x_bits | bit, o_bits) if marker == "X" else (x_bits, o_bits | bit)
+            code = solver.masks_to_code(*child)
+            if code in reachable:
+                continue
+            over = is_winning_mask(child[0]) or is_winning_mask(child[1]) or child[0] | child[1] == FULL_MASK
+            reachable[code] = over
+            if not over:
+                frontier.append(child)
+    return reachable
+
+def test_build_tables_covers_reachable_positions(tables):
+    """Tests whether every reachable position that isn't over has a legal move in the tables
+    and agrees with solve"""
+    values, moves = tables
+    reachable = reachable_codes()
+    assert len(reachable) == 5478
+    for code, over in reachable.items():
+        if over:
+            continue
+        x_bits, o_bits = solver.code_to_masks(code)
+        value, move = int(values[code]), int(moves[code])
+        assert move and not (x_bits | o_bits) >> (move - 1) & 1
+        assert (value, move) == solver._negamax(x_bits, o_bits, {})
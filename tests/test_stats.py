@@ -0,0 +1,96 @@
+import os
+import random
+
+import pytest
+from unittest import mock
+
+from ttt.game import Game
+from ttt.stats import DEFAULT_RATING, StatsStore, _Ranking, expected_score
+
+@pytest.fixture
+def store():
+    return StatsStore()
+
+def test_expected_score():
+    """Tests the Elo expected score"""
+    assert expected_score(1500, 1500) == 0.5
+    assert expected_score(1900, 1500) == pytest.approx(10 / 11)
+
+def test_record_game_updates_both_players(store):
+    """Tests whether counters and ratings of both players are updated"""
+    store.record_win("Alice", "Bob")
+    store.record_draw("Alice", "Bob")
+
+    alice, bob = store.get("Alice"), store.get("Bob")
+    assert (alice["wins"], alice["losses"], alice["draws"], alice["games"]) == (1, 0, 1, 2)
+    assert (bob["wins"], bob["losses"], bob["draws"], bob["games"]) == (0, 1, 1, 2)
+    assert alice["rating"] > DEFAULT_RATING > bob["rating"]
+    assert alice["rating"] + bob["rating"] == pytest.approx(2 * DEFAULT_RATING)
+
+def test_record_game_rejects_invalid(store):
+    """Tests whether invalid results are rejected"""
+    with pytest.raises(ValueError):
+        store.record_game("Alice", "Bob", 2)
+    with pytest.raises(ValueError):
+        store.record_win("Alice", "Alice")
+
+def test_leaderboard_and_rank(store):
+    """Tests whether the ranking follows the ratings"""
+    store.record_win("Alice", "Bob")
+    store.record_win("Alice", "Clara")
+    store.record_win("Clara", "Bob")
+
+    assert [entry["name"] for entry in store.leaderboard()] == ["Alice", "Clara", "Bob"]
+    assert [store.rank(name) for name in ["Alice", "Bob", "Clara"]] == [1, 3, 2]
+    assert store.rating("David") == DEFAULT_RATING
+
+def test_ranking_matches_sorted_list():
+    """Tests whether the skip list ranks like a sorted list under random updates"""
+    rng = random.Random(1)
+    ranking, expected = _Ranking(), []
+    for _ in range(2000):
+        if expected and rng.random() < 0.4:
+            value = expected.pop(rng.randrange(len(expected)))
+            ranking.remove(value)
+        else:
+            value = (rng.random(), rng.randrange(10))
+            ranking.insert(value)
+            expected.append(value)
+        expected.sort()
+        probe = (rng.random(), 0)
+        assert ranking.rank(probe) == sum(entry < probe for entry in expected)
+    assert list(ranking) == expected and len(ranking) == len(expected)
+    with pytest.raises(ValueError):
+        ranking.remove((2.0, 0))
+
+def test_journal_and_snapshot(tmp_path):
+    """Tests whether stats survive a restart, both from the journal and from a snapshot"""
+    path = str(tmp_path / "ratings.json")
+    store = StatsStore(path)
+    store.record_win("Alice", "Bob")
+    store.close()
+
+    reloaded = StatsStore(path)
+    assert reloaded.get("Alice") == store.get("Alice")
+
+    reloaded.save()
+    reloaded.record_draw("Alice", "Bob")
+    reloaded.close()
+    # A torn write at the end of the journal must be ignored
+    with open(reloaded.journal_path, "a") as f:
+        f.write('["Alice", "Bo')
+
+    final = StatsStore(path)
+    assert final.get("Bob") == reloaded.get("Bob")
+    assert len(os.listdir(tmp_path)) == 2
+
+def test_game_records_ratings(store, tmp_path):
+    """Tests whether a Game reports wins to its StatsStore"""
+    game = Game("Alice", "Bob", str(tmp_path / "stats.json"), ratings=store)
+    with mock.patch("builtins.input", mock.Mock(side_effect=["1", "4", "2", "5", "3"])):
+        with pytest.raises(TimeoutError):
+            while True:
+                game.make_move()
+
+    assert store.get("Alice")["wins"] == 1
+    assert store.get("Bob")["losses"] == 1
@@ -0,0 +1,81 @@
+import random
+
+import numpy as np
+import pytest
+
+from ttt.board import Board
+from ttt.search import AlphaBetaSearch
+from ttt.threats import ThreatSearch, ThreatTracker
+
+def cell(row, col):
+    """Helper function that returns the position of (row, col) on a 15 by 15 board"""
+    return row * 15 + col + 1
+
+def play(moves):
+    """Helper function that plays the given positions alternately with X and O"""
+    board = Board(size=15, k=5)
+    for i, position in enumerate(moves):
+        board.place(position, "XO"[i % 2])
+    return board
+
+# X has an open three in row 7
+OPEN_THREE = [cell(7, 7), cell(0, 0), cell(7, 8), cell(0, 14), cell(7, 9), cell(14, 0)]
+# X can make two open threes at once with (7, 9), but has no four yet
+DOUBLE_THREE = [cell(7, 7), cell(0, 0), cell(7, 8), cell(0, 14), cell(8, 9), cell(14, 0),
+                cell(9, 9), cell(14, 14)]
+
+def test_tracker_matches_rescan():
+    """Tests whether the incremental counts agree with counting from scratch"""
+    board = Board(size=9, k=5)
+    tracker = ThreatTracker(board)
+    random.seed(1)
+    moves = random.sample(range(1, 82), 30)
+    for i, position in enumerate(moves):
+        tracker.place(position, "XO"[i % 2])
+    for position in moves[:10]:
+        tracker.remove(position)
+
+    rescanned = ThreatTracker(board)
+    for marker in "XO":
+        assert np.array_equal(tracker.counts[marker], rescanned.counts[marker])
+    assert np.array_equal(tracker.empty, rescanned.empty)
+
+def test_threat_moves():
+    """Tests the detection of fours and threes"""
+    tracker = ThreatTracker(play(OPEN_THREE))
+
+    assert tracker.threat_counts("X")["threes"] == 3
+    assert tracker.winning_moves("X") == []
+    assert set(tracker.four_moves("X")) == {cell(7, 5), cell(7, 6), cell(7, 10), cell(7, 11)}
+
+    tracker.place(cell(7, 10), "X")
+    assert sorted(tracker.winning_moves("X")) == [cell(7, 6), cell(7, 11)]
+    assert tracker.threat_counts("X")["fours"] == 2
+
+def test_vcf_from_open_three():
+    """Tests whether an open three is converted into an open four"""
+    board = play(OPEN_THREE)
+    before = str(board)
+    line = ThreatSearch(board).find_vcf("X")
+
+    assert line is not None and line[0] in (cell(7, 6), cell(7, 10))
+    assert str(board) == before
+
+def test_no_vcf_for_defender():
+    """Tests whether no forced win is found for the player without threats"""
+    board = play(OPEN_THREE + [cell(1, 1)])
+    assert ThreatSearch(board).find_vcf("O") is None
+
+def test_vct_from_double_three():
+    """Tests whether a double three is found as a forced win by threats"""
+    search = ThreatSearch(play(DOUBLE_THREE))
+
+    assert search.find_vcf("X") is None
+    assert search.find_vct("X", time_limit=5) == [cell(7, 9)]
+
+def test_alpha_beta_uses_threat_search():
+    """Tests whether the alpha-beta search plays the forced win quickly"""
+    result = AlphaBetaSearch(time_limit=1).search(play(DOUBLE_THREE))
+
+    assert result.move == cell(7, 9)
+    assert result.elapsed < 0.5
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from ttt.board import Board
+from ttt.transposition import (EXACT, LOWER, SLOT_DTYPE, TranspositionTable, board_hash,
+                               zobrist_keys)
+
+@pytest.fixture
+def table():
+    return TranspositionTable(size=8)
+
+def test_slot_packing():
+    """Tests whether slots are packed without padding"""
+    assert SLOT_DTYPE.itemsize == 14
+    assert TranspositionTable.from_memory(1400).size == 100
+    assert TranspositionTable.from_memory(1400).nbytes <= 1400
+
+def test_store_and_probe(table):
+    """Tests whether stored results can be found again"""
+    table.store(12345, depth=3, value=-7, bound=LOWER, move=42)
+
+    assert table.probe(12345) == (-7, 3, LOWER, 42)
+    assert table.probe(12345 + 8) is None
+    assert len(table) == 1
+    assert (table.hits, table.probes) == (1, 2)
+
+def test_depth_preferred_replacement(table):
+    """Tests whether deeper results survive collisions with shallower ones"""
+    table.store(1, depth=5, value=10, bound=EXACT)
+    table.store(9, depth=2, value=20, bound=EXACT)
+    assert table.probe(1) == (10, 5, EXACT, 0)
+    assert table.probe(9) is None
+
+    table.store(9, depth=6, value=30, bound=EXACT)
+    assert table.probe(9) == (30, 6, EXACT, 0)
+
+    # Results for the same position always replace older ones
+    table.store(9, depth=1, value=40, bound=EXACT)
+    assert table.probe(9) == (40, 1, EXACT, 0)
+
+@pytest.mark.parametrize("mmap", [False, True])
+def test_save_and_load(table, tmp_path, mmap):
+    """Tests whether a saved table can be loaded or memory-mapped and used as a warm cache"""
+    table.store(2 ** 63 + 5, depth=4, value=1, bound=EXACT, move=3)
+    path = str(tmp_path / "tt.bin")
+    table.save(path)
+
+    loaded = TranspositionTable.load(path, mmap=mmap)
+    assert loaded.size == table.size
+    assert loaded.probe(2 ** 63 + 5) == (1, 4, EXACT, 3)
+
+    # The loaded table must accept new results without touching the file
+    loaded.store(7, depth=1, value=2, bound=EXACT)
+    assert loaded.probe(7) == (2, 1, EXACT, 0)
+    assert TranspositionTable.load(path).probe(7) is None
+
+def test_board_hash():
+    """Tests whether the Zobrist hash depends on markers and positions"""
+    keys = zobrist_keys(9)
+    board = Board()
+    assert board_hash(board, keys) == 0
+
+    board.place(5, "X")
+    assert board_hash(board, keys) == int(keys[4, 0])
+    board.place(1, "O")
+    assert board_hash(board, keys) == int(keys[4, 0] ^ keys[0, 1])
+    assert np.array_equal(keys, zobrist_keys(9))
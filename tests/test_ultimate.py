@@ -0,0 +1,81 @@
+import random
+
+import pytest
+
+from ttt.game import Game
+from ttt.player import AIPlayer
+from ttt.ultimate import ANY_BOARD, UltimateBoard, UltimateMCTS
+
+@pytest.fixture
+def board():
+    return UltimateBoard()
+
+def test_send_to_board(board):
+    """Tests whether a move sends the opponent to the board of its cell"""
+    assert len(board.legal_moves()) == 81
+    board.place(5, "X")  # Board 0, cell 4
+    assert board.next_board == 4
+    assert board.legal_moves() == list(range(37, 46))
+    with pytest.raises(ValueError):
+        board.place(10, "O")
+    with pytest.raises(ValueError):
+        board.place(82, "O")
+
+def test_small_board_win_updates_meta(board):
+    """Tests whether winning a small board claims it and frees the choice of board"""
+    board.bits["X"][0] = 0b011
+    board.bits["O"][0] = 0b001000
+    board.next_board = 0
+    board.place(3, "X")
+    assert board.meta["X"] == 0b1 and board.decided == 0b1
+    assert board.next_board == 2
+    board.place(19 + 8, "O")  # Cell 8 of board 2 sends X to board 8
+    board.place(73, "X")      # Cell 0 of board 8 sends O to board 0, which is decided
+    assert board.next_board == ANY_BOARD
+    assert all((position - 1) // 9 != 0 for position in board.legal_moves())
+
+def test_meta_win(board):
+    """Tests whether three small boards in a row win the game"""
+    board.meta["X"] = 0b011
+    board.decided = 0b011
+    board.bits["X"][2] = 0b011
+    board.next_board = 2
+    board.place(21, "X")
+    assert board.check_win() and board.legal_moves() == []
+
+def test_playouts_finish(board):
+    """Tests whether random playouts end with a result on a decided meta-board"""
+    rng = random.Random(0)
+    for i in range(50):
+        playout = board.copy()
+        winner = playout.playout("X", rng)
+        assert winner in ("X", "O", "")
+        assert playout.check_win() if winner else playout.check_full()
+    assert board.legal_moves() and board.last_move == 0
+
+def test_mcts_takes_winning_move(board):
+    """Tests whether the MCTS completes a winning line of small boards"""
+    board.meta["X"] = 0b011
+    board.decided = 0b011
+    board.bits["X"][2] = 0b011
+    board.bits["O"][2] = 0b110000
+    board.next_board = 2
+    board.last_marker = "O"
+    assert UltimateMCTS(playouts=300, seed=0)(board) == 21
+
+def test_mcts_without_playouts(board):
+    """Tests whether the MCTS plays a legal move without playouts and 0 after the game ended"""
+    assert UltimateMCTS(time_limit=0, seed=0)(board) in board.legal_moves()
+    assert UltimateMCTS(playouts=0, seed=0)(board) in board.legal_moves()
+
+    board.meta["X"] = 0b111
+    board.last_marker = "X"
+    assert UltimateMCTS(seed=0)(board) == 0
+
+def test_game_with_mcts(tmp_path):
+    """Tests whether Game can be played on an UltimateBoard against an MCTS player"""
+    game = Game("alice", AIPlayer("bot", "O", UltimateMCTS(playouts=50, seed=0)),
+                str(tmp_path / "stats.json"), board=UltimateBoard())
+    game.play(41)
+    game.make_move()
+    assert (game.board.last_move - 1) // 9 == 4
@@ -0,0 +1,136 @@
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+from ttt.solver import TablePolicy
+
+class MoveBatcher:
+    """This class collects AI move requests from many games and answers them in batches.
+
+    Asking the AI for one move at a time pays the fixed cost of a lookup (encoding the board,
+    indexing the table, numpy call overhead) once per move. A MoveBatcher instead queues
+    requests and lets a background thread take up to max_batch of them, or whatever arrived
+    within max_delay seconds of the first one, and evaluates them with a single vectorized
+    call. Every request gets its own Future, so each result goes back to the game that asked.
+
+    The batcher can be used as the policy of a ttt.player.AIPlayer (it is callable with a
+    Board), from asyncio code through self.request, or directly through self.submit.
+    """
+
+    def __init__(self, evaluate=None, max_batch=256, max_delay=0.002, shape=(3, 3)):
+        """Initializes the batcher and starts its worker thread.
+
+        Args:
+            evaluate (callable): Function mapping an array of grids of shape (n, *shape) to n
+                                 positions. Defaults to TablePolicy().batch, i.e. perfect play.
+            max_batch (int): The maximum number of requests evaluated together
+            max_delay (float): The maximum time in seconds a request waits for others to
+                               join its batch, i.e. the latency added by batching
+            shape (tuple): The shape of the grids of the boards evaluate accepts
+        """
+        if max_batch < 1 or max_delay < 0:
+            raise ValueError("max_batch must be positive and max_delay must not be negative.")
+        self.evaluate = evaluate if evaluate is not None else TablePolicy().batch
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.shape = tuple(shape)
+        self.requests = 0
+        self.batches = 0
+        self._queue = queue.SimpleQueue()
+        self._closed = False
+        self._lock = threading.Lock()
+        self._worker = threading.Thread(target=self._run, name="MoveBatcher", daemon=True)
+        self._worker.start()
+
+    def submit(self, board):
+        """Queues a request for the next move on the given board. The board is copied, so it
+        may be changed while the request is pending.
+
+        Args:
+            board (Board): The board to choose a move for
+
+        Returns:
+            Future: A future whose result is the chosen position
+
+        Raises:
+            ValueError, if the board doesn't have the shape of self.shape
+            RuntimeError, if the batcher is closed
+        """
+        if board.grid.shape != self.shape:
+            raise ValueError(f"Boards of shape {board.grid.shape} can't be batched with shape {self.shape}.")
+        future = Future()
+        # The lock makes sure no request is queued behind the stop signal of close
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("MoveBatcher is closed.")
+            self._queue.put((board.grid.copy(), future))
+        return future
+
+    def __call__(self, board):
+        """Returns the chosen position for board, waiting for its batch to be evaluated."""
+        return self.submit(board).result()
+
+    async def request(self, board):
+        """Coroutine version of __call__ for games driven by asyncio."""
+        return await asyncio.wrap_future(self.submit(board))
+
+    @property
+    def mean_batch_size(self):
+        """The average number of requests evaluated per batch so far."""
+        return self.requests / self.batches if self.batches else 0.0
+
+    def _collect(self, first):
+        """Gathers the requests joining the batch started by first. Returns the batch and
+        whether the batcher was closed meanwhile."""
+        batch = [first]
+        deadline = time.monotonic() + self.max_delay
+        while len(batch) < self.max_batch:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self):
+        """Worker loop evaluating batches until close is called."""
+        stop = False
+        while not stop:
+            first = self._queue.get()
+            if first is None:
+                break
+            batch, stop = self._collect(first)
+
+            try:
+                grids = np.stack([grid for grid, _ in batch])
+                moves = self.evaluate(grids)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            finally:
+                self.requests += len(batch)
+                self.batches += 1
+            for (_, future), move in zip(batch, moves):
+                future.set_result(int(move))
+
+    def close(self):
+        """Stops the worker thread after the pending requests have been answered."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        self._worker.join()
@@ -1,8 +1,10 @@
+from functools import lru_cache
+
 import numpy as np
 
 # Helper functions
 
-def position_to_coordinates(position):
+def position_to_coordinates(position, size=3):
     """Imagine you have a 3 by 3 numpy array and you introduce a numbering system to
     address each square in the array with a unique number like this:
      
@@ -19,8 +21,12 @@ def position_to_coordinates(position):
 
     For further information, please refer to the docstring of the Board class below.
 
+    Larger boards (see the size argument of the Board class) are numbered the same way, row
+    by row, from 1 to size * size.
+
     Args:
         position (int): The position on the board (see doctring of Board class)
+        size (int): The number of rows and columns of the board (default: 3)
 
     Returns:
         (row, col) (tuple): Tuple of integers, each ranging from 0 to 2, representing
@@ -30,8 +36,8 @@ def position_to_coordinates(position):
         >>> position_to_coordinates(5)
         <<< (1, 1)
     """
-    row = (position - 1) // 3
-    col = (position - 1) % 3
+    row = (position - 1) // size
+    col = (position - 1) % size
     return row, col
 
 def diagonal(grid):
@@ -56,6 +62,91 @@ def antidiagonal(grid):
     """
     return np.flipud(grid).diagonal()
 
+# Bitboard helpers
+#
+# Some parts of the code (game pools, solvers, snapshots) don't need a full numpy grid per
+# game and instead store the markers of one player as a 9 bit integer, where position p
+# (see the numbering in the docstring of the Board class) corresponds to bit p - 1.
+
+WIN_MASKS = (
+    0b000000111, 0b000111000, 0b111000000,  # rows
+    0b001001001, 0b010010010, 0b100100100,  # columns
+    0b100010001, 0b001010100,               # diagonal and antidiagonal
+)
+FULL_MASK = 0b111111111
+
+def is_winning_mask(bits):
+    """Function that checks whether a 9 bit mask contains a complete row, column, diagonal
+    or antidiagonal.
+
+    Args:
+        bits (int): The markers of one player as a 9 bit mask
+
+    Returns:
+        True, if bits contains one of the masks in WIN_MASKS, False otherwise.
+    """
+    return any(bits & mask == mask for mask in WIN_MASKS)
+
+def grid_to_mask(grid, marker):
+    """Function that packs the cells of a 3 by 3 grid holding the given marker into a 9 bit mask.
+
+    Args:
+        grid (np.ndarray): The 3 by 3 grid of a Board
+        marker (str): The marker ("X" or "O") to be packed
+
+    Returns:
+        int: The 9 bit mask, bit p - 1 being set if position p holds marker
+    """
+    bits = 0
+    for index, cell in enumerate(grid.flat):
+        if cell == marker:
+            bits |= 1 << index
+    return bits
+
+# Line geometry of the larger variants
+
+@lru_cache(maxsize=None)
+def line_windows(size, k):
+    """Function that lists every segment of k cells in a row, column or diagonal of a size by
+    size board, i.e. every place where a player could still win.
+
+    Args:
+        size (int): The number of rows and columns
+        k (int): The number of markers in a row needed to win
+
+    Returns:
+        np.ndarray: Array of shape (n, k) holding the flat (0-based) cell indices of each segment
+    """
+    cells = np.arange(size * size).reshape(size, size)
+    windows = []
+    for d_row, d_col in ((0, 1), (1, 0), (1, 1), (1, -1)):
+        for row in range(size):
+            for col in range(size):
+                end_row, end_col = row + (k - 1) * d_row, col + (k - 1) * d_col
+                if 0 <= end_row < size and 0 <= end_col < size:
+                    windows.append([cells[row + i * d_row, col + i * d_col] for i in range(k)])
+    windows = np.array(windows, dtype=np.intp).reshape(-1, k)
+    windows.flags.writeable = False
+    return windows
+
+@lru_cache(maxsize=None)
+def cell_windows(size, k):
+    """Function that lists, for every cell, the segments of line_windows(size, k) containing it.
+
+    Args:
+        size (int): The number of rows and columns
+        k (int): The number of markers in a row needed to win
+
+    Returns:
+        tuple: One array of segment indices per cell (0-based flat cell index)
+    """
+    windows = line_windows(size, k)
+    through = [[] for cell in range(size * size)]
+    for index, window in enumerate(windows):
+        for cell in window:
+            through[cell].append(index)
+    return tuple(np.array(indices, dtype=np.intp) for indices in through)
+
 class Board:
     """This class represents the playing field of a TicTacToe game. Since the players will have
     to be able to place markers (X and O) on the field, we introduce a way of numbering each
@@ -71,13 +162,16 @@ class Board:
      where (row, col) is a tuple of two integers, each ranging from 0 to 2, to a single integer
      that we will call 'position'. Please stick to this numbering convention throughout the whole
      exercise.
+
+     The same rules can be played on larger boards (the N by N, k-in-a-row variants, e.g.
+     "five in a row" on a 15 by 15 board). Positions are then numbered row by row from 1 to
+     N * N, and a player wins by placing k markers in a row, column or diagonal.
     """
 
-    def __init__(self):
-        """Initializes a new 3 by 3 board.
+    def __init__(self, size=3, k=None):
+        """Initializes a new board, by default the classic 3 by 3 board.
         
-        Since all new TicTacToe boards are the same, this function does not take any
-        arguments. Instead, it should initialize the following two class variables:
+        It should initialize the following two class variables:
 
         self.grid (np.ndarray): An empty numpy array of dtype str with shape (3, 3). Later,
                                 this will contain "X" and "O" markers.
@@ -89,19 +183,85 @@ class Board:
         self.last_move (int):   This stores the last position at which a marker was placed by
                                 a player. The value goes from 1 to 9 and should be initialized
                                 with value 0.
+
+        For the larger variants, self.size and self.k store the size of the board and the
+        number of markers in a row needed to win.
+
+        Args:
+            size (int): The number of rows and columns (default: 3)
+            k (int): The number of markers in a row needed to win (default: size)
         """
-        self.grid = np.empty((3, 3), dtype=str)
+        k = size if k is None else k
+        if size < 1 or not 1 <= k <= size:
+            raise ValueError("Board size must be positive and k must be between 1 and size.")
+        self.size = size
+        self.k = k
+        self.grid = np.empty((size, size), dtype=str)
         self.last_move = 0
 
+    @property
+    def grid(self):
+        """The size by size numpy array holding the markers. Assigning a new array invalidates the
+        cached string representation (see __str__). Markers should otherwise only be changed
+        through self.place, which keeps the cache up to date.
+        """
+        return self._grid
+
+    @grid.setter
+    def grid(self, value):
+        self._grid = value
+        self._rendered = None
+        self._dirty = set()
+
+    def _render(self):
+        """Renders the whole grid into a list of characters laid out like the numbering in the
+        docstring of this class, with a blank for empty cells."""
+        rows = []
+        for row in self._grid:
+            rows.append("|".join(f" {cell or ' '} " for cell in row))
+        return list(f"\n{'-' * (4 * self.size - 1)}\n".join(rows))
+
     def __str__(self):
-        """The string representation of this class. Since all information about a Board object that 
-        is of interest for the player is contained in self.grid, maybe it would be a good idea to
-        have this function return a nice and readable string-representation of the array.
+        """The string representation of this class, showing the markers in the same layout as the
+        numbering in the docstring of this class.
+
+        The characters of the last rendering are cached. Moves made through self.place only mark
+        their cell as dirty, so that only the changed cells are patched instead of formatting the
+        whole array again. The dirty cells are a set, and nothing is tracked before the first
+        rendering, so searches that place and remove markers without printing stay cheap.
 
         Returns:
             A string representing the class
         """
-        return str(self.grid)
+        if self._rendered is None:
+            self._rendered = self._render()
+        else:
+            for position in self._dirty:
+                row, col = position_to_coordinates(position, self.size)
+                self._rendered[8 * self.size * row + 4 * col + 1] = self._grid[row, col] or " "
+        self._dirty.clear()
+        return "".join(self._rendered)
+
+    def delta(self):
+        """Function that returns the last move in a compact form that can be sent to clients
+        instead of the whole board, e.g. "X5" if an X was placed at position 5.
+
+        Returns:
+            str: The marker and position of the last move, or "" if no move was made yet
+        """
+        if not self.last_move:
+            return ""
+        row, col = position_to_coordinates(self.last_move, self.size)
+        return f"{self._grid[row, col]}{self.last_move}"
+
+    def apply_delta(self, delta):
+        """Function that replays a move in the form returned by self.delta on this board.
+
+        Args:
+            delta (str): The move, e.g. "X5"
+        """
+        if delta:
+            self.place(int(delta[1:]), delta[0])
 
     def is_valid(self, position):
         """Checks whether an attempted move is valid, i.e., whether:
@@ -117,9 +277,10 @@ class Board:
         Returns:
             Nothing, either passes without error or raises an error
         """
-        if not (1 <= position <= 9):
-            raise ValueError("Position must be an integer between 1 and 9.")
-        row, col = position_to_coordinates(position)
+        cells = self.size * self.size
+        if not (1 <= position <= cells):
+            raise ValueError(f"Position must be an integer between 1 and {cells}.")
+        row, col = position_to_coordinates(position, self.size)
         if self.grid[row, col] != "":
             raise ValueError("Position already occupied.")
 
@@ -134,13 +295,15 @@ class Board:
             position (int): The position for the marker to be placed in
             marker (str): The marker (X or O) to be placed at the given position
         """
-        row, col = position_to_coordinates(position)
+        row, col = position_to_coordinates(position, self.size)
         self.is_valid(position) 
         self.grid[row, col] = marker
         self.last_move = position
+        if self._rendered is not None:
+            self._dirty.add(position)
 
     def show_marker(self, marker):
-        """Function that returns a 3 by 3 array of booleans, which is True at (i, j) if self.grid[i, j] == marker
+        """Function that returns a size by size array of booleans, which is True at (i, j) if self.grid[i, j] == marker
         and False otherwise.
         
         Args:
@@ -166,12 +329,21 @@ class Board:
         Hint: You don't need to check the entire board for a win. Use the position of the last move stored
               in self.last_move
 
+        On the larger variants where self.k is smaller than self.size, the markers in a row are
+        counted outwards from the last move in each of the four directions instead.
+
         Returns:
             True, if a win has occurred, False otherwise.
         """
-        row, col = position_to_coordinates(self.last_move)
+        if not self.last_move:
+            return False
+        row, col = position_to_coordinates(self.last_move, self.size)
         marker = self.grid[row, col]
 
+        if self.k < self.size:
+            return any(self._run_length(row, col, d_row, d_col, marker) >= self.k
+                       for d_row, d_col in ((0, 1), (1, 0), (1, 1), (1, -1)))
+
         if all(self.grid[row, :] == marker):
             return True
 
@@ -182,11 +354,22 @@ class Board:
         if row == col and all(np.diagonal(self.grid) == marker):
             return True
 
-        if row + col == 2 and all(np.flipud(self.grid).diagonal() == marker):
+        if row + col == self.size - 1 and all(np.flipud(self.grid).diagonal() == marker):
             return True
 
         return False
 
+    def _run_length(self, row, col, d_row, d_col, marker):
+        """Counts the markers in the line through (row, col) in direction (d_row, d_col) that
+        are connected to (row, col), which must hold marker itself."""
+        count = 1
+        for sign in (1, -1):
+            r, c = row + sign * d_row, col + sign * d_col
+            while 0 <= r < self.size and 0 <= c < self.size and self.grid[r, c] == marker:
+                count += 1
+                r, c = r + sign * d_row, c + sign * d_col
+        return count
+
     def check_full(self):
         """Function that checks whether the board is completely filled with markers. If it is,
         the function returns True. Otherwise, it returns False.
@@ -195,3 +378,34 @@ class Board:
             True, if the board is full. False otherwise.
         """
         return not "" in self.grid
+
+    def remove(self, position, last_move=0):
+        """Function that takes back the marker at a given position, e.g. when a search has finished
+        looking at a move. The position is not checked for validity.
+
+        Args:
+            position (int): The position to be cleared
+            last_move (int): The value self.last_move had before the marker was placed (default: 0)
+        """
+        row, col = position_to_coordinates(position, self.size)
+        self.grid[row, col] = ""
+        self.last_move = last_move
+        if self._rendered is not None:
+            self._dirty.add(position)
+
+    def windows(self):
+        """Returns the segments of k cells a player could win in (see line_windows). Searches
+        use this method instead of line_windows, so that other boards can define their lines."""
+        return line_windows(self.size, self.k)
+
+    def windows_through(self):
+        """Returns, for every cell, the indices of the segments of self.windows containing it."""
+        return cell_windows(self.size, self.k)
+
+    def empty_positions(self):
+        """Function that returns all positions that are not occupied yet.
+
+        Returns:
+            list: The free positions in increasing order
+        """
+        return [int(index) + 1 for index in np.flatnonzero(self.grid.ravel() == "")]
@@ -0,0 +1,249 @@
+#!/bin/env python3
+
+import argparse
+import itertools
+import time
+
+import numpy as np
+
+from ttt.board import Board
+from ttt.search import AlphaBetaSearch, candidate_moves, marker_to_move
+from ttt.shared import load_arrays, save_arrays
+from ttt.transposition import zobrist_keys
+
+# An opening book stores the best move of the positions of the first few plies, found by an
+# offline search (see OpeningBook.build), so that an AlphaBetaSearch can answer them without
+# searching. Rotating or mirroring a position doesn't change its best move, so only the
+# canonical variant of each position is stored: the one whose Zobrist hash is the smallest
+# among all its symmetric variants (compare ttt.solver.canonical_code for the 3 by 3 board).
+
+# One entry of the book: 14 bytes without padding. Moves are stored in the coordinates of the
+# canonical position; empty slots have move 0.
+BOOK_DTYPE = np.dtype([("key", np.uint64), ("move", np.uint16), ("score", np.int16),
+                       ("depth", np.uint8), ("plies", np.uint8)])
+
+# Helper functions
+
+def grid_symmetries(shape):
+    """Function that returns the rotations and reflections of a square (or cubic) grid, i.e.
+    all combinations of permuting its axes and flipping some of them: 8 for a square board
+    and 48 for the 4 by 4 by 4 board of ttt.qubic. They map rows, columns and diagonals to
+    rows, columns and diagonals, so they don't change the value of a position.
+
+    Args:
+        shape (tuple): The shape of the grid, with all dimensions equal
+
+    Returns:
+        np.ndarray: Array of shape (symmetries, cells). Cell i of the transformed grid holds
+                    the marker of cell perms[s, i] of the original grid.
+    """
+    if len(set(shape)) != 1:
+        raise ValueError("Only grids with equal dimensions have symmetries.")
+    cells = np.arange(int(np.prod(shape))).reshape(shape)
+    perms = set()
+    for axes in itertools.permutations(range(len(shape))):
+        for flips in itertools.product([False, True], repeat=len(shape)):
+            transformed = cells.transpose(axes)
+            for axis, flip in enumerate(flips):
+                if flip:
+                    transformed = np.flip(transformed, axis)
+            perms.add(tuple(int(i) for i in transformed.ravel()))
+    return np.array(sorted(perms), dtype=np.intp)
+
+class OpeningBook:
+    """This class looks up precomputed best moves by canonical position. The entries are kept
+    in a single numpy array of BOOK_DTYPE used as an open-addressing hash table (linear
+    probing, at most half full), so a lookup costs one hash per symmetry and a few slot
+    reads, however large the book is. Like a TranspositionTable, the array can be saved to
+    a file and read with a single read or memory-mapped at startup.
+
+    A book is only valid for boards of the shape and k it was built for, and for the seed of
+    its Zobrist keys; self.lookup returns None for other boards.
+    """
+
+    def __init__(self, slots, shape, k, seed=0):
+        """Initializes a book.
+
+        Args:
+            slots (np.ndarray): The hash table, an array of BOOK_DTYPE whose length is a power of two
+            shape (tuple): The shape of the grid of the boards the book is for
+            k (int): The number of markers in a row needed to win
+            seed (int): The seed of the Zobrist keys (see ttt.transposition.zobrist_keys)
+        """
+        if len(slots) & (len(slots) - 1):
+            raise ValueError("The number of slots must be a power of two.")
+        self.slots = slots
+        self.shape = tuple(int(n) for n in shape)
+        self.k = int(k)
+        self.seed = int(seed)
+        self.perms = grid_symmetries(self.shape)
+        self._inverse = np.argsort(self.perms, axis=1)
+        # Row 0 of the key for every cell stands for an empty cell and leaves the hash unchanged
+        keys = zobrist_keys(self.perms.shape[1], self.seed)
+        self._keys = np.concatenate([np.zeros((len(keys), 1), dtype=np.uint64), keys], axis=1)
+        self._cells = np.arange(self.perms.shape[1])
+        self.hits = 0
+        self.probes = 0
+
+    def __len__(self):
+        """Returns the number of positions in the book."""
+        return int(np.count_nonzero(self.slots["move"]))
+
+    def canonical(self, board):
+        """Function that finds the canonical variant of a position.
+
+        Args:
+            board (Board): The position
+
+        Returns:
+            (key, index) (tuple): The Zobrist hash of the canonical variant and the index of
+                                  the symmetry in self.perms that produces it from board
+        """
+        flat = board.grid.ravel()
+        codes = (flat == "X") + 2 * (flat == "O")
+        hashes = np.bitwise_xor.reduce(self._keys[self._cells, codes[self.perms]], axis=1)
+        index = int(np.argmin(hashes))
+        return int(hashes[index]), index
+
+    def _find(self, key):
+        """Returns the slot index holding key, or of the empty slot where it would go."""
+        mask = len(self.slots) - 1
+        index = key & mask
+        while self.slots[index]["move"] and self.slots[index]["key"] != key:
+            index = (index + 1) & mask
+        return index
+
+    def lookup(self, board):
+        """Looks up the book move of a position.
+
+        Args:
+            board (Board): The position
+
+        Returns:
+            (move, score, depth) (tuple): The stored result of the search, with the move in the
+                                          coordinates of board, or None if the position is not
+                                          in the book
+        """
+        if board.grid.shape != self.shape or board.k != self.k:
+            return None
+        self.probes += 1
+        key, index = self.canonical(board)
+        slot = self.slots[self._find(key)]
+        if not slot["move"]:
+            return None
+        move = int(self.perms[index, int(slot["move"]) - 1]) + 1
+        if board.grid.flat[move - 1] != "":
+            return None  # A hash collision with a position that isn't in the book
+        self.hits += 1
+        return move, int(slot["score"]), int(slot["depth"])
+
+    @classmethod
+    def from_entries(cls, entries, shape, k, seed=0):
+        """Creates a book from entries of canonical positions.
+
+        Args:
+            entries (dict): Maps the key of a canonical position to its (move, score, depth,
+                            plies), with the move in canonical coordinates
+            shape (tuple): The shape of the grid
+            k (int): The number of markers in a row needed to win
+            seed (int): The seed of the Zobrist keys
+
+        Returns:
+            OpeningBook: The book
+        """
+        size = 1 << max(2 * len(entries) - 1, 1).bit_length()
+        book = cls(np.zeros(size, dtype=BOOK_DTYPE), shape, k, seed)
+        for key, entry in entries.items():
+            book.slots[book._find(key)] = (key,) + tuple(entry)
+        return book
+
+    @classmethod
+    def build(cls, board, plies, search, radius=1):
+        """Function that builds a book offline: every position reachable from board within
+        plies moves (only trying moves near existing markers, see candidate_moves) is searched
+        once per symmetry class, and the best move found is stored.
+
+        Args:
+            board (Board): The starting position, usually an empty board. It is modified during
+                           the build, but restored before this method returns.
+            plies (int): The number of moves from board to include
+            search (AlphaBetaSearch): The search that finds the best moves, e.g. with a longer
+                                      time limit than in play. Its seed is used for the keys.
+            radius (int): The radius of the moves tried from each position
+
+        Returns:
+            OpeningBook: The book
+        """
+        book = cls(np.zeros(1, dtype=BOOK_DTYPE), board.grid.shape, board.k, search.seed)
+        entries = {}
+
+        def visit(ply):
+            key, index = book.canonical(board)
+            if key in entries:
+                return
+            result = search.search(board)
+            if not result.move:
+                return
+            canonical_move = int(book._inverse[index, result.move - 1]) + 1
+            entries[key] = (canonical_move, result.score, result.depth, ply)
+            if ply + 1 >= plies:
+                return
+            marker = marker_to_move(board)
+            for move in candidate_moves(board, radius):
+                previous = board.last_move
+                board.place(move, marker)
+                try:
+                    if not board.check_win() and not board.check_full():
+                        visit(ply + 1)
+                finally:
+                    board.remove(move, previous)
+
+        if plies > 0 and not board.check_win() and not board.check_full():
+            visit(0)
+        return cls.from_entries(entries, board.grid.shape, board.k, search.seed)
+
+    def save(self, path):
+        """Writes the book to a file that can be read by OpeningBook.load.
+
+        Args:
+            path (str): The name of the file
+        """
+        save_arrays(path, {"slots": self.slots, "shape": np.array(self.shape, dtype=np.int64),
+                           "rules": np.array([self.k, self.seed], dtype=np.int64)})
+
+    @classmethod
+    def load(cls, path, mmap=False):
+        """Loads a book written by self.save.
+
+        Args:
+            path (str): The name of the file
+            mmap (bool): If True, the slots are memory-mapped read-only instead of read into
+                         memory, so the pages are shared with other processes using the book
+
+        Returns:
+            OpeningBook: The book
+        """
+        arrays = load_arrays(path)
+        k, seed = (int(value) for value in arrays["rules"])
+        slots = arrays["slots"] if mmap else np.array(arrays["slots"])
+        return cls(slots, tuple(arrays["shape"]), k, seed)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build an opening book for an N by N, k-in-a-row board.")
+    parser.add_argument("--size", type=int, default=15)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--plies", type=int, default=3, help="number of opening moves to cover")
+    parser.add_argument("--time", type=float, default=1.0, help="search time per position in seconds")
+    parser.add_argument("--depth", type=int, default=64, help="maximum search depth")
+    parser.add_argument("--output", default="book.bin")
+    args = parser.parse_args(argv)
+
+    start = time.monotonic()
+    book = OpeningBook.build(Board(args.size, args.k), args.plies,
+                             AlphaBetaSearch(time_limit=args.time, max_depth=args.depth))
+    book.save(args.output)
+    print(f"{len(book)} positions in {time.monotonic() - start:.1f} s, "
+          f"{book.slots.nbytes} bytes of entries written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+import os
+import struct
+import zlib
+
+import numpy as np
+
+from ttt.board import Board
+from ttt.clock import GameClock
+from ttt.game import Game
+from ttt.qubic import QubicBoard
+
+# Every record of the log is a header (payload length, CRC-32 of the payload) followed by the
+# payload, which starts with the game id and the record kind.
+
+RECORD_HEADER = struct.Struct("<II")
+PAYLOAD_HEADER = struct.Struct("<QB")
+SNAPSHOT = 1
+TOMBSTONE = 2
+
+# A snapshot continues with the board size, k, last move, the index of the player to move
+# (0 or 1) and flags, then the X and O cells as bit fields, the optional clock and the names
+# (or the ids of the players in a ttt.registry.PlayerRegistry). With the CUBE flag, the board
+# is a ttt.qubic.QubicBoard with size ** 3 cells instead of size ** 2.
+GAME_HEADER = struct.Struct("<BBHBB")
+CLOCK = struct.Struct("<ddd")
+NAME_LENGTHS = struct.Struct("<HH")
+PLAYER_IDS = struct.Struct("<II")
+HAS_CLOCK = 1
+HAS_IDS = 2
+CUBE = 4
+
+# Helper functions
+
+def pack_game(game, registry=None):
+    """Function that packs the state of a game into a few bytes: the board as two bit fields,
+    the last move, the player to move, the clock (remaining times and increment) and the names.
+
+    Args:
+        game (Game): The game to pack
+        registry (PlayerRegistry): If given, the players' ids are stored instead of their names
+
+    Returns:
+        bytes: The packed game, see unpack_game
+
+    Raises:
+        ValueError, if the game is not played on a Board or a QubicBoard
+    """
+    board = game.board
+    if not isinstance(board, (Board, QubicBoard)):
+        raise ValueError(f"Games on a {type(board).__name__} can't be checkpointed.")
+    flat = board.grid.ravel()
+    flags = (HAS_CLOCK if game.clock is not None else 0) | (HAS_IDS if registry is not None else 0) \
+        | (CUBE if isinstance(board, QubicBoard) else 0)
+    parts = [GAME_HEADER.pack(board.size, board.k, board.last_move,
+                              0 if game._current is game.player1 else 1, flags),
+             np.packbits(flat == "X", bitorder="little").tobytes(),
+             np.packbits(flat == "O", bitorder="little").tobytes()]
+    if game.clock is not None:
+        clock = game.clock
+        parts.append(CLOCK.pack(clock.time_left(0), clock.time_left(1), clock.increment))
+    if registry is not None:
+        parts.append(PLAYER_IDS.pack(registry.id(game.player1.name), registry.id(game.player2.name)))
+    else:
+        name1, name2 = game.player1.name.encode(), game.player2.name.encode()
+        parts += [NAME_LENGTHS.pack(len(name1), len(name2)), name1, name2]
+    return b"".join(parts)
+
+def unpack_game(data, statsfile="stats.json", ratings=None, players=None, registry=None):
+    """Function that recreates a game packed by pack_game. A clock is restarted for the
+    player to move with the time they had left when the game was packed.
+
+    Args:
+        data (bytes): The packed game
+        statsfile (str): The stats file of the new Game
+        ratings (StatsStore): The StatsStore of the new Game
+        players (dict): Player objects to use (e.g. AIPlayers), keyed by name. Other players
+                        are created as plain Players, or taken from registry.
+        registry (PlayerRegistry): The registry of the player ids, required if the game was
+                                   packed with one
+
+    Returns:
+        Game: The restored game
+
+    Raises:
+        ValueError, if the game was packed with player ids but no registry is given
+    """
+    size, k, last_move, current, flags = GAME_HEADER.unpack_from(data)
+    offset = GAME_HEADER.size
+    cells = size ** 3 if flags & CUBE else size * size
+    length = (cells + 7) // 8
+    x = np.unpackbits(np.frombuffer(data, np.uint8, length, offset), count=cells, bitorder="little")
+    o = np.unpackbits(np.frombuffer(data, np.uint8, length, offset + length), count=cells, bitorder="little")
+    offset += 2 * length
+
+    clock = None
+    if flags & HAS_CLOCK:
+        remaining1, remaining2, increment = CLOCK.unpack_from(data, offset)
+        offset += CLOCK.size
+        clock = GameClock(max(remaining1, remaining2, 1.0), increment)
+        clock.remaining = [remaining1, remaining2]
+        clock.turn = current
+
+    if flags & HAS_IDS:
+        if registry is None:
+            raise ValueError("The game was packed with player ids, a registry is needed.")
+        name1, name2 = (registry.name(player_id) for player_id in PLAYER_IDS.unpack_from(data, offset))
+    else:
+        length1, length2 = NAME_LENGTHS.unpack_from(data, offset)
+        offset += NAME_LENGTHS.size
+        name1 = data[offset:offset + length1].decode()
+        name2 = data[offset + length1:offset + length1 + length2].decode()
+    players = players or {}
+    player1 = players.get(name1) or name1
+    player2 = players.get(name2) or name2
+
+    game = Game(player1, player2, statsfile, ratings, clock=clock, registry=registry)
+    grid = np.where(x, "X", np.where(o, "O", ""))
+    if flags & CUBE:
+        board = QubicBoard()
+        for marker in "XO":
+            for index in np.flatnonzero(grid == marker):
+                board.place(int(index) + 1, marker)
+    else:
+        board = Board(size, k)
+        board.grid = grid.reshape(size, size)
+    board.last_move = last_move
+    game.board = board
+    game._current = game.player2 if current else game.player1
+    return game
+
+class CheckpointLog:
+    """This class keeps the games in progress safe across crashes. Snapshots of games (see
+    pack_game) are appended to a write-ahead log after every move, and a tombstone record is
+    appended when a game ends. Each record carries a CRC-32, so a record torn by a crash is
+    detected and cut off when the log is opened again.
+
+    Only the latest snapshot of each game matters. Once the log holds compact_ratio times more
+    records than live games, it is compacted: the live snapshots are written to a new file,
+    which atomically replaces the log.
+    """
+
+    def __init__(self, path, compact_ratio=4, min_records=1024, fsync=False, registry=None):
+        """Opens the log, reading the snapshots already in it.
+
+        Args:
+            path (str): The log file (created if necessary)
+            compact_ratio (int): Compact when there are this many records per live game
+            min_records (int): Never compact logs with fewer records than this
+            fsync (bool): Whether every record is forced to disk (slower, but also survives
+                          power failures and not only crashes of the process)
+            registry (PlayerRegistry): If given, snapshots store player ids instead of names
+        """
+        self.path = path
+        self.registry = registry
+        self.compact_ratio = compact_ratio
+        self.min_records = min_records
+        self.fsync = fsync
+        self.snapshots = {}
+        self.records = 0
+        self._file = None
+        self._read()
+        self._file = open(path, "ab")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        """Returns the number of live games."""
+        return len(self.snapshots)
+
+    def _read(self):
+        """Reads all complete records and drops a torn tail."""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as f:
+            data = f.read()
+        offset = 0
+        while offset + RECORD_HEADER.size <= len(data):
+            length, checksum = RECORD_HEADER.unpack_from(data, offset)
+            start = offset + RECORD_HEADER.size
+            payload = data[start:start + length]
+            if len(payload) < length or zlib.crc32(payload) != checksum:
+                break
+            game_id, kind = PAYLOAD_HEADER.unpack_from(payload)
+            if kind == SNAPSHOT:
+                self.snapshots[game_id] = payload[PAYLOAD_HEADER.size:]
+            else:
+                self.snapshots.pop(game_id, None)
+            self.records += 1
+            offset = start + length
+        # Drop an incomplete record left behind by a crashed process
+        if offset != len(data):
+            os.truncate(self.path, offset)
+
+    def _append(self, game_id, kind, data=b""):
+        payload = PAYLOAD_HEADER.pack(game_id, kind) + data
+        self._file.write(RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload)
+        self.records += 1
+        self.flush()
+
+    def checkpoint(self, game_id, game):
+        """Appends a snapshot of a game.
+
+        Args:
+            game_id (int): A non-negative id identifying the game
+            game (Game): The game
+        """
+        data = pack_game(game, self.registry)
+        self.snapshots[game_id] = data
+        self._append(game_id, SNAPSHOT, data)
+        if self.records >= max(self.min_records, self.compact_ratio * len(self.snapshots)):
+            self.compact()
+
+    def end(self, game_id):
+        """Appends a tombstone for a game that ended, so it isn't restored."""
+        if self.snapshots.pop(game_id, None) is not None:
+            self._append(game_id, TOMBSTONE)
+
+    def flush(self):
+        """Writes buffered records to the operating system (and to disk if fsync is set)."""
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def compact(self):
+        """Rewrites the log with only the latest snapshot of every live game."""
+        self.close()
+        temporary = self.path + ".tmp"
+        with open(temporary, "wb") as f:
+            for game_id, data in self.snapshots.items():
+                payload = PAYLOAD_HEADER.pack(game_id, SNAPSHOT) + data
+                f.write(RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, self.path)
+        self.records = len(self.snapshots)
+        self._file = open(self.path, "ab")
+
+    def restore(self, statsfile="stats.json", ratings=None, players=None):
+        """Recreates all live games (see unpack_game for the arguments).
+
+        Returns:
+            dict: The games keyed by their ids
+        """
+        return {game_id: unpack_game(data, statsfile, ratings, players, self.registry)
+                for game_id, data in self.snapshots.items()}
+
+    def close(self):
+        """Closes the log file."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,260 @@
+import math
+import time
+
+class GameClock:
+    """This class is a chess clock for the two players of a game. Each player starts with base
+    seconds; after every move, the increment is added to the time of the player who moved and
+    the other player's time starts running. Times are measured with time.monotonic, so they
+    aren't affected by changes of the system clock.
+
+    Index 0 is player 1 (X), index 1 is player 2 (O).
+    """
+
+    def __init__(self, base, increment=0.0, now=time.monotonic):
+        """Initializes the clock. It doesn't run until self.start is called.
+
+        Args:
+            base (float): The initial time of each player in seconds
+            increment (float): The time added after each move in seconds
+            now (callable): The time source (default: time.monotonic)
+        """
+        if base <= 0 or increment < 0:
+            raise ValueError("The base time must be positive and the increment can't be negative.")
+        self.remaining = [float(base), float(base)]
+        self.increment = float(increment)
+        self.turn = 0
+        self.on_press = None
+        self._now = now
+        self._started = None
+
+    def start(self):
+        """Starts the time of the player to move."""
+        if self._started is None:
+            self._started = self._now()
+
+    @property
+    def running(self):
+        return self._started is not None
+
+    def time_left(self, player=None):
+        """Returns the remaining time of a player (default: the player to move) in seconds,
+        which is negative once they ran out of time."""
+        player = self.turn if player is None else player
+        if player == self.turn and self._started is not None:
+            return self.remaining[player] - (self._now() - self._started)
+        return self.remaining[player]
+
+    def deadline(self):
+        """Returns the time (of the clock's time source) at which the player to move runs out
+        of time, or math.inf if the clock isn't running."""
+        if self._started is None:
+            return math.inf
+        return self._started + self.remaining[self.turn]
+
+    def flagged(self):
+        """Returns whether the player to move has run out of time."""
+        return self.time_left() <= 0
+
+    def press(self):
+        """Ends the move of the player to move: stops their time, adds the increment and starts
+        the other player's time. Calls self.on_press (if set) without arguments afterwards."""
+        now = self._now()
+        if self._started is not None:
+            self.remaining[self.turn] -= now - self._started
+        self.remaining[self.turn] += self.increment
+        self.turn ^= 1
+        self._started = now
+        if self.on_press is not None:
+            self.on_press()
+
+class Timer:
+    """A callback scheduled on a TimerWheel. Keep it to cancel the callback."""
+
+    __slots__ = ("deadline", "callback", "args", "_tick", "_slot")
+
+    def __init__(self, deadline, callback, args, tick):
+        self.deadline = deadline
+        self.callback = callback
+        self.args = args
+        self._tick = tick
+        self._slot = None
+
+    @property
+    def active(self):
+        """Whether the timer is still scheduled."""
+        return self._slot is not None
+
+class TimerWheel:
+    """This class schedules callbacks for many deadlines at once, e.g. the flag falls of all
+    running games, in a hierarchical timing wheel. Time is divided into ticks of resolution
+    seconds. Level 0 has one slot per tick for the next slots ticks, level 1 one slot per
+    slots ticks, and so on. A timer is put into the lowest level whose range covers its
+    deadline and moves down one level whenever the wheel reaches its slot, so scheduling and
+    cancelling take constant time and advancing only touches the timers that are due.
+
+    Timers never fire early, but up to one tick late. Nothing runs in the background: callbacks
+    are called from self.advance, which the owner calls regularly (e.g. from its event loop).
+    """
+
+    def __init__(self, resolution=0.01, slots=256, levels=4, now=time.monotonic):
+        """Initializes the wheel.
+
+        Args:
+            resolution (float): The length of a tick in seconds
+            slots (int): The number of slots per level
+            levels (int): The number of levels. Deadlines further away than
+                          resolution * slots ** levels seconds are rescheduled on the way.
+            now (callable): The time source (default: time.monotonic)
+        """
+        self.resolution = resolution
+        self.slots = slots
+        self.levels = levels
+        self._now = now
+        self._wheels = [[{} for slot in range(slots)] for level in range(levels)]
+        self._tick = int(now() / resolution)
+        self._count = 0
+
+    def __len__(self):
+        """Returns the number of scheduled timers."""
+        return self._count
+
+    def schedule(self, deadline, callback, *args):
+        """Schedules callback(*args) for the given time.
+
+        Args:
+            deadline (float): The time (of the wheel's time source) to call the callback at
+            callback (callable): The function to call
+            *args: Its arguments
+
+        Returns:
+            Timer: The timer, which can be passed to self.cancel
+        """
+        if math.isinf(deadline):
+            raise ValueError("A timer needs a finite deadline.")
+        tick = max(math.ceil(deadline / self.resolution), self._tick + 1)
+        timer = Timer(deadline, callback, args, tick)
+        self._insert(timer)
+        self._count += 1
+        return timer
+
+    def cancel(self, timer):
+        """Removes a timer if it hasn't fired yet. Returns whether it was still scheduled."""
+        if timer._slot is None:
+            return False
+        del timer._slot[timer]
+        timer._slot = None
+        self._count -= 1
+        return True
+
+    def _insert(self, timer):
+        """Puts a timer into the slot of the lowest level that covers its tick."""
+        delta = timer._tick - self._tick
+        span = 1
+        for level in range(self.levels):
+            if delta < span * self.slots or level == self.levels - 1:
+                slot = self._wheels[level][(timer._tick // span) % self.slots]
+                break
+            span *= self.slots
+        slot[timer] = None
+        timer._slot = slot
+
+    def advance(self, now=None):
+        """Moves the wheel forward to the current time and calls the callbacks of all timers
+        that are due, in the order of their ticks.
+
+        Args:
+            now (float): The current time (default: the wheel's time source)
+
+        Returns:
+            int: The number of callbacks called
+        """
+        target = int((self._now() if now is None else now) / self.resolution)
+        fired = 0
+        while self._tick < target:
+            if self._count == 0:
+                self._tick = target
+                break
+            self._tick += 1
+            tick = self._tick
+
+            # Move the timers of the higher levels whose slot has come down one level
+            span = self.slots ** (self.levels - 1)
+            for level in range(self.levels - 1, 0, -1):
+                if tick % span == 0:
+                    slot = self._wheels[level][(tick // span) % self.slots]
+                    timers = list(slot)
+                    slot.clear()
+                    for timer in timers:
+                        self._insert(timer)
+                span //= self.slots
+
+            slot = self._wheels[0][tick % self.slots]
+            due = list(slot)
+            slot.clear()
+            for timer in due:
+                timer._slot = None
+                self._count -= 1
+            for timer in due:
+                timer.callback(*timer.args)
+            fired += len(due)
+        return fired
+
+class FlagWatcher:
+    """This class watches the clocks of many games with a single TimerWheel. For every game,
+    exactly one timer is scheduled at the deadline of the player to move and moved whenever the
+    clock is pressed. When it fires, the game's handle_timeout method ends the game, and
+    on_flag(game, error) is called with the TimeoutError it raised.
+    """
+
+    def __init__(self, wheel=None, on_flag=None):
+        """Initializes the watcher.
+
+        Args:
+            wheel (TimerWheel): The wheel to use (default: a new one)
+            on_flag (callable): Called as on_flag(game, error) when a player runs out of time
+        """
+        self.wheel = wheel if wheel is not None else TimerWheel()
+        self.on_flag = on_flag
+        self._timers = {}
+
+    def __len__(self):
+        """Returns the number of watched games."""
+        return len(self._timers)
+
+    def watch(self, game):
+        """Starts watching a game with a clock (see Game). Its clock is started if necessary."""
+        game.clock.start()
+        game.clock.on_press = lambda: self._schedule(game)
+        self._schedule(game)
+
+    def unwatch(self, game):
+        """Stops watching a game, e.g. because it ended."""
+        timer = self._timers.pop(id(game), None)
+        if timer is not None:
+            self.wheel.cancel(timer)
+            game.clock.on_press = None
+
+    def advance(self, now=None):
+        """Advances the wheel (see TimerWheel.advance). Returns the number of timers fired."""
+        return self.wheel.advance(now)
+
+    def _schedule(self, game):
+        timer = self._timers.get(id(game))
+        if timer is not None:
+            self.wheel.cancel(timer)
+        self._timers[id(game)] = self.wheel.schedule(game.clock.deadline(), self._expire, game)
+
+    def _expire(self, game):
+        if game.finished:
+            # The game ended otherwise, e.g. by a win, without being unwatched
+            self.unwatch(game)
+            return
+        try:
+            game.handle_timeout()
+        except TimeoutError as e:
+            self.unwatch(game)
+            if self.on_flag is not None:
+                self.on_flag(game, e)
+        else:
+            # The wheel's tick is a little ahead of the clock; check again shortly
+            self._schedule(game)
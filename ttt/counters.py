@@ -0,0 +1,138 @@
+#!/bin/env python3
+
+import argparse
+import json
+import socket
+
+from ttt.journal import atomic_write, read_journal
+
+# Each game host counts the wins of the players in its own node file. A node file is a journal
+# with one JSON line ["node", "player", wins] per update, holding the new total of that node's
+# counter for the player. The counters only grow, so the latest value of a (node, player)
+# pair is also the largest one, and files can be combined like a grow-only counter (G-counter)
+# CRDT: take the maximum per (node, player), then add up the nodes per player. Merging is
+# idempotent and order independent, so the same file can be merged twice, and node files,
+# copies of them and merged files can be mixed freely.
+
+# Helper functions
+
+def read_counters(path, counters=None):
+    """Function that streams the lines of a node file (or a merged file) into a dictionary,
+    keeping the largest value per node and player. Incomplete last lines, which a crashed
+    host may leave behind, are ignored.
+
+    Args:
+        path (str): The file to read
+        counters (dict): The dictionary to merge into (default: a new one)
+
+    Returns:
+        dict: The counters keyed by (node, player)
+    """
+    counters = {} if counters is None else counters
+    with open(path, "r") as f:
+        for line in f:
+            if not line.endswith("\n"):
+                break
+            node, player, wins = json.loads(line)
+            key = (node, player)
+            if wins > counters.get(key, 0):
+                counters[key] = wins
+    return counters
+
+def merge_counters(paths):
+    """Function that merges any number of node files in time linear in their size.
+
+    Args:
+        paths (list): The files to merge
+
+    Returns:
+        (counters, totals) (tuple): The merged counters keyed by (node, player), and the total
+                                    wins of every player over all nodes
+    """
+    counters = {}
+    for path in paths:
+        read_counters(path, counters)
+    totals = {}
+    for (node, player), wins in counters.items():
+        totals[player] = totals.get(player, 0) + wins
+    return counters, totals
+
+def write_counters(path, counters):
+    """Function that writes counters (as returned by merge_counters) in the node file format,
+    replacing the file atomically."""
+    with atomic_write(path) as f:
+        for (node, player), wins in counters.items():
+            f.write(json.dumps([node, player, wins]) + "\n")
+
+def leaderboard(totals, count=10):
+    """Returns the count players with the most wins as (player, wins) tuples, best first."""
+    return sorted(totals.items(), key=lambda item: (-item[1], item[0]))[:count]
+
+class NodeCounter:
+    """This class counts wins on one game host as a grow-only counter (see the comment at the
+    top of this module). An increment appends one line to the node file instead of rewriting
+    a shared stats file, and self.compact shrinks the file to one line per player.
+    """
+
+    def __init__(self, path, node=None):
+        """Initializes the counter and loads this node's counts from path. An incomplete last
+        line is cut off.
+
+        Args:
+            path (str): The node file
+            node (str): The name of this node, which must be unique among the hosts
+                        (default: the host name)
+        """
+        self.path = path
+        self.node = node or socket.gethostname()
+        self.wins = {}
+        self._file = None
+        for node, player, wins in read_journal(path):
+            if node == self.node and wins > self.wins.get(player, 0):
+                self.wins[player] = wins
+
+    def increment(self, player, amount=1):
+        """Adds wins for a player and appends the new total to the node file.
+
+        Args:
+            player (str): The name of the player
+            amount (int): The number of wins to add (must be positive)
+        """
+        if amount < 1:
+            raise ValueError("A grow-only counter can only be incremented.")
+        wins = self.wins.get(player, 0) + amount
+        self.wins[player] = wins
+        if self._file is None:
+            self._file = open(self.path, "a")
+        self._file.write(json.dumps([self.node, player, wins]) + "\n")
+        self._file.flush()
+
+    def compact(self):
+        """Rewrites the node file with only the latest total of every player."""
+        self.close()
+        write_counters(self.path, {(self.node, player): wins for player, wins in self.wins.items()})
+
+    def close(self):
+        """Closes the node file."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Merge the win counters of several game hosts.")
+    parser.add_argument("files", nargs="+", help="node files (or merged files) to combine")
+    parser.add_argument("--stats", default="stats.json", help="legacy stats file to write ({name: wins})")
+    parser.add_argument("--counters", help="also write the merged counters to this file")
+    parser.add_argument("--top", type=int, default=10, help="number of leaderboard entries to print")
+    args = parser.parse_args(argv)
+
+    counters, totals = merge_counters(args.files)
+    with open(args.stats, "w") as f:
+        json.dump(totals, f)
+    if args.counters:
+        write_counters(args.counters, counters)
+    for rank, (player, wins) in enumerate(leaderboard(totals, args.top), 1):
+        print(f"{rank:>3}. {player}: {wins}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+import json
+import os
+import queue
+import threading
+
+import numpy as np
+
+from ttt.board import Board
+from ttt.solver import build_tables, position_codes
+
+# Stored in the "value" field when the solver value of a position is not known
+VALUE_UNKNOWN = -128
+
+# Helper functions
+
+def replay(moves, size=3, k=None):
+    """Function that plays the given positions alternately with X and O on a new Board and
+    determines how the game ended.
+
+    Args:
+        moves (list): The positions played, starting with X
+        size (int): The size of the board
+        k (int): The number of markers in a row needed to win (default: size)
+
+    Returns:
+        (boards, winner) (tuple): The grids before each move (copies) and the marker of the
+                                  winner, or "" for a draw or an unfinished game
+
+    Raises:
+        ValueError, if a move is invalid or played after the end of the game
+    """
+    board = Board(size, k)
+    grids = []
+    winner = ""
+    for i, position in enumerate(moves):
+        if winner or board.check_full():
+            raise ValueError("Moves continue after the end of the game.")
+        grids.append(board.grid.copy())
+        board.place(position, "XO"[i % 2])
+        if board.check_win():
+            winner = "XO"[i % 2]
+    return grids, winner
+
+def random_games(count, size=3, k=None, seed=None):
+    """Function that generates games between two players choosing uniformly random moves.
+
+    Args:
+        count (int): The number of games
+        size (int): The size of the board
+        k (int): The number of markers in a row needed to win (default: size)
+        seed (int): The random seed
+
+    Yields:
+        list: The moves of each game
+    """
+    rng = np.random.default_rng(seed)
+    for game in range(count):
+        board = Board(size, k)
+        moves = []
+        for position in rng.permutation(size * size) + 1:
+            board.place(int(position), "XO"[len(moves) % 2])
+            moves.append(int(position))
+            if board.check_win():
+                break
+        yield moves
+
+class ShardWriter:
+    """This class writes training examples to a directory of fixed-size shards. Each example
+    describes one position of a game:
+
+        planes (uint8, 2 x size x size):  The X markers and the O markers before the move
+        to_move (int8):  0 if X is to move, 1 if O is to move
+        move (int16):    The position that was played
+        result (int8):   The final result for the player to move (1 win, 0 draw, -1 loss)
+        value (int8):    The solver value of the position for the player to move, or
+                         VALUE_UNKNOWN (only known for the classic 3 by 3 board)
+
+    Examples are collected in preallocated arrays. Full shards are handed to a background
+    thread that writes them as shard-NNNNN.npz, while new examples are collected into the
+    next buffer. At most max_pending full shards wait for the writer, so memory stays bounded
+    no matter how many examples are written. close writes the last, partial shard and a
+    manifest.json listing all shards.
+    """
+
+    def __init__(self, directory, size=3, k=None, shard_size=65536, max_pending=2):
+        """Initializes the writer and starts the background thread.
+
+        Args:
+            directory (str): The output directory (created if necessary)
+            size (int): The size of the boards
+            k (int): The number of markers in a row needed to win (default: size)
+            shard_size (int): The number of examples per shard
+            max_pending (int): The maximum number of full shards waiting to be written
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.size = size
+        self.k = size if k is None else k
+        self.shard_size = shard_size
+        self.shards = []
+        self.examples = 0
+        self._values = build_tables()[0] if size == 3 and self.k == 3 else None
+        self._pending = queue.Queue(maxsize=max_pending)
+        self._error = None
+        self._writer = threading.Thread(target=self._write_shards, name="ShardWriter", daemon=True)
+        self._writer.start()
+        self._new_buffer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _new_buffer(self):
+        """Allocates the arrays for the next shard."""
+        n = self.shard_size
+        self._buffer = {"planes": np.zeros((n, 2, self.size, self.size), dtype=np.uint8),
+                        "to_move": np.zeros(n, dtype=np.int8), "move": np.zeros(n, dtype=np.int16),
+                        "result": np.zeros(n, dtype=np.int8), "value": np.zeros(n, dtype=np.int8)}
+        self._filled = 0
+
+    def _write_shards(self):
+        """Background thread writing full shards to disk."""
+        while True:
+            item = self._pending.get()
+            if item is None:
+                return
+            name, arrays = item
+            try:
+                np.savez(os.path.join(self.directory, name), **arrays)
+            except Exception as e:
+                self._error = e
+
+    def _flush(self):
+        """Hands the current buffer to the writer thread."""
+        if self._error is not None:
+            raise self._error
+        if self._filled == 0:
+            return
+        name = f"shard-{len(self.shards):05d}.npz"
+        arrays = {field: array[:self._filled] for field, array in self._buffer.items()}
+        self.shards.append({"file": name, "examples": self._filled})
+        self._pending.put((name, arrays))
+        self._new_buffer()
+
+    def add_game(self, moves):
+        """Adds one example for every move of a game.
+
+        Args:
+            moves (list): The positions played, starting with X
+        """
+        grids, winner = replay(moves, self.size, self.k)
+        for i, (grid, position) in enumerate(zip(grids, moves)):
+            marker = "XO"[i % 2]
+            row = self._filled
+            self._buffer["planes"][row, 0] = grid == "X"
+            self._buffer["planes"][row, 1] = grid == "O"
+            self._buffer["to_move"][row] = i % 2
+            self._buffer["move"][row] = position
+            self._buffer["result"][row] = 0 if not winner else (1 if winner == marker else -1)
+            if self._values is not None:
+                self._buffer["value"][row] = self._values[position_codes(grid)[0]]
+            else:
+                self._buffer["value"][row] = VALUE_UNKNOWN
+            self._filled += 1
+            self.examples += 1
+            if self._filled == self.shard_size:
+                self._flush()
+
+    def close(self):
+        """Writes the remaining examples and the manifest and stops the writer thread."""
+        if self._writer is None:
+            return
+        self._flush()
+        self._pending.put(None)
+        self._writer.join()
+        self._writer = None
+        if self._error is not None:
+            raise self._error
+
+        manifest = {"size": self.size, "k": self.k, "shard_size": self.shard_size,
+                    "examples": self.examples, "shards": self.shards,
+                    "fields": {field: [str(array.dtype), list(array.shape[1:])]
+                               for field, array in self._buffer.items()}}
+        with open(os.path.join(self.directory, "manifest.json"), "w") as f:
+            json.dump(manifest, f, indent=1)
+
+def read_shards(directory):
+    """Function that reads the shards listed in the manifest of a directory one at a time.
+
+    Args:
+        directory (str): The directory written by a ShardWriter
+
+    Yields:
+        dict: The arrays of each shard, keyed by field name
+    """
+    with open(os.path.join(directory, "manifest.json"), "r") as f:
+        manifest = json.load(f)
+    for shard in manifest["shards"]:
+        with np.load(os.path.join(directory, shard["file"])) as data:
+            yield {field: data[field] for field in data.files}
@@ -0,0 +1,212 @@
+import asyncio
+import itertools
+from collections import OrderedDict, deque, namedtuple
+
+# Kinds of events published by Game (see Game.events). Move events carry the whole grid, so
+# a spectator who missed some of them still knows the current state.
+MOVE = "move"
+WIN = "win"
+DRAW = "draw"
+QUIT = "quit"
+TIMEOUT = "timeout"
+
+# Events of these kinds may be replaced by newer ones for subscribers that fall behind
+COALESCABLE = frozenset([MOVE])
+
+class Event(namedtuple("Event", ["kind", "topic", "data", "sequence"])):
+    """An event: its kind, the topic it was published on (e.g. a Game), a dictionary with
+    the details and a sequence number that increases with every event of the bus."""
+
+class Subscription:
+    """This class receives the events of one topic (or of all topics) of an EventBus in a
+    queue that never holds more than maxsize events. If the subscriber falls behind and the
+    queue is full, a new event replaces the oldest coalescable event (a move) of its own
+    topic, or else the oldest move that a newer move of the same topic follows. A slow
+    spectator thus skips intermediate moves but still gets the latest state of every game and
+    every result. Replaced events are counted in self.dropped. If no move can be replaced,
+    the subscriber is too slow to keep up: the new event is dropped as well and the
+    subscription is closed, which sets self.overflowed.
+
+    The queued moves of every topic are indexed, so coalescing costs the same however long
+    the queue is.
+
+    Events are read with await self.get() (or async for), or without waiting with
+    self.get_nowait() and self.drain(). Once a closed subscription is empty, get returns None
+    and async for stops.
+    """
+
+    def __init__(self, bus, topic, maxsize):
+        self.bus = bus
+        self.topic = topic
+        self.maxsize = maxsize
+        self.dropped = 0
+        self.closed = False
+        self.overflowed = False
+        self._events = OrderedDict()  # sequence -> event, in the order of delivery
+        self._moves = {}              # topic -> deque of the sequences of its queued moves
+        self._stale = OrderedDict()   # topics with more than one queued move
+        self._waiter = None
+
+    def __len__(self):
+        return len(self._events)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        event = await self.get()
+        if event is None:
+            raise StopAsyncIteration
+        return event
+
+    def _deliver(self, event):
+        """Adds an event to the queue, coalescing if it is full."""
+        if self.closed:
+            return
+        if len(self._events) >= self.maxsize:
+            if event.topic in self._moves:
+                self._discard_move(event.topic)
+            elif self._stale:
+                self._discard_move(next(iter(self._stale)))
+            else:
+                self.dropped += 1
+                self.overflowed = True
+                self.close()
+                return
+        self._events[event.sequence] = event
+        if event.kind in COALESCABLE:
+            moves = self._moves.setdefault(event.topic, deque())
+            moves.append(event.sequence)
+            if len(moves) == 2:
+                self._stale[event.topic] = None
+
+    def _discard_move(self, topic):
+        """Removes the oldest queued move of topic and counts it as dropped."""
+        del self._events[self._forget_move(topic)]
+        self.dropped += 1
+
+    def _forget_move(self, topic):
+        """Removes the oldest move of topic from the index and returns its sequence."""
+        moves = self._moves[topic]
+        sequence = moves.popleft()
+        if not moves:
+            del self._moves[topic]
+        elif len(moves) == 1:
+            del self._stale[topic]
+        return sequence
+
+    def _wake(self):
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+    def get_nowait(self):
+        """Returns the next event, or None if there is none."""
+        if not self._events:
+            return None
+        event = self._events.popitem(last=False)[1]
+        if event.kind in COALESCABLE:
+            self._forget_move(event.topic)
+        return event
+
+    def drain(self):
+        """Returns all queued events and empties the queue."""
+        events = list(self._events.values())
+        self._events.clear()
+        self._moves.clear()
+        self._stale.clear()
+        return events
+
+    async def get(self):
+        """Waits for and returns the next event, or None if the subscription is closed and empty."""
+        while not self._events and not self.closed:
+            self._waiter = asyncio.get_running_loop().create_future()
+            try:
+                await self._waiter
+            finally:
+                self._waiter = None
+        return self.get_nowait()
+
+    def close(self):
+        """Stops receiving events. Events that are already queued can still be read."""
+        self.closed = True
+        self.bus.unsubscribe(self)
+        self._wake()
+
+class EventBus:
+    """This class distributes events from publishers (e.g. Game) to subscribers. Publishing
+    only appends the event to a list. Within a running asyncio event loop, the delivery to the
+    subscribers is done once per loop iteration for all events published since the last one
+    (scheduled with loop.call_soon), so a move costs the player the same however many
+    spectators are watching, and each subscriber is woken up once per batch. Without a
+    running event loop, events are delivered immediately.
+    """
+
+    def __init__(self):
+        self._subscribers = {}
+        self._pending = []
+        self._scheduled = False
+        self._sequence = itertools.count()
+        self.batches = 0
+
+    def subscribe(self, topic=None, maxsize=64):
+        """Subscribes to the events of a topic.
+
+        Args:
+            topic: The topic, e.g. a Game object, or None for the events of all topics
+            maxsize (int): The maximum number of queued events, see Subscription
+
+        Returns:
+            Subscription: The subscription to read the events from
+        """
+        if maxsize < 1:
+            raise ValueError("A subscription must be able to hold at least one event.")
+        subscription = Subscription(self, topic, maxsize)
+        self._subscribers.setdefault(topic, []).append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """Removes a subscription."""
+        subscribers = self._subscribers.get(subscription.topic, [])
+        if subscription in subscribers:
+            subscribers.remove(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.topic]
+
+    def publish(self, kind, topic, **data):
+        """Publishes an event.
+
+        Args:
+            kind (str): The kind of the event (e.g. MOVE)
+            topic: The topic the event belongs to
+            **data: The details of the event
+
+        Returns:
+            Event: The published event
+        """
+        event = Event(kind, topic, data, next(self._sequence))
+        self._pending.append(event)
+        if not self._scheduled:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                self.flush()
+            else:
+                self._scheduled = True
+                loop.call_soon(self.flush)
+        return event
+
+    def flush(self):
+        """Delivers all pending events to their subscribers and wakes them up."""
+        self._scheduled = False
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+        self.batches += 1
+        woken = {}
+        for event in pending:
+            for topic in ((event.topic, None) if event.topic is not None else (None,)):
+                for subscription in tuple(self._subscribers.get(topic, ())):
+                    subscription._deliver(event)
+                    woken[id(subscription)] = subscription
+        for subscription in woken.values():
+            subscription._wake()
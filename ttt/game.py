@@ -6,8 +6,9 @@ sys.path.insert(0, root_dir)
 
 import ttt.player
 import ttt.board
+import ttt.events
 
-from ttt.player import Player
+from ttt.player import AIPlayer, Player
 from ttt.board import Board
 
 import json
@@ -48,6 +49,18 @@ def write_stats(statsfile, player_name):
             stats = {player_name: 1}
             json.dump(stats, f)
 
+def _make_player(player, marker, registry=None):
+    """Returns player if it already is a Player object with the given marker, otherwise
+    creates a new Player with name player and the given marker, or takes the shared one
+    from registry (a ttt.registry.PlayerRegistry) if given."""
+    if isinstance(player, Player):
+        if player.marker != marker:
+            raise ValueError(f"Player {player.name} must have marker {marker}.")
+        return player
+    if registry is not None:
+        return registry.player(player, marker)
+    return Player(player, marker)
+
 class Game:
     """This class handles game logic for TicTacToe. It is responsible for:
         
@@ -58,7 +71,7 @@ class Game:
 
     """
 
-    def __init__(self, name1, name2, statsfile="stats.json"):
+    def __init__(self, name1, name2, statsfile="stats.json", ratings=None, clock=None, registry=None, counter=None, board=None, events=None, stats=None):
         """This method initializes a new Game object. It should initialize 
         the following class variables:
 
@@ -68,45 +81,123 @@ class Game:
             self.statsfile (str): The name of the statsfile as passed to this function
             self._current (Player): A placeholder for the player who is supposed to make the next move.
                                     Initialize it with self.player1
+            self.ratings (StatsStore): The store of per-player stats and ratings, or None
+            self.clock (GameClock): The clock of the game, or None for a game without time limit
+            self.counter (NodeCounter): The win counter of this host, or None
+            self.events (EventBus): The bus that spectators receive the moves and result from, or None
+            self.stats (ShardedStats): The store of wins used instead of the stats file, or None
+            self.finished (bool): Whether the game has ended (by a win, draw, timeout or quit)
 
         Args:
-            name1 (str): The name of player 1
-            name2 (str): The name of player 2
+            name1 (str or Player): The name of player 1, or a Player (e.g. an AIPlayer) with marker "X"
+            name2 (str or Player): The name of player 2, or a Player with marker "O"
             statsfile (str): The name of the stats file (default: stats.json)
+            ratings (StatsStore): Optional ttt.stats.StatsStore that records wins, losses,
+                                  draws and Elo ratings of both players when the game ends
+            clock (GameClock): Optional ttt.clock.GameClock, started here and pressed after every
+                               move. A player who runs out of time loses (see self.handle_timeout).
+            registry (PlayerRegistry): Optional ttt.registry.PlayerRegistry providing shared
+                                       Player objects for the names (which may also be ids)
+            counter (NodeCounter): Optional ttt.counters.NodeCounter that counts the wins of this
+                                   host in a file that can be merged with those of other hosts
+            board (Board): The board to play on (default: a new 3 by 3 Board), e.g. a larger
+                           Board or a ttt.qubic.QubicBoard
+            events (EventBus): Optional ttt.events.EventBus on which every move and the end of the
+                               game are published, with this Game as topic (see self._publish)
+            stats (ShardedStats): Optional ttt.shards.ShardedStats (anything with an increment
+                                  method) that records the wins instead of the stats file,
+                                  which isn't written then
 
+        Raises:
+            ValueError, if both players have the same name or a Player has the wrong marker
         """
-        self.board = Board()
-        self.player1 = Player(name1, "X")
-        self.player2 = Player(name2, "O")
+        self.board = board if board is not None else Board()
+        self.player1 = _make_player(name1, "X", registry)
+        self.player2 = _make_player(name2, "O", registry)
+        if self.player1.name == self.player2.name:
+            raise ValueError("A player cannot play against themselves.")
         self.statsfile = statsfile
+        self.ratings = ratings
+        self.clock = clock
+        self.counter = counter
+        self.events = events
+        self.stats = stats
+        self.finished = False
         self._current = self.player1
+        if self.clock is not None:
+            self.clock.start()
+
+    def _other(self):
+        """Returns the player who is not self._current"""
+        return self.player1 if self._current == self.player2 else self.player2
+
+    def _publish(self, kind, **data):
+        """Publishes an event about this game on self.events, if given. Every event carries the
+        grid as a string of the markers in position order, with "." for empty cells."""
+        if self.events is not None:
+            grid = "".join(cell or "." for cell in self.board.grid.ravel())
+            self.events.publish(kind, self, grid=grid, **data)
+
+    def _record_win(self, winner, loser):
+        """Records a win in self.stats, or in the stats file if no store was given, and in
+        self.ratings and self.counter."""
+        if self.stats is not None:
+            self.stats.increment(winner)
+        else:
+            write_stats(self.statsfile, winner)
+        if self.ratings is not None:
+            self.ratings.record_win(winner, loser)
+        if self.counter is not None:
+            self.counter.increment(winner)
 
     def handle_win(self):
         """This method checks whether a win has occurred by running self.board.check_win
         If a win is detected, it does the following:
 
             1. Update the score of the winning player in the stats file by running the
-               write_stats helper function with the player's name.
+               write_stats helper function with the player's name (see self._record_win).
                
                Hint: The winning player is the player that made the current move, i.e.,
                the player stored in self._current
 
-            2. Raise a TimeoutError with a message that indicates a win and that contains the
-               winning player's name
+            2. If a StatsStore was given as self.ratings, record the win against the other player,
+               and if a NodeCounter was given as self.counter, increment the winner's counter
+            3. Raise a TimeoutError with a message that indicates a win and that contains the
+               winning player's name, after publishing a win event on self.events
         """
         if self.board.check_win():
             winner_name = self._current.name
-            write_stats(self.statsfile, winner_name)
+            self.finished = True
+            self._record_win(winner_name, self._other().name)
+            self._publish(ttt.events.WIN, winner=winner_name)
             raise TimeoutError(f"Player {winner_name} wins!")
 
     def handle_draw(self):
         """This method checks whether a draw has occurred by running self.board.check_full
         If a draw is detected (i.e. if the board is full), it raises a TimeoutError with a 
-        message indicating that a draw has happened.
+        message indicating that a draw has happened. If a StatsStore was given as self.ratings,
+        the draw is recorded there first.
         """
         if self.board.check_full():
+            self.finished = True
+            if self.ratings is not None:
+                self.ratings.record_draw(self.player1.name, self.player2.name)
+            self._publish(ttt.events.DRAW)
             raise TimeoutError("The game is a draw!")
 
+    def handle_timeout(self):
+        """This method checks whether the current player has run out of time on self.clock.
+        If so, the other player wins: their win is written to the stats file and recorded in
+        self.ratings like in self.handle_win, and a TimeoutError is raised with a message
+        naming both players. Without a clock, or if the game has already ended, nothing happens.
+        """
+        if self.clock is not None and not self.finished and self.clock.flagged():
+            self.finished = True
+            winner, loser = self._other(), self._current
+            self._record_win(winner.name, loser.name)
+            self._publish(ttt.events.TIMEOUT, winner=winner.name, loser=loser.name)
+            raise TimeoutError(f"Player {loser.name} ran out of time. Player {winner.name} wins!")
+
     def make_move(self):
         """This method is responsible for making one move in TicTacToe. It should:
             
@@ -127,27 +218,65 @@ class Game:
             5. Run the self.handle_draw method to handle a possible draw
              6. Set the self._current player to the other player. For example, if self._current was self.player1,
                set it to self.player2 and vice versa.
+
+        Steps 3. to 6. are implemented by self.play. If the current player is an AIPlayer, step 2.
+        asks its policy instead of calling input().
         """
         print(self.board)
-        spot = input(f"Player {self._current.name}, enter a spot to place your marker (1-9 or 'Q' to quit): ")
+        if isinstance(self._current, AIPlayer):
+            self.play(self._current.choose_move(self.board))
+            return
+
+        cells = self.board.grid.size
+        spot = input(f"Player {self._current.name}, enter a spot to place your marker (1-{cells} or 'Q' to quit): ")
         
         if spot.upper() == "Q":
+            self.finished = True
+            self._publish(ttt.events.QUIT, player=self._current.name)
             raise TimeoutError("The game has ended. Player quit.")
         
         try:
             spot = int(spot)
         except ValueError:
-            print("Invalid input. Please enter an integer between 1 and 9 or 'Q' to quit.")
+            print(f"Invalid input. Please enter an integer between 1 and {cells} or 'Q' to quit.")
             self.make_move()
             return
         
         try:
-            self.board.place(spot, self._current.marker)
+            self.play(spot)
         except ValueError as e:
             print(e)
             self.make_move()
             return
 
+    def play(self, position):
+        """This method makes a move for the current player without asking for input, which is
+        what make_move does after a spot has been chosen. It's meant for AI players and for
+        servers that receive moves from elsewhere:
+
+            1. Execute the self.board.place method with the current player's marker. This raises
+               a ValueError for invalid positions, in which case nothing else happens.
+            2. Run self.handle_win and self.handle_draw, which raise a TimeoutError if the game ended
+            3. Hand the turn over to the other player
+
+        Every successful move is published as a move event on self.events, if given.
+        With a clock, self.handle_timeout runs first, so a move made too late loses the game,
+        and the clock is pressed after the move.
+
+        Args:
+            position (int): The position to place the current player's marker in
+
+        Raises:
+            TimeoutError, if the game ends with this move or has already ended
+        """
+        if self.finished:
+            raise TimeoutError("The game is already over.")
+        self.handle_timeout()
+        self.board.place(position, self._current.marker)
+        self._publish(ttt.events.MOVE, player=self._current.name, marker=self._current.marker,
+                      position=position)
         self.handle_win()
         self.handle_draw()
-        self._current = self.player1 if self._current == self.player2 else self.player2
\ No newline at end of file
+        if self.clock is not None:
+            self.clock.press()
+        self._current = self._other()
\ No newline at end of file
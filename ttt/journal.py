@@ -0,0 +1,51 @@
+import contextlib
+import json
+import os
+
+# Helpers for the files that the stats, counters and player registry are kept in: journals of
+# one JSON record per line, to which every change is appended, and files that are rewritten
+# as a whole and must never be seen half written.
+
+def read_journal(path):
+    """Function that reads the records of a journal file. A process that crashed while
+    appending may have left an incomplete last line behind; once all complete lines have been
+    read, it is cut off, so that the next record appended starts on a new line.
+
+    Args:
+        path (str): The journal file. If it doesn't exist, there are no records.
+
+    Yields:
+        The record (a decoded JSON value) of every complete line, in order
+    """
+    if not os.path.exists(path):
+        return
+    complete = 0
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            yield json.loads(line)
+            complete += len(line)
+    if complete != os.path.getsize(path):
+        os.truncate(path, complete)
+
+@contextlib.contextmanager
+def atomic_write(path):
+    """Function that opens a temporary file for writing next to path, and moves it over path
+    with os.replace once the with block has finished, so that readers either see the old or
+    the new content of the file. If the block raises, path is left untouched.
+
+    Args:
+        path (str): The file to replace
+
+    Yields:
+        file: The temporary file, opened for writing text
+    """
+    temporary = path + ".tmp"
+    try:
+        with open(temporary, "w") as f:
+            yield f
+    except BaseException:
+        os.remove(temporary)
+        raise
+    os.replace(temporary, path)
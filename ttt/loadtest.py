@@ -0,0 +1,208 @@
+#!/bin/env python3
+
+import argparse
+import asyncio
+import itertools
+import random
+import time
+
+import numpy as np
+
+from ttt.game import Game
+
+# Helper functions
+
+def think_time(spec):
+    """Function that parses a think-time distribution, i.e. how long a simulated player waits
+    before sending a move:
+
+        "0" or "const:S"        Always S seconds
+        "exp:M"                 Exponentially distributed with mean M seconds
+        "uniform:A:B"           Uniformly distributed between A and B seconds
+        "lognormal:MU:SIGMA"    Log-normally distributed (parameters of the underlying normal)
+
+    Args:
+        spec (str): The distribution
+
+    Returns:
+        callable: Function mapping a random.Random to a think time in seconds
+
+    Raises:
+        ValueError, if the distribution is unknown
+    """
+    kind, *params = spec.split(":")
+    counts = {"0": 0, "const": 1, "exp": 1, "uniform": 2, "lognormal": 2}
+    try:
+        params = [float(param) for param in params]
+    except ValueError:
+        params = None
+    if kind not in counts or params is None or len(params) != counts[kind] \
+            or kind != "lognormal" and any(param < 0 for param in params):
+        raise ValueError(f"Invalid think-time distribution {spec!r}.")
+
+    if kind == "0":
+        return lambda rng: 0.0
+    if kind == "const":
+        return lambda rng: params[0]
+    if kind == "exp":
+        return lambda rng: rng.expovariate(1.0 / params[0]) if params[0] else 0.0
+    if kind == "uniform":
+        return lambda rng: rng.uniform(params[0], params[1])
+    return lambda rng: rng.lognormvariate(params[0], params[1])
+
+class LocalGameServer:
+    """This class is an in-process stand-in for a game server: it hosts Game objects and
+    applies moves sent by clients with Game.play, so that every move goes through the real
+    move handling, win and draw detection and stats writes. Its methods are coroutines, like
+    the requests of a network client, and yield to the event loop before handling a move.
+    """
+
+    def __init__(self, statsfile="stats.json", **game_options):
+        """Initializes the server.
+
+        Args:
+            statsfile (str): The stats file of all games
+            **game_options: Further arguments for Game, e.g. ratings, counter or stats
+        """
+        self.statsfile = statsfile
+        self.game_options = game_options
+        self.games = {}
+        self._ids = itertools.count()
+
+    async def create_game(self, name1, name2):
+        """Starts a game and returns its id."""
+        await asyncio.sleep(0)
+        game_id = next(self._ids)
+        self.games[game_id] = Game(name1, name2, self.statsfile, **self.game_options)
+        return game_id
+
+    async def move(self, game_id, position):
+        """Plays a move for the player to move in a game.
+
+        Returns:
+            dict: "status" is "ok", "over" (with the game's "message") or "invalid" (with
+                  the "error" message). Finished games are removed.
+        """
+        await asyncio.sleep(0)
+        game = self.games[game_id]
+        try:
+            game.play(position)
+        except ValueError as e:
+            return {"status": "invalid", "error": str(e)}
+        except TimeoutError as e:
+            del self.games[game_id]
+            return {"status": "over", "message": str(e)}
+        return {"status": "ok"}
+
+class LoadTest:
+    """This class simulates many clients playing against a LocalGameServer at once. Each client
+    is an asyncio task that plays a number of matches, sending the moves of both players one
+    after another, each after a think time drawn from a distribution. Moves are random free
+    positions; a small share of deliberately invalid moves can be mixed in.
+
+    For every move, the round-trip time from sending it to getting the answer is measured.
+    Exceptions raised by the server count as errors, rejected moves separately.
+    """
+
+    def __init__(self, server, think="0", invalid_rate=0.0, seed=None):
+        """Initializes the load test.
+
+        Args:
+            server (LocalGameServer): The server to test
+            think (str): The think-time distribution (see think_time)
+            invalid_rate (float): The probability that a move is an occupied position
+            seed (int): The random seed
+        """
+        self.server = server
+        self.think = think_time(think)
+        self.invalid_rate = invalid_rate
+        self.rng = random.Random(seed)
+
+    async def _client(self, client_id, matches, stats):
+        rng = random.Random(self.rng.random())
+        for match in range(matches):
+            try:
+                game_id = await self.server.create_game(f"client{client_id}a", f"client{client_id}b")
+                free = list(range(1, 10))
+                rng.shuffle(free)
+                played = []
+                while True:
+                    await asyncio.sleep(self.think(rng))
+                    if played and rng.random() < self.invalid_rate:
+                        position = rng.choice(played)
+                    else:
+                        position = free[-1]
+                    start = time.perf_counter()
+                    reply = await self.server.move(game_id, position)
+                    stats["latencies"].append(time.perf_counter() - start)
+                    if reply["status"] == "invalid":
+                        stats["rejected"] += 1
+                        continue
+                    free.remove(position)
+                    played.append(position)
+                    if reply["status"] == "over":
+                        stats["games"] += 1
+                        break
+            except Exception:
+                stats["errors"] += 1
+
+    async def run(self, clients, matches=1):
+        """Runs the given number of concurrent clients until all their matches are over.
+
+        Args:
+            clients (int): The number of concurrent clients
+            matches (int): The number of matches each client plays
+
+        Returns:
+            dict: The number of clients, games, moves, errors and rejected moves, the error
+                  rate (share of matches aborted by an exception), the throughput in games
+                  and moves per second, and the p50, p90, p99 and maximum move latency in
+                  milliseconds
+        """
+        stats = {"latencies": [], "games": 0, "errors": 0, "rejected": 0}
+        start = time.perf_counter()
+        await asyncio.gather(*(self._client(i, matches, stats) for i in range(clients)))
+        elapsed = time.perf_counter() - start
+
+        latencies = np.array(stats["latencies"]) * 1000
+        p50, p90, p99 = np.percentile(latencies, [50, 90, 99]) if len(latencies) else (0.0, 0.0, 0.0)
+        moves = len(latencies)
+        return {"clients": clients, "games": stats["games"], "moves": moves,
+                "errors": stats["errors"], "rejected": stats["rejected"],
+                "error_rate": stats["errors"] / max(clients * matches, 1),
+                "games_per_second": stats["games"] / elapsed, "moves_per_second": moves / elapsed,
+                "p50_ms": float(p50), "p90_ms": float(p90), "p99_ms": float(p99),
+                "max_ms": float(latencies.max()) if moves else 0.0}
+
+    def ramp(self, levels, matches=1):
+        """Runs the load test once per concurrency level.
+
+        Args:
+            levels (list): The numbers of concurrent clients, e.g. [10, 100, 1000]
+            matches (int): The number of matches each client plays
+
+        Returns:
+            list: The report of each level (see self.run)
+        """
+        return [asyncio.run(self.run(clients, matches)) for clients in levels]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the game logic with simulated clients.")
+    parser.add_argument("--levels", type=int, nargs="+", default=[10, 100, 1000],
+                        help="numbers of concurrent clients")
+    parser.add_argument("--matches", type=int, default=2, help="matches per client")
+    parser.add_argument("--think", default="exp:0.01", help="think-time distribution, e.g. exp:0.01")
+    parser.add_argument("--invalid-rate", type=float, default=0.0)
+    parser.add_argument("--statsfile", default="loadtest_stats.json")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args(argv)
+
+    test = LoadTest(LocalGameServer(args.statsfile), args.think, args.invalid_rate, args.seed)
+    print(f"{'clients':>8} {'games/s':>9} {'moves/s':>9} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for report in test.ramp(args.levels, args.matches):
+        print(f"{report['clients']:>8} {report['games_per_second']:>9.1f} {report['moves_per_second']:>9.1f} "
+              f"{report['p50_ms']:>8.2f} {report['p90_ms']:>8.2f} {report['p99_ms']:>8.2f} "
+              f"{report['error_rate']:>7.2%}")
+
+if __name__ == "__main__":
+    main()
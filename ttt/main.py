@@ -6,7 +6,10 @@ import sys
 root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, root_dir)
 
+import argparse
+
 from ttt.game import Game
+from ttt.profiling import Profiler
 
 
 def main():
@@ -51,5 +54,24 @@ def main():
         sys.exit(0)
 
 
+def cli(argv=None):
+    """Entry point of the command line. It runs main, optionally under a ttt.profiling.Profiler
+    (--profile PREFIX), whose report is written when the game ends."""
+    parser = argparse.ArgumentParser(description="Play TicTacToe in the terminal.")
+    parser.add_argument("--profile", metavar="PREFIX",
+                        help="profile the game and write PREFIX.txt, PREFIX.pstats and PREFIX.collapsed")
+    args = parser.parse_args(argv)
+    if args.profile is None:
+        main()
+        return
+
+    profiler = Profiler()
+    try:
+        with profiler:
+            main()
+    finally:
+        print(profiler.write_report(args.profile))
+
+
 if __name__ == "__main__":
-    main()
+    cli()
@@ -0,0 +1,186 @@
+#!/bin/env python3
+
+import argparse
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from ttt.board import Board
+from ttt.search import WIN, AlphaBetaSearch, SearchResult, candidate_moves
+from ttt.transposition import TranspositionTable
+
+# The search object of a worker process, created once by _init_worker so that its
+# transposition table survives from one move to the next.
+_worker_search = None
+
+def _init_worker(max_depth, radius, table_size):
+    global _worker_search
+    _worker_search = AlphaBetaSearch(max_depth=max_depth, radius=radius,
+                                     table=TranspositionTable(table_size))
+
+def _search_subset(board, root_moves, time_limit, max_depth):
+    """Runs the worker's search restricted to some of the root moves. Returns the result and
+    the (move, score) of every completed iteration."""
+    result = _worker_search.search(board, time_limit=time_limit, max_depth=max_depth,
+                                   root_moves=root_moves)
+    return result, _worker_search.iterations
+
+def _best_outcome(outcomes, max_depth):
+    """Returns the (result, iterations) of the worker with the best root moves. Scores of
+    different depths can't be compared (a deeper search sees more of the opponent's
+    threats), so workers are compared by their score at the smallest depth that all of them
+    completed, unless a worker has proven a win. Workers that didn't complete any iteration
+    only hold a placeholder move and are ignored, unless no worker completed one."""
+    completed = [outcome for outcome in outcomes if outcome[0].depth > 0]
+    if not completed:
+        return outcomes[0]
+    depth = min(result.depth for result, iterations in completed)
+
+    def score(outcome):
+        result, iterations = outcome
+        if result.score >= WIN - max_depth:
+            return result.score
+        return iterations[depth - 1][1]
+
+    return max(completed, key=score)
+
+class ParallelSearch:
+    """This class runs AlphaBetaSearch on several cores by splitting the root moves: the
+    candidate moves of the current position are dealt out round-robin to a pool of worker
+    processes, each of which searches its share with iterative deepening under the same
+    deadline. The move of the worker with the best score at the depth that all workers
+    completed is played. The opening book and
+    the threat search for forced wins (see AlphaBetaSearch.probe) are run once in this
+    process before the root moves are split.
+
+    Each worker keeps its own search object and transposition table between moves. Like
+    AlphaBetaSearch, an object of this class can be used as the policy of an AIPlayer. Call
+    close (or use it as a context manager) to stop the worker processes.
+    """
+
+    def __init__(self, workers=None, time_limit=1.0, max_depth=64, radius=1, table_size=1 << 18,
+                 threat_search=True, book=None):
+        """Initializes the search and starts the worker processes.
+
+        Args:
+            workers (int): The number of worker processes (default: the number of CPUs)
+            time_limit (float): The time per move in seconds
+            max_depth (int): The maximum depth of the iterative deepening
+            radius (int): The radius used for candidate_moves
+            table_size (int): The number of transposition table slots per worker
+            threat_search (bool): Whether to look for forced wins before splitting the root moves
+            book (OpeningBook): Optional ttt.book.OpeningBook whose moves are played instead
+                                of searching
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.time_limit = time_limit
+        self.max_depth = max_depth
+        self.radius = radius
+        self._probe = AlphaBetaSearch(time_limit, max_depth, radius, TranspositionTable(1),
+                                      threat_search=threat_search, book=book)
+        self._pool = ProcessPoolExecutor(self.workers, initializer=_init_worker,
+                                         initargs=(max_depth, radius, table_size))
+        self.last_result = None
+
+    def __call__(self, board):
+        """Returns the best move for board within the time limit."""
+        return self.search(board).move
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Stops the worker processes."""
+        self._pool.shutdown()
+
+    def search(self, board, time_limit=None, max_depth=None):
+        """Searches for the best move of the player to move, using all workers.
+
+        Args:
+            board (Board): The current position (not modified)
+            time_limit (float): Overrides the time limit of this object
+            max_depth (int): Overrides the maximum depth of this object
+
+        Returns:
+            SearchResult: The best move and its score. depth is the smallest depth completed
+                          by all workers, nodes the total over all workers.
+        """
+        start = time.monotonic()
+        time_limit = self.time_limit if time_limit is None else time_limit
+        result = self._probe.probe(board, time_limit)
+        if result is not None:
+            self.last_result = result
+            return result
+
+        moves = candidate_moves(board, self.radius)
+        if len(moves) <= 1:
+            self.last_result = SearchResult(moves[0] if moves else 0, 0, 0, 0, time.monotonic() - start)
+            return self.last_result
+
+        shares = [moves[i::self.workers] for i in range(min(self.workers, len(moves)))]
+        remaining = time_limit - (time.monotonic() - start)
+        futures = [self._pool.submit(_search_subset, board, share, remaining, max_depth)
+                   for share in shares]
+        outcomes = [future.result() for future in futures]
+        results = [result for result, iterations in outcomes]
+
+        best = _best_outcome(outcomes, self.max_depth)[0]
+        self.last_result = SearchResult(best.move, best.score, min(result.depth for result in results),
+                                        sum(result.nodes for result in results), time.monotonic() - start)
+        return self.last_result
+
+def benchmark_positions():
+    """Returns a few 15 by 15, five-in-a-row positions from the opening and middle game."""
+    positions = []
+    for moves in ([113], [113, 97, 114], [113, 114, 98, 128, 127, 99],
+                  [113, 97, 112, 111, 128, 143, 98, 83]):
+        board = Board(size=15, k=5)
+        for i, position in enumerate(moves):
+            board.place(position, "XO"[i % 2])
+        positions.append(board)
+    return positions
+
+def benchmark(workers, depth=3, positions=None, threat_search=True):
+    """Function that measures the speedup of ParallelSearch over a single AlphaBetaSearch by
+    searching each position to a fixed depth without time limit.
+
+    Args:
+        workers (int): The number of worker processes
+        depth (int): The search depth
+        positions (list): The boards to search (default: benchmark_positions())
+        threat_search (bool): Whether both searches look for forced wins first
+
+    Returns:
+        dict: The total time of the serial and the parallel searches and the speedup
+    """
+    positions = benchmark_positions() if positions is None else positions
+
+    serial = 0.0
+    for board in positions:
+        result = AlphaBetaSearch(max_depth=depth, threat_search=threat_search).search(board, time_limit=math.inf)
+        serial += result.elapsed
+
+    with ParallelSearch(workers, max_depth=depth, threat_search=threat_search) as search:
+        search.search(positions[0], time_limit=math.inf, max_depth=1)  # Start the workers
+        parallel = 0.0
+        for board in positions:
+            parallel += search.search(board, time_limit=math.inf).elapsed
+
+    return {"workers": workers, "serial": serial, "parallel": parallel, "speedup": serial / parallel}
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the parallel search on 15x15 positions.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--depth", type=int, default=3)
+    args = parser.parse_args()
+
+    stats = benchmark(args.workers, args.depth)
+    print(f"{stats['workers']} workers: serial {stats['serial']:.2f}s, "
+          f"parallel {stats['parallel']:.2f}s, speedup {stats['speedup']:.2f}x")
+
+if __name__ == "__main__":
+    main()
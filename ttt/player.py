@@ -117,3 +117,34 @@ class Player:
         if value_upper not in ['X', 'O']:
             raise ValueError("Invalid marker. Must be 'X' or 'O'.")
         self._marker = value_upper
+
+class AIPlayer(Player):
+    """This class represents a player whose moves are chosen by a program instead of being
+    typed in. The program is given as a policy, i.e. a callable that takes a Board and returns
+    the position (1-9) to place the marker in, for example a ttt.solver.TablePolicy.
+    """
+
+    def __init__(self, name, marker, policy):
+        """Initializes the player like a Player and stores the policy.
+
+        Args:
+            name (str): The name of the player
+            marker (str): The marker of the player (X or O)
+            policy (callable): Function mapping a Board to a position
+        """
+        super().__init__(name, marker)
+        self.policy = policy
+
+    def __str__(self):
+        return f"AI player {self.name} with marker {self.marker}"
+
+    def choose_move(self, board):
+        """Asks the policy for the next move.
+
+        Args:
+            board (Board): The current board
+
+        Returns:
+            int: The position to place the marker in
+        """
+        return int(self.policy(board))
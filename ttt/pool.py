@@ -0,0 +1,230 @@
+import numpy as np
+
+from ttt.board import Board, FULL_MASK, is_winning_mask
+
+# Game results as stored in GamePool.result
+
+ONGOING = 0
+X_WINS = 1
+O_WINS = 2
+DRAW = 3
+
+# Lookup table that is True for every 9 bit mask containing a win, so that the
+# results of a whole batch of games can be detected with a single indexing operation.
+WINNING = np.array([is_winning_mask(bits) for bits in range(FULL_MASK + 1)], dtype=bool)
+
+class GamePool:
+    """This class holds many games of TicTacToe at once. Instead of creating a Game object
+    (with its own Board and two Player objects) per game, the state of all games is kept in
+    a few flat numpy arrays ("struct of arrays"), each game being identified by its index
+    into those arrays:
+
+        self.x_bits (np.ndarray):   uint16, the positions of the X markers as a 9 bit mask
+                                    (see the bitboard helpers in ttt.board)
+        self.o_bits (np.ndarray):   uint16, the positions of the O markers
+        self.last_move (np.ndarray): uint8, the last position played (0 if none)
+        self.to_move (np.ndarray):  uint8, 0 if player 1 (X) moves next, 1 for player 2 (O)
+        self.player1 (np.ndarray):  int32, the id of player 1
+        self.player2 (np.ndarray):  int32, the id of player 2
+        self.result (np.ndarray):   int8, one of ONGOING, X_WINS, O_WINS and DRAW
+        self.active (np.ndarray):   bool, whether the slot currently holds a game
+
+    A game therefore costs 16 bytes instead of a few kilobytes, and moves for many games
+    can be validated, applied and evaluated in bulk.
+    """
+
+    def __init__(self, capacity=1024):
+        """Initializes an empty pool.
+
+        Args:
+            capacity (int): The number of games to allocate room for. The pool grows
+                            automatically when more games are created.
+        """
+        self._size = 0
+        self._free = []
+        self._allocate(max(int(capacity), 1))
+
+    def _allocate(self, capacity):
+        """Allocates (or grows) the arrays holding the games, keeping existing games."""
+        fields = {"x_bits": np.uint16, "o_bits": np.uint16, "last_move": np.uint8,
+                  "to_move": np.uint8, "player1": np.int32, "player2": np.int32,
+                  "result": np.int8, "active": bool}
+        for field, dtype in fields.items():
+            array = np.zeros(capacity, dtype=dtype)
+            if hasattr(self, field):
+                array[:self._size] = getattr(self, field)[:self._size]
+            setattr(self, field, array)
+        self.capacity = capacity
+
+    def __len__(self):
+        """Returns the number of games currently held by the pool."""
+        return self._size - len(self._free)
+
+    @property
+    def nbytes(self):
+        """The number of bytes used by the arrays of the pool."""
+        return sum(getattr(self, field).nbytes for field in
+                   ["x_bits", "o_bits", "last_move", "to_move", "player1", "player2", "result", "active"])
+
+    def new_games(self, player1_ids, player2_ids):
+        """Creates new games, reusing the slots of released games first.
+
+        Args:
+            player1_ids (array-like): The ids of the players with marker X
+            player2_ids (array-like): The ids of the players with marker O
+
+        Returns:
+            np.ndarray: The ids of the new games
+        """
+        player1_ids = np.atleast_1d(np.asarray(player1_ids, dtype=np.int32))
+        player2_ids = np.atleast_1d(np.asarray(player2_ids, dtype=np.int32))
+        if player1_ids.shape != player2_ids.shape:
+            raise ValueError("Both players must be given for every game.")
+
+        count = player1_ids.size
+        reused = min(count, len(self._free))
+        game_ids = np.empty(count, dtype=np.int64)
+        game_ids[:reused] = self._free[len(self._free) - reused:]
+        del self._free[len(self._free) - reused:]
+
+        fresh = count - reused
+        if self._size + fresh > self.capacity:
+            self._allocate(max(2 * self.capacity, self._size + fresh))
+        game_ids[reused:] = np.arange(self._size, self._size + fresh)
+        self._size += fresh
+
+        self.x_bits[game_ids] = 0
+        self.o_bits[game_ids] = 0
+        self.last_move[game_ids] = 0
+        self.to_move[game_ids] = 0
+        self.result[game_ids] = ONGOING
+        self.player1[game_ids] = player1_ids
+        self.player2[game_ids] = player2_ids
+        self.active[game_ids] = True
+        return game_ids
+
+    def release(self, game_ids):
+        """Removes games from the pool so that their slots can be reused.
+
+        Args:
+            game_ids (array-like): The ids of the games to be removed. Each game may only
+                                   appear once.
+        """
+        game_ids = self._check_ids(game_ids)
+        if np.unique(game_ids).size != game_ids.size:
+            raise ValueError("Each game can only be released once.")
+        self.active[game_ids] = False
+        self._free.extend(int(game_id) for game_id in game_ids)
+
+    def _check_ids(self, game_ids):
+        """Converts game_ids to an array and makes sure that all of them refer to live games."""
+        game_ids = np.atleast_1d(np.asarray(game_ids, dtype=np.int64))
+        if np.any((game_ids < 0) | (game_ids >= self._size)) or not np.all(self.active[game_ids]):
+            raise ValueError("Unknown game id.")
+        return game_ids
+
+    def check_moves(self, game_ids, positions):
+        """Checks a batch of moves for validity, i.e. whether for each move:
+            - The game is still ongoing
+            - The position is an integer between 1 and 9
+            - The selected position is not already occupied
+
+        Args:
+            game_ids (array-like): The ids of the games to move in
+            positions (array-like): The position to place a marker in, one for each game
+
+        Returns:
+            np.ndarray: Array of booleans which is True for every valid move
+        """
+        game_ids = self._check_ids(game_ids)
+        positions = np.atleast_1d(np.asarray(positions, dtype=np.int64))
+        if positions.shape != game_ids.shape:
+            raise ValueError("Exactly one position must be given for every game.")
+
+        in_range = (positions >= 1) & (positions <= 9)
+        bits = np.left_shift(1, np.where(in_range, positions - 1, 0))
+        occupied = (self.x_bits[game_ids] | self.o_bits[game_ids]) & bits
+        return in_range & (occupied == 0) & (self.result[game_ids] == ONGOING)
+
+    def apply_moves(self, game_ids, positions):
+        """Places the marker of the player to move in each of the given games, detects wins
+        and draws and hands the turn over to the other player.
+
+        The batch is only applied if all moves are valid (see check_moves). Otherwise, a
+        ValueError is raised and no game is modified. Each game may only appear once per batch.
+
+        Args:
+            game_ids (array-like): The ids of the games to move in
+            positions (array-like): The position to place a marker in, one for each game
+
+        Returns:
+            np.ndarray: The results (ONGOING, X_WINS, O_WINS or DRAW) of the given games
+
+        Raises:
+            ValueError, if a game appears twice or if any of the moves is invalid
+        """
+        game_ids = self._check_ids(game_ids)
+        positions = np.atleast_1d(np.asarray(positions, dtype=np.int64))
+        if np.unique(game_ids).size != game_ids.size:
+            raise ValueError("Each game may only make one move per batch.")
+        valid = self.check_moves(game_ids, positions)
+        if not np.all(valid):
+            invalid = np.flatnonzero(~valid)[0]
+            raise ValueError(f"Invalid move {positions[invalid]} in game {game_ids[invalid]}.")
+
+        bits = np.left_shift(1, positions - 1).astype(np.uint16)
+        x_moves = self.to_move[game_ids] == 0
+        x_games, o_games = game_ids[x_moves], game_ids[~x_moves]
+        self.x_bits[x_games] |= bits[x_moves]
+        self.o_bits[o_games] |= bits[~x_moves]
+        self.last_move[game_ids] = positions
+
+        # Only the player that just moved can have won
+        self.result[x_games[WINNING[self.x_bits[x_games]]]] = X_WINS
+        self.result[o_games[WINNING[self.o_bits[o_games]]]] = O_WINS
+        full = (self.x_bits[game_ids] | self.o_bits[game_ids]) == FULL_MASK
+        self.result[game_ids[full & (self.result[game_ids] == ONGOING)]] = DRAW
+
+        self.to_move[game_ids] ^= 1
+        return self.result[game_ids]
+
+    def results(self, game_ids=None):
+        """Returns the results of the given games (or of all slots, if game_ids is None).
+
+        Args:
+            game_ids (array-like): The ids of the games, or None
+
+        Returns:
+            np.ndarray: ONGOING, X_WINS, O_WINS or DRAW for each game
+        """
+        if game_ids is None:
+            return self.result[:self._size]
+        return self.result[self._check_ids(game_ids)]
+
+    def finished(self):
+        """Returns the ids of all live games that are won or drawn.
+
+        Returns:
+            np.ndarray: The ids of all finished games
+        """
+        return np.flatnonzero(self.active[:self._size] & (self.result[:self._size] != ONGOING))
+
+    def board(self, game_id):
+        """Creates a Board object for a single game, e.g. to show it to a player.
+
+        Args:
+            game_id (int): The id of the game
+
+        Returns:
+            Board: A board holding the markers of the game
+        """
+        game_id = int(self._check_ids(game_id)[0])
+        board = Board()
+        x_bits, o_bits = int(self.x_bits[game_id]), int(self.o_bits[game_id])
+        for index in range(9):
+            if x_bits >> index & 1:
+                board.grid.flat[index] = "X"
+            elif o_bits >> index & 1:
+                board.grid.flat[index] = "O"
+        board.last_move = int(self.last_move[game_id])
+        return board
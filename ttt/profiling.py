@@ -0,0 +1,196 @@
+#!/bin/env python3
+
+import argparse
+import cProfile
+import io
+import os
+import pstats
+import random
+import runpy
+import sys
+import threading
+import tracemalloc
+from collections import Counter
+
+from ttt.game import Game
+
+# Helper functions
+
+def _frame_name(frame):
+    """Returns "module.py:function" for a stack frame."""
+    return f"{os.path.basename(frame.f_code.co_filename)}:{frame.f_code.co_name}"
+
+class Profiler:
+    """This class profiles the code run while it is active (use it as a context manager, or
+    call start and stop) in three ways at once:
+
+        - cProfile records the calls and time of every function.
+        - tracemalloc records where memory is allocated.
+        - A background thread samples the stack of the profiled thread every interval seconds
+          and counts the distinct stacks, which gives the "collapsed stacks" that flame graph
+          tools (e.g. flamegraph.pl or speedscope) read.
+
+    self.write_report then writes PREFIX.txt (the hottest functions and allocation sites),
+    PREFIX.pstats (for pstats or snakeviz) and PREFIX.collapsed.
+    """
+
+    def __init__(self, interval=0.001, top=25, memory=True):
+        """Initializes the profiler.
+
+        Args:
+            interval (float): The time between two stack samples in seconds
+            top (int): The number of functions and allocation sites in the report
+            memory (bool): Whether to trace allocations (slows the program down more)
+        """
+        self.interval = interval
+        self.top = top
+        self.memory = memory
+        self.profile = cProfile.Profile()
+        self.stacks = Counter()
+        self.snapshot = None
+        self._thread_id = None
+        self._stop = threading.Event()
+        self._sampler = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def start(self):
+        """Starts profiling the calling thread."""
+        self._thread_id = threading.get_ident()
+        self._stop.clear()
+        self._sampler = threading.Thread(target=self._sample, name="Profiler", daemon=True)
+        self._sampler.start()
+        if self.memory:
+            tracemalloc.start()
+        self.profile.enable()
+
+    def stop(self):
+        """Stops profiling and takes the allocation snapshot."""
+        self.profile.disable()
+        if self.memory:
+            self.snapshot = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+        self._stop.set()
+        self._sampler.join()
+
+    def _sample(self):
+        """Background thread counting the stacks of the profiled thread."""
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            names = []
+            while frame is not None:
+                names.append(_frame_name(frame))
+                frame = frame.f_back
+            if names:
+                self.stacks[";".join(reversed(names))] += 1
+
+    def hot_functions(self):
+        """Returns the functions that took the most time (excluding the functions they called)
+        as (name, calls, own time, cumulative time) tuples, the slowest first."""
+        stats = pstats.Stats(self.profile).stats
+        functions = [(f"{os.path.basename(filename)}:{line}({name})", calls, own, cumulative)
+                     for (filename, line, name), (_, calls, own, cumulative, _) in stats.items()]
+        functions.sort(key=lambda function: -function[2])
+        return functions[:self.top]
+
+    def allocation_sites(self):
+        """Returns the lines that allocated the most memory still in use when profiling
+        stopped, as (site, size in bytes, number of blocks) tuples."""
+        if self.snapshot is None:
+            return []
+        statistics = self.snapshot.filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ]).statistics("lineno")
+        return [(f"{os.path.basename(stat.traceback[0].filename)}:{stat.traceback[0].lineno}",
+                 stat.size, stat.count) for stat in statistics[:self.top]]
+
+    def write_report(self, prefix):
+        """Writes PREFIX.txt, PREFIX.pstats and PREFIX.collapsed.
+
+        Args:
+            prefix (str): The path of the output files without extension
+
+        Returns:
+            str: The text of the report
+        """
+        out = io.StringIO()
+        out.write(f"{'own s':>9} {'total s':>9} {'calls':>9}  function\n")
+        for name, calls, own, cumulative in self.hot_functions():
+            out.write(f"{own:>9.4f} {cumulative:>9.4f} {calls:>9}  {name}\n")
+        if self.memory:
+            out.write(f"\n{'KiB':>9} {'blocks':>9}  allocation site\n")
+            for site, size, count in self.allocation_sites():
+                out.write(f"{size / 1024:>9.1f} {count:>9}  {site}\n")
+        report = out.getvalue()
+
+        with open(prefix + ".txt", "w") as f:
+            f.write(report)
+        self.profile.dump_stats(prefix + ".pstats")
+        with open(prefix + ".collapsed", "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        return report
+
+def play_games(games, statsfile="profile_stats.json", seed=None, **game_options):
+    """Function that plays games between two players choosing random moves, headless, through
+    Game.play and including printing the board like Game.make_move does.
+
+    Args:
+        games (int): The number of games
+        statsfile (str): The stats file of the games
+        seed (int): The random seed
+        **game_options: Further arguments for Game
+
+    Returns:
+        int: The number of moves played
+    """
+    rng = random.Random(seed)
+    moves = 0
+    for i in range(games):
+        game = Game(f"player{i % 10}", f"player{(i + 1) % 10}", statsfile, **game_options)
+        positions = list(range(1, 10))
+        rng.shuffle(positions)
+        try:
+            for position in positions:
+                str(game.board)
+                game.play(position)
+                moves += 1
+        except TimeoutError:
+            moves += 1
+    return moves
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Profile headless games, or any module (e.g. ttt.main) without changing its code.")
+    parser.add_argument("--output", default="profile", help="prefix of the report files")
+    parser.add_argument("--games", type=int, default=1000, help="number of headless games to profile")
+    parser.add_argument("--module", help="run this module as __main__ instead of headless games")
+    parser.add_argument("--interval", type=float, default=0.001, help="stack sampling interval in seconds")
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--no-memory", action="store_true", help="don't trace allocations")
+    parser.add_argument("args", nargs=argparse.REMAINDER, help="arguments of the module")
+    args = parser.parse_args(argv)
+
+    profiler = Profiler(args.interval, args.top, not args.no_memory)
+    argv = sys.argv
+    try:
+        with profiler:
+            if args.module:
+                module_args = args.args[1:] if args.args[:1] == ["--"] else args.args
+                sys.argv = [args.module] + module_args
+                runpy.run_module(args.module, run_name="__main__", alter_sys=True)
+            else:
+                play_games(args.games)
+    finally:
+        # Write the report even if the module exits or fails, then pass its exit status on
+        sys.argv = argv
+        print(profiler.write_report(args.output))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+import numpy as np
+
+# Geometry of the 4 by 4 by 4 board
+#
+# Cells are numbered layer by layer, and within a layer row by row like on a Board, so
+# position p (1 to 64) is the cell (layer, row, col) = divmod(p - 1, 16) and divmod(_, 4).
+# The markers of a player are stored as a 64 bit mask, bit p - 1 standing for position p.
+
+SIZE = 4
+CELLS = SIZE ** 3
+FULL_MASK = (1 << CELLS) - 1
+
+def _lines():
+    """Returns the 76 lines of four cells as lists of 0-based cell indices."""
+    lines = []
+    directions = [(dz, dy, dx) for dz in (-1, 0, 1) for dy in (-1, 0, 1) for dx in (-1, 0, 1)
+                  if (dz, dy, dx) > (0, 0, 0)]  # One of each pair of opposite directions
+    for dz, dy, dx in directions:
+        for z in range(SIZE):
+            for y in range(SIZE):
+                for x in range(SIZE):
+                    cells = [(z + i * dz, y + i * dy, x + i * dx) for i in range(SIZE)]
+                    if all(0 <= c < SIZE for cell in cells for c in cell):
+                        lines.append([(cz * SIZE + cy) * SIZE + cx for cz, cy, cx in cells])
+    return lines
+
+LINES = np.array(_lines(), dtype=np.intp)
+LINES.flags.writeable = False
+LINE_MASKS = tuple(sum(1 << int(cell) for cell in line) for line in LINES)
+
+# For every cell, the lines through it: as indices into LINES and as bit masks, so that a win
+# check only tests these (4 to 7) lines
+CELL_LINES = tuple(np.flatnonzero((LINES == cell).any(axis=1)) for cell in range(CELLS))
+CELL_MASKS = tuple(tuple(LINE_MASKS[index] for index in lines) for lines in CELL_LINES)
+
+class QubicBoard:
+    """This class is the board of Qubic, i.e. tic-tac-toe on a 4 by 4 by 4 cube, where a player
+    wins with four markers in a row along any of the 76 lines: rows, columns and diagonals of
+    each layer, verticals through the layers, and the diagonals through the cube.
+
+    The markers of each player are kept in a 64 bit mask, and a win check only tests the lines
+    through self.last_move (see CELL_MASKS). The board has the same methods and attributes as
+    ttt.board.Board (place, remove, check_win, check_full, empty_positions, windows, size, k,
+    last_move and grid, here of shape (4, 4, 4)), so it can be played with Game and searched
+    with ttt.search.AlphaBetaSearch.
+    """
+
+    def __init__(self):
+        """Initializes an empty board."""
+        self.size = SIZE
+        self.k = SIZE
+        self.bits = {"X": 0, "O": 0}
+        self.grid = np.empty((SIZE, SIZE, SIZE), dtype=str)
+        self.last_move = 0
+
+    def __str__(self):
+        """Shows the four layers next to each other, the first layer on the left."""
+        rows = []
+        for row in range(SIZE):
+            layers = ("|".join(f" {cell or ' '} " for cell in self.grid[layer, row]) for layer in range(SIZE))
+            rows.append("     ".join(layers))
+        separator = "     ".join(["-" * (4 * SIZE - 1)] * SIZE)
+        return f"\n{separator}\n".join(rows)
+
+    def is_valid(self, position):
+        """Checks whether position is between 1 and 64 and not occupied.
+
+        Raises:
+            ValueError, if the position is invalid
+        """
+        if not (1 <= position <= CELLS):
+            raise ValueError(f"Position must be an integer between 1 and {CELLS}.")
+        if (self.bits["X"] | self.bits["O"]) >> (position - 1) & 1:
+            raise ValueError("Position already occupied.")
+
+    def place(self, position, marker):
+        """Places a marker at a valid position (see Board.place)."""
+        self.is_valid(position)
+        self.bits[marker] |= 1 << (position - 1)
+        self.grid.flat[position - 1] = marker
+        self.last_move = position
+
+    def remove(self, position, last_move=0):
+        """Takes back the marker at a position (see Board.remove)."""
+        mask = ~(1 << (position - 1))
+        self.bits["X"] &= mask
+        self.bits["O"] &= mask
+        self.grid.flat[position - 1] = ""
+        self.last_move = last_move
+
+    def check_win(self):
+        """Returns whether the marker placed last completes one of the lines through its cell."""
+        if not self.last_move:
+            return False
+        bits = self.bits[self.grid.flat[self.last_move - 1]]
+        return any(bits & mask == mask for mask in CELL_MASKS[self.last_move - 1])
+
+    def check_full(self):
+        """Returns whether all 64 cells are occupied."""
+        return self.bits["X"] | self.bits["O"] == FULL_MASK
+
+    def empty_positions(self):
+        """Returns the free positions in increasing order."""
+        free = ~(self.bits["X"] | self.bits["O"]) & FULL_MASK
+        positions = []
+        while free:
+            low = free & -free
+            positions.append(low.bit_length())
+            free ^= low
+        return positions
+
+    def windows(self):
+        """Returns the 76 lines as an array of shape (76, 4) of 0-based cell indices."""
+        return LINES
+
+    def windows_through(self):
+        """Returns, for every cell, the indices of the lines in self.windows containing it."""
+        return CELL_LINES
@@ -0,0 +1,106 @@
+import json
+import sys
+
+from ttt.journal import read_journal
+from ttt.player import Player
+
+class PlayerRegistry:
+    """This class gives every player name a small integer id, so that stats, game logs and
+    game pools can store ints instead of repeating the names:
+
+        - Ids are assigned in order of registration, starting at 0, and never change. With a
+          path, new names are appended to a file (one JSON string per line), so the ids stay
+          the same when the registry is loaded again.
+        - Names are interned with sys.intern, so each name is stored only once in memory and
+          compares by identity.
+        - Player objects are created (and their name and marker validated) once per name and
+          marker, and shared by all games afterwards.
+    """
+
+    def __init__(self, path=None):
+        """Initializes the registry and loads the names stored in path. An incomplete last
+        line is cut off, so that the next name starts on a new line.
+
+        Args:
+            path (str): The file the names are stored in. If None, ids are only kept in memory.
+        """
+        self.path = path
+        self.names = []
+        self._ids = {}
+        self._players = {}
+        self._file = None
+        if path is not None:
+            for name in read_journal(path):
+                self._add(name)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self._ids
+
+    def _add(self, name):
+        name = sys.intern(name)
+        player_id = len(self.names)
+        self._ids[name] = player_id
+        self.names.append(name)
+        return player_id
+
+    def id(self, name):
+        """Returns the id of a player, registering them if necessary.
+
+        Args:
+            name (str): The name of the player
+
+        Returns:
+            int: The id of the player
+
+        Raises:
+            ValueError, if the name is empty
+        """
+        player_id = self._ids.get(name)
+        if player_id is not None:
+            return player_id
+        if not name:
+            raise ValueError("Name must not be empty")
+        player_id = self._add(name)
+        if self.path is not None:
+            if self._file is None:
+                self._file = open(self.path, "a")
+            self._file.write(json.dumps(name) + "\n")
+            self._file.flush()
+        return player_id
+
+    def name(self, player_id):
+        """Returns the (interned) name of the player with the given id.
+
+        Raises:
+            IndexError, if the id was never assigned
+        """
+        if player_id < 0:
+            raise IndexError("Player ids are non-negative.")
+        return self.names[player_id]
+
+    def player(self, name, marker):
+        """Returns the Player with the given name (or id) and marker, creating it only once.
+
+        Args:
+            name (str or int): The name or the id of the player
+            marker (str): The marker of the player (X or O)
+
+        Returns:
+            Player: The shared Player object
+        """
+        player_id = name if isinstance(name, int) else self.id(name)
+        key = (player_id, marker.upper())
+        player = self._players.get(key)
+        if player is None:
+            player = Player(self.name(player_id), marker)
+            self._players[key] = player
+        return player
+
+    def close(self):
+        """Closes the names file."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,164 @@
+import time
+
+import numpy as np
+
+from ttt.pool import WINNING
+from ttt.solver import POWERS, TABLE_SIZE, build_tables, position_code
+
+# Properties of every position code, computed once for all 3**9 codes
+
+def _code_tables():
+    """Returns the digits, the digit of the player to move and the terminal flags of every code."""
+    codes = np.arange(TABLE_SIZE)
+    digits = ((codes[:, np.newaxis] // POWERS) % 3).astype(np.int8)
+    bits = 1 << np.arange(9)
+    won = WINNING[((digits == 1) * bits).sum(axis=1)] | WINNING[((digits == 2) * bits).sum(axis=1)]
+    full = np.all(digits != 0, axis=1)
+    mover = np.where(np.count_nonzero(digits, axis=1) % 2 == 0, 1, 2).astype(np.int8)
+    return digits, mover, won, full
+
+DIGITS, MOVER, WON, FULL = _code_tables()
+TERMINAL = WON | FULL
+
+class ValueTable:
+    """This class holds a learned value for every position code of the 3 by 3 board (see
+    ttt.solver), from the point of view of the player to move, like the solver's values:
+    1 means a win, 0 a draw and -1 a loss. Terminal positions have their exact value.
+
+    It is also a policy for ttt.player.AIPlayer: it plays the move leading to the position
+    that is worst for the opponent. Saved tables are 3**9 bytes and load with one read.
+    """
+
+    def __init__(self, values=None):
+        """Initializes the table.
+
+        Args:
+            values (np.ndarray): float array of length TABLE_SIZE (default: zeros, i.e. every
+                                 non-terminal position is assumed to be a draw)
+        """
+        if values is None:
+            values = np.zeros(TABLE_SIZE, dtype=np.float32)
+        self.values = values
+        self.values[WON] = -1.0
+        self.values[FULL & ~WON] = 0.0
+
+    def __call__(self, board):
+        """Returns the best move for board according to the table (0 if the game is over)."""
+        return int(self.best_moves(np.array([position_code(board)]))[0])
+
+    def best_moves(self, codes):
+        """Returns the greedy move (1-9) for each of the given position codes."""
+        codes = np.asarray(codes)
+        children, legal = self._children(codes)
+        child_values = np.where(legal, self.values[children], np.inf)
+        moves = np.argmin(child_values, axis=1) + 1
+        return np.where(legal.any(axis=1), moves, 0)
+
+    def _children(self, codes):
+        """Returns the codes after each of the 9 moves and which of them are legal."""
+        legal = (DIGITS[codes] == 0) & ~TERMINAL[codes][:, np.newaxis]
+        children = codes[:, np.newaxis] + MOVER[codes][:, np.newaxis].astype(np.int64) * POWERS
+        return np.where(legal, children, 0), legal
+
+    def save(self, path):
+        """Writes the table, quantized to int8 (value * 127), as a .npy file."""
+        np.save(path, np.round(np.clip(self.values, -1, 1) * 127).astype(np.int8))
+
+    @classmethod
+    def load(cls, path):
+        """Loads a table written by self.save."""
+        return cls(np.load(path).astype(np.float32) / 127)
+
+class SelfPlayTrainer:
+    """This class learns a ValueTable by self-play with temporal-difference learning (TD(0)
+    on afterstates). Many games are played at once: in every step, each game makes one move
+    chosen epsilon-greedily from the table, and the values of all positions visited in that
+    step are moved towards the negated value of the position reached, with one vectorized
+    update. Finished games are restarted from the empty board.
+    """
+
+    def __init__(self, table=None, parallel_games=1024, alpha=0.5, epsilon=0.5, seed=None):
+        """Initializes the trainer.
+
+        Args:
+            table (ValueTable): The table to train (default: a new one)
+            parallel_games (int): The number of games played at once
+            alpha (float): The learning rate
+            epsilon (float): The probability of a random exploration move
+            seed (int): The random seed
+        """
+        self.table = table if table is not None else ValueTable()
+        self.parallel_games = parallel_games
+        self.alpha = alpha
+        self.epsilon = epsilon
+        self.rng = np.random.default_rng(seed)
+        self.games = 0
+        self.games_per_second = 0.0
+        self._codes = np.zeros(parallel_games, dtype=np.int64)
+
+    def step(self):
+        """Makes one move in every game and updates the table. Returns the number of games
+        that ended."""
+        values = self.table.values
+        codes = self._codes
+        children, legal = self.table._children(codes)
+        greedy = np.argmin(np.where(legal, values[children], np.inf), axis=1)
+
+        # Random legal moves for exploration: the legal move with the largest random key
+        random_moves = np.argmax(np.where(legal, self.rng.random(legal.shape), -1.0), axis=1)
+        explore = self.rng.random(len(codes)) < self.epsilon
+        moves = np.where(explore, random_moves, greedy)
+        following = children[np.arange(len(codes)), moves]
+
+        # Only greedy moves say something about the value of the position. Many games visit
+        # the same positions (at least the empty board), so the errors are averaged per code.
+        learn = ~explore
+        updated = codes[learn]
+        errors = -values[following[learn]] - values[updated]
+        visits = np.bincount(updated, minlength=TABLE_SIZE)
+        visited = visits > 0
+        totals = np.bincount(updated, weights=errors, minlength=TABLE_SIZE)
+        values[visited] += self.alpha * (totals[visited] / visits[visited]).astype(np.float32)
+
+        done = TERMINAL[following]
+        self._codes = np.where(done, 0, following)
+        finished = int(np.count_nonzero(done))
+        self.games += finished
+        return finished
+
+    def train(self, games):
+        """Plays at least the given number of games.
+
+        Args:
+            games (int): The number of games to finish
+
+        Returns:
+            float: The training throughput in games per second
+        """
+        start = time.perf_counter()
+        finished = 0
+        while finished < games:
+            finished += self.step()
+        self.games_per_second = finished / (time.perf_counter() - start)
+        return self.games_per_second
+
+def solver_agreement(table, solver_tables=None):
+    """Function that measures how close a table is to perfect play: for every position
+    reachable from the empty board, it checks whether the table's move keeps the solver value.
+
+    Args:
+        table (ValueTable): The table to evaluate
+        solver_tables (tuple): (values, moves) as returned by ttt.solver.build_tables
+
+    Returns:
+        float: The fraction of non-terminal reachable positions where the table plays a move
+               as good as the solver's
+    """
+    values = (build_tables() if solver_tables is None else solver_tables)[0]
+    # Without a line on the board, any position where X has as many markers as O or one more
+    # can be reached by playing its markers in any order
+    difference = np.count_nonzero(DIGITS == 1, axis=1) - np.count_nonzero(DIGITS == 2, axis=1)
+    reachable = np.flatnonzero(~TERMINAL & ((difference == 0) | (difference == 1)))
+    chosen = table.best_moves(reachable)
+    following = reachable + MOVER[reachable].astype(np.int64) * POWERS[chosen - 1]
+    return float(np.mean(-values[following] == values[reachable]))
@@ -0,0 +1,337 @@
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from ttt.threats import ThreatSearch
+from ttt.transposition import EXACT, LOWER, UPPER, TranspositionTable, board_hash, zobrist_keys
+
+# Scores are given from the point of view of the player to move. A win found at ply n of
+# the search scores WIN - n, so that faster wins are preferred. Heuristic evaluations are
+# kept well below WIN and fit into the int16 values of the transposition table. Since the
+# same position can be reached at different plies, the transposition table stores win and
+# loss scores relative to the position (WIN - n for a win n plies after it) instead of the
+# root (see _to_table and _from_table).
+
+WIN = 30000
+MAX_EVALUATION = 20000
+
+class SearchResult(namedtuple("SearchResult", ["move", "score", "depth", "nodes", "elapsed"])):
+    """The outcome of a search: the best move, its score, the depth of the deepest completed
+    iteration, the number of nodes searched and the time used in seconds."""
+
+    @property
+    def nps(self):
+        """The number of nodes searched per second."""
+        return self.nodes / self.elapsed if self.elapsed else 0.0
+
+class _Timeout(Exception):
+    """Raised inside the search when the deadline has passed."""
+
+# Helper functions
+
+def _to_table(score, ply):
+    """Converts a score relative to the root into one relative to the node at ply."""
+    if score > MAX_EVALUATION:
+        return score + ply
+    if score < -MAX_EVALUATION:
+        return score - ply
+    return score
+
+def _from_table(value, ply):
+    """Converts a score stored by _to_table back into one relative to the root."""
+    if value > MAX_EVALUATION:
+        return value - ply
+    if value < -MAX_EVALUATION:
+        return value + ply
+    return value
+
+def evaluate(board, marker):
+    """Function that estimates how good a position is for the player with the given marker.
+    Every segment of k cells (see Board.windows) that only contains markers of one player is
+    worth 8 ** n points for that player, n being the number of their markers in it.
+
+    Args:
+        board (Board): The position to evaluate
+        marker (str): The marker ("X" or "O") of the player to evaluate for
+
+    Returns:
+        int: The score, positive if the position favours marker
+    """
+    windows = board.windows()
+    flat = board.grid.ravel()
+    own = (flat == marker)[windows].sum(axis=1)
+    other = ((flat != marker) & (flat != ""))[windows].sum(axis=1)
+    weights = 8 ** np.arange(board.k + 1)
+    score = int(weights[own[other == 0]].sum() - weights[other[own == 0]].sum())
+    return max(-MAX_EVALUATION, min(MAX_EVALUATION, score))
+
+def candidate_moves(board, radius=1):
+    """Function that returns the free positions within radius cells (in any direction) of an
+    existing marker. On large boards, moves far away from all markers are almost never good,
+    so the search only looks at these. An empty board only has the centre as candidate.
+
+    Args:
+        board (Board): The current board
+        radius (int): The maximum distance to the nearest marker
+
+    Returns:
+        list: The candidate positions
+    """
+    if board.grid.ndim != 2:
+        # The 3D board (see ttt.qubic) is small enough to consider every free cell
+        return board.empty_positions()
+    occupied = board.grid != ""
+    if not occupied.any():
+        return [(board.size // 2) * board.size + board.size // 2 + 1]
+    near = occupied.copy()
+    size = board.size
+    for d_row in range(-radius, radius + 1):
+        for d_col in range(-radius, radius + 1):
+            shifted = np.zeros_like(occupied)
+            shifted[max(d_row, 0):size + min(d_row, 0), max(d_col, 0):size + min(d_col, 0)] = \
+                occupied[max(-d_row, 0):size + min(-d_row, 0), max(-d_col, 0):size + min(-d_col, 0)]
+            near |= shifted
+    return [int(index) + 1 for index in np.flatnonzero((near & ~occupied).ravel())]
+
+def marker_to_move(board):
+    """Returns the marker of the player to move, given that X always starts."""
+    x_count = int(np.count_nonzero(board.grid == "X"))
+    o_count = int(np.count_nonzero(board.grid == "O"))
+    return "X" if x_count == o_count else "O"
+
+class AlphaBetaSearch:
+    """This class chooses moves on boards of any size with an iterative-deepening alpha-beta
+    search. It is meant for the N by N, k-in-a-row variants that can't be solved completely:
+
+        - The search is run with depth 1, 2, 3, ... until the time limit is reached, and the
+          best move of the deepest completed iteration is returned.
+        - Only moves close to existing markers are considered (see candidate_moves).
+        - Moves are tried in the order: best move stored in the transposition table, killer
+          moves (moves that caused a cutoff at the same ply before), then by history score
+          (how often and how deep a move caused cutoffs anywhere in the tree).
+        - Positions that were already searched are looked up in a TranspositionTable.
+        - Positions of the opening can be answered from a ttt.book.OpeningBook without searching.
+
+    Moves are made and taken back with Board.place and Board.remove, and wins are detected by
+    Board.check_win, so the search follows exactly the rules of the Board. An object of this
+    class can be used as the policy of a ttt.player.AIPlayer.
+    """
+
+    def __init__(self, time_limit=1.0, max_depth=64, radius=1, table=None, seed=0, threat_search=True, book=None):
+        """Initializes the search.
+
+        Args:
+            time_limit (float): The time per move in seconds
+            max_depth (int): The maximum depth of the iterative deepening
+            radius (int): The radius used for candidate_moves
+            table (TranspositionTable): The table to use (default: a new one with 2**18 slots)
+            seed (int): The seed of the Zobrist keys used to hash positions
+            threat_search (bool): Whether to look for forced wins with ttt.threats.ThreatSearch
+                                  before searching all moves (only if k is at least 4)
+            book (OpeningBook): Optional ttt.book.OpeningBook whose moves are played instead of
+                                searching the positions it contains
+        """
+        self.threat_search = threat_search
+        self.time_limit = time_limit
+        self.max_depth = max_depth
+        self.radius = radius
+        self.table = table if table is not None else TranspositionTable(1 << 18)
+        self.seed = seed
+        self.book = book
+        self._keys = None
+        self.nodes = 0
+        self.iterations = []
+        self.last_result = None
+
+    def __call__(self, board):
+        """Returns the best move for board within the time limit."""
+        return self.search(board).move
+
+    def _prepare(self, board):
+        """Creates the Zobrist keys and resets the move ordering statistics."""
+        cells = board.grid.size
+        if self._keys is None or len(self._keys) != cells:
+            self._keys = zobrist_keys(cells, self.seed)
+        self._history = np.zeros(cells + 1, dtype=np.int64)
+        self._killers = [[0, 0] for ply in range(self.max_depth + 2)]
+
+    def search(self, board, time_limit=None, max_depth=None, root_moves=None):
+        """Searches for the best move of the player to move.
+
+        Args:
+            board (Board): The current position. It is modified during the search, but
+                           restored before this method returns.
+            time_limit (float): Overrides the time limit of this object
+            max_depth (int): Overrides the maximum depth of this object
+            root_moves (list): Only consider these moves for the player to move, e.g. to
+                               split the root moves between several searches
+
+        Returns:
+            SearchResult: The best move (0 if there is no legal move), its score, the depth of
+                          the deepest completed iteration, the number of nodes searched and
+                          the time used. Use the nps property for nodes per second.
+                          The move and score of every completed iteration are kept in
+                          self.iterations, indexed by depth - 1.
+        """
+        start = time.monotonic()
+        time_limit = self.time_limit if time_limit is None else time_limit
+        if root_moves is None:
+            result = self.probe(board, time_limit)
+            if result is not None:
+                self.last_result = result
+                return result
+        self._deadline = start + time_limit
+        max_depth = self.max_depth if max_depth is None else min(max_depth, self.max_depth)
+        self._prepare(board)
+        self.nodes = 0
+        self.iterations = []
+
+        marker = marker_to_move(board)
+
+        key = board_hash(board, self._keys)
+        moves = candidate_moves(board, self.radius)
+        self._root_moves = None
+        if root_moves is not None:
+            self._root_moves = set(root_moves)
+            moves = [move for move in moves if move in self._root_moves]
+        best_move, best_score, depth_reached = (moves[0] if moves else 0), 0, 0
+
+        # A single move needs no search, unless its score is needed to compare it with others
+        if len(moves) > 1 or moves and root_moves is not None:
+            for depth in range(1, min(max_depth, len(board.empty_positions())) + 1):
+                try:
+                    score, move = self._root(board, depth, marker, key)
+                except _Timeout:
+                    break
+                best_move, best_score, depth_reached = move, score, depth
+                self.iterations.append((move, score))
+                if abs(score) >= WIN - self.max_depth:
+                    break
+
+        self.last_result = SearchResult(best_move, best_score, depth_reached, self.nodes,
+                                        time.monotonic() - start)
+        return self.last_result
+
+    def probe(self, board, time_limit=None):
+        """Answers a position without searching all moves: with the move of self.book, or
+        with the first move of a forced win found by ttt.threats.ThreatSearch (if
+        self.threat_search is set and k is at least 4). self.search does this first, unless it
+        is restricted to some root moves, so a search split over the root moves (see
+        ttt.parallel.ParallelSearch) should call it once before splitting.
+
+        Args:
+            board (Board): The current position
+            time_limit (float): The time per move the threat search takes a share of
+
+        Returns:
+            SearchResult: The result, or None if the position has to be searched
+        """
+        start = time.monotonic()
+        if self.book is not None:
+            entry = self.book.lookup(board)
+            if entry is not None:
+                move, score, depth = entry
+                return SearchResult(move, score, depth, 0, time.monotonic() - start)
+        if self.threat_search and board.k >= 4:
+            time_limit = self.time_limit if time_limit is None else time_limit
+            return self._forced_win(board, marker_to_move(board), time_limit, start)
+        return None
+
+    def _forced_win(self, board, marker, time_limit, start):
+        """Looks for a VCF, then for a VCT, using up to a third of the time. Returns a
+        SearchResult for the first move of the forced win, or None."""
+        threats = ThreatSearch(board)
+        line = threats.find_vcf(marker, time_limit=time_limit / 10)
+        if line is None:
+            line = threats.find_vct(marker, time_limit=time_limit / 4)
+        if line is None:
+            return None
+        depth = 2 * len(line) - 1
+        return SearchResult(line[0], WIN - depth, depth, threats.nodes, time.monotonic() - start)
+
+    def _root(self, board, depth, marker, key):
+        """Searches all root moves to the given depth. Returns the best score and move."""
+        score = self._negamax(board, depth, -WIN - 1, WIN + 1, 0, marker, key)
+        return score, self._root_move
+
+    def _ordered_moves(self, board, ply, tt_move):
+        """Returns the candidate moves, the most promising ones first."""
+        moves = candidate_moves(board, self.radius)
+        if ply == 0 and self._root_moves is not None:
+            moves = [move for move in moves if move in self._root_moves]
+        killers = self._killers[ply]
+        history = self._history
+
+        def priority(move):
+            if move == tt_move:
+                return (0, 0)
+            if move in killers:
+                return (1, 0)
+            return (2, -history[move])
+
+        moves.sort(key=priority)
+        return moves
+
+    def _negamax(self, board, depth, alpha, beta, ply, marker, key):
+        """Alpha-beta search of the current position. Returns its score for marker."""
+        self.nodes += 1
+        if self.nodes & 31 == 0 and time.monotonic() > self._deadline:
+            raise _Timeout()
+
+        alpha_original = alpha
+        tt_move = 0
+        entry = self.table.probe(key)
+        if entry is not None:
+            value, entry_depth, bound, tt_move = entry
+            value = _from_table(value, ply)
+            if entry_depth >= depth and ply > 0:
+                if bound == EXACT:
+                    return value
+                if bound == LOWER:
+                    alpha = max(alpha, value)
+                elif bound == UPPER:
+                    beta = min(beta, value)
+                if alpha >= beta:
+                    return value
+
+        if depth == 0:
+            return evaluate(board, marker)
+
+        other = "O" if marker == "X" else "X"
+        side = 0 if marker == "X" else 1
+        best_score, best_move = -WIN - 1, 0
+        for move in self._ordered_moves(board, ply, tt_move):
+            previous = board.last_move
+            board.place(move, marker)
+            try:
+                if board.check_win():
+                    score = WIN - ply
+                elif board.check_full():
+                    score = 0
+                else:
+                    child_key = key ^ int(self._keys[move - 1, side])
+                    score = -self._negamax(board, depth - 1, -beta, -alpha, ply + 1, other, child_key)
+            finally:
+                board.remove(move, previous)
+
+            if score > best_score:
+                best_score, best_move = score, move
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                killers = self._killers[ply]
+                if move not in killers:
+                    killers[1], killers[0] = killers[0], move
+                self._history[move] += depth * depth
+                break
+
+        if ply == 0:
+            self._root_move = best_move
+        if best_score <= alpha_original:
+            bound = UPPER
+        elif best_score >= beta:
+            bound = LOWER
+        else:
+            bound = EXACT
+        self.table.store(key, depth, _to_table(best_score, ply), bound, best_move)
+        return best_score
@@ -0,0 +1,227 @@
+#!/bin/env python3
+
+import argparse
+import json
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from ttt.board import Board, FULL_MASK, is_winning_mask
+from ttt.solver import canonical_code, code_to_masks, position_code, side_to_move, solve
+
+EMPTY_CELLS = ".-_ "
+
+# Helper functions
+
+def parse_grid(text):
+    """Function that creates a Board from a 9 character grid string, read row by row
+    (i.e. character p - 1 describes position p). "X" and "O" (in any case) are markers,
+    ".", "-", "_" and " " are empty cells.
+
+    Args:
+        text (str): The grid string, e.g. "X...O...."
+
+    Returns:
+        Board: The board described by the string
+
+    Raises:
+        ValueError, if the string is not a valid grid or the marker counts are impossible
+    """
+    if len(text) != 9:
+        raise ValueError("Grid must have exactly 9 characters.")
+    board = Board()
+    for index, char in enumerate(text.upper()):
+        if char in "XO":
+            board.grid.flat[index] = char
+        elif char not in EMPTY_CELLS:
+            raise ValueError(f"Invalid character {char!r} in grid.")
+    x_count, o_count = text.upper().count("X"), text.upper().count("O")
+    if x_count - o_count not in (0, 1):
+        raise ValueError("Grid cannot be reached in a game where X starts.")
+    return board
+
+def parse_moves(moves):
+    """Function that creates a Board by playing the given positions, starting with X.
+
+    Args:
+        moves (str or list): The positions, either as a list of integers or as a string
+                             like "5,1,9" or "519"
+
+    Returns:
+        Board: The board after all moves have been played
+
+    Raises:
+        ValueError, if a move is invalid or the game ended before the last move
+    """
+    if isinstance(moves, str):
+        moves = moves.split(",") if "," in moves else list(moves)
+    board = Board()
+    for i, move in enumerate(moves):
+        if board.last_move and (board.check_win() or board.check_full()):
+            raise ValueError("Moves continue after the end of the game.")
+        board.place(int(move), "XO"[i % 2])
+    return board
+
+class BestMoveService:
+    """This class answers the question "given this board, what is the best move, what is
+    its value and which moves are legal?".
+
+    Answers are computed with ttt.solver and kept in a bounded LRU cache keyed by the
+    canonical position code (see ttt.solver.canonical_code), so that all 8 rotations and
+    reflections of a position share one cache entry. The cache statistics are available
+    through the metrics method.
+    """
+
+    def __init__(self, cache_size=4096, tables=None):
+        """Initializes the service.
+
+        Args:
+            cache_size (int): The maximum number of positions kept in the cache
+            tables (SharedArrays): Optional precomputed solver tables (see
+                                   ttt.shared.shared_position_tables). If given, cache
+                                   misses are answered from them instead of by searching.
+        """
+        if cache_size < 1:
+            raise ValueError("Cache size must be positive.")
+        self.cache_size = cache_size
+        self.tables = tables
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _solve_canonical(self, code):
+        """Returns (value, best move) of a canonical position, using the cache."""
+        with self._lock:
+            entry = self._cache.get(code)
+            if entry is not None:
+                self._cache.move_to_end(code)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        if self.tables is not None:
+            entry = (int(self.tables["values"][code]), int(self.tables["moves"][code]))
+        else:
+            board = Board()
+            x_bits, o_bits = code_to_masks(code)
+            for index in range(9):
+                if x_bits >> index & 1:
+                    board.grid.flat[index] = "X"
+                elif o_bits >> index & 1:
+                    board.grid.flat[index] = "O"
+            entry = solve(board)
+
+        with self._lock:
+            self._cache[code] = entry
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return entry
+
+    def query(self, board):
+        """Answers a query for the given board.
+
+        Args:
+            board (Board): The position to evaluate
+
+        Returns:
+            dict: With the keys "to_move" (the marker of the player to move), "value" (1 =
+                  win, 0 = draw, -1 = loss for that player), "best_move" (a position, or
+                  0 if the game is over) and "legal_moves" (list of positions)
+        """
+        code = position_code(board)
+        canonical, perm = canonical_code(code)
+        value, move = self._solve_canonical(canonical)
+        best_move = perm[move - 1] + 1 if move else 0
+
+        x_bits, o_bits = code_to_masks(code)
+        occupied = x_bits | o_bits
+        over = is_winning_mask(x_bits) or is_winning_mask(o_bits) or occupied == FULL_MASK
+        legal_moves = [] if over else [p for p in range(1, 10) if not occupied >> (p - 1) & 1]
+        return {"to_move": side_to_move(x_bits, o_bits), "value": value,
+                "best_move": best_move, "legal_moves": legal_moves}
+
+    def metrics(self):
+        """Returns the cache statistics.
+
+        Returns:
+            dict: The number of hits and misses, the hit rate and the current cache size
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses,
+                    "hit_rate": self.hits / total if total else 0.0,
+                    "size": len(self._cache), "capacity": self.cache_size}
+
+class _Handler(BaseHTTPRequestHandler):
+    """Request handler for make_server. The service is stored on the server object."""
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {key: values[-1] for key, values in parse_qs(url.query, keep_blank_values=True).items()}
+        try:
+            if url.path == "/metrics":
+                self._reply(200, self.server.service.metrics())
+            elif url.path == "/best":
+                if "board" in params:
+                    board = parse_grid(params["board"])
+                elif "moves" in params:
+                    board = parse_moves(params["moves"])
+                else:
+                    raise ValueError("Either 'board' or 'moves' must be given.")
+                self._reply(200, self.server.service.query(board))
+            else:
+                self._reply(404, {"error": f"Unknown path {url.path}"})
+        except ValueError as e:
+            self._reply(400, {"error": str(e)})
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Logging every request would dominate the cost of cached answers
+        pass
+
+def make_server(service, host="127.0.0.1", port=8000):
+    """Function that creates an HTTP server for a BestMoveService. It answers
+
+        GET /best?board=X...O....   (grid string, see parse_grid)
+        GET /best?moves=5,1         (move list, see parse_moves)
+        GET /metrics                (cache statistics)
+
+    with JSON. Call serve_forever on the returned server to start it.
+
+    Args:
+        service (BestMoveService): The service answering the queries
+        host (str): The address to listen on (default: localhost only)
+        port (int): The port to listen on (0 picks a free port)
+
+    Returns:
+        ThreadingHTTPServer: The server
+    """
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    server.service = service
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve best-move queries for TicTacToe positions.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--cache-size", type=int, default=4096)
+    args = parser.parse_args()
+
+    server = make_server(BestMoveService(args.cache_size), args.host, args.port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
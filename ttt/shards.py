@@ -0,0 +1,131 @@
+import json
+import os
+import zlib
+
+from ttt.journal import atomic_write
+
+# Helper functions
+
+def shard_of(name, shards):
+    """Function that returns the shard (0 to shards - 1) a player's stats are stored in,
+    using the CRC-32 of the name, which is the same in every process and on every host.
+
+    Args:
+        name (str): The name of the player
+        shards (int): The number of shards
+
+    Returns:
+        int: The index of the shard
+    """
+    return zlib.crc32(name.encode()) % shards
+
+def _write_json(path, data):
+    """Writes data as JSON to a temporary file, which then atomically replaces path."""
+    with atomic_write(path) as f:
+        json.dump(data, f)
+
+class ShardedStats:
+    """This class stores the wins of the players like write_stats in ttt.game, but split into
+    several small JSON files by a hash of the player name (see shard_of). Recording a win only
+    rewrites the shard of the winner, and looking up a player only reads their shard, so both
+    cost the size of one shard instead of the whole stats file. With enough shards (e.g. one
+    per few thousand players) that cost stays small however many players there are.
+
+    Each shard has the format of the legacy stats file ({name: wins}); self.compact combines
+    them into a single legacy file. The directory contains a manifest with the number of
+    shards, so that it can't be opened with a different one by mistake.
+    """
+
+    MANIFEST = "manifest.json"
+
+    def __init__(self, directory, shards=16):
+        """Initializes the store, creating the directory if necessary.
+
+        Args:
+            directory (str): The directory holding the shard files
+            shards (int): The number of shards of a new store
+
+        Raises:
+            ValueError, if the directory already holds a store with a different number of shards
+        """
+        if shards < 1:
+            raise ValueError("There must be at least one shard.")
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        manifest = os.path.join(directory, self.MANIFEST)
+        if os.path.exists(manifest):
+            with open(manifest, "r") as f:
+                stored = json.load(f)["shards"]
+            if stored != shards:
+                raise ValueError(f"The store in {directory} has {stored} shards, not {shards}.")
+        else:
+            _write_json(manifest, {"shards": shards})
+        self.shards = shards
+
+    def shard_path(self, index):
+        """Returns the file name of a shard."""
+        return os.path.join(self.directory, f"stats-{index:04d}.json")
+
+    def load_shard(self, index):
+        """Returns the {name: wins} dictionary of a shard (empty if it doesn't exist yet)."""
+        path = self.shard_path(index)
+        if not os.path.exists(path):
+            return {}
+        with open(path, "r") as f:
+            return json.load(f)
+
+    def increment(self, name, amount=1):
+        """Adds wins for a player, rewriting only their shard.
+
+        Args:
+            name (str): The name of the player
+            amount (int): The number of wins to add
+        """
+        index = shard_of(name, self.shards)
+        stats = self.load_shard(index)
+        stats[name] = stats.get(name, 0) + amount
+        _write_json(self.shard_path(index), stats)
+
+    def get(self, name):
+        """Returns the number of wins of a player (0 if they never won), reading only their shard."""
+        return self.load_shard(shard_of(name, self.shards)).get(name, 0)
+
+    def items(self):
+        """Yields (name, wins) for all players, one shard at a time."""
+        for index in range(self.shards):
+            yield from self.load_shard(index).items()
+
+    def compact(self, statsfile):
+        """Writes the legacy single stats file ({name: wins}) with the wins of all players.
+
+        Args:
+            statsfile (str): The file to write (replaced atomically)
+        """
+        _write_json(statsfile, dict(self.items()))
+
+    @classmethod
+    def from_legacy(cls, statsfile, directory, shards=16):
+        """Creates a store from a legacy stats file written by write_stats, adding its wins
+        to those already in the store.
+
+        Args:
+            statsfile (str): The legacy stats file
+            directory (str): The directory of the store
+            shards (int): The number of shards
+
+        Returns:
+            ShardedStats: The store
+        """
+        store = cls(directory, shards)
+        with open(statsfile, "r") as f:
+            legacy = json.load(f)
+        split = [{} for index in range(shards)]
+        for name, wins in legacy.items():
+            split[shard_of(name, shards)][name] = wins
+        for index, part in enumerate(split):
+            if part:
+                stats = store.load_shard(index)
+                for name, wins in part.items():
+                    stats[name] = stats.get(name, 0) + wins
+                _write_json(store.shard_path(index), stats)
+        return store
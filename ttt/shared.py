@@ -0,0 +1,216 @@
+import json
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from ttt.solver import build_tables
+
+# Data in shared blocks and files starts at a multiple of this many bytes
+ALIGNMENT = 64
+
+def _layout(arrays):
+    """Computes where each array is stored inside one contiguous block of memory.
+
+    Returns:
+        (layout, size) (tuple): A list of (name, descr, shape, offset) entries and the
+                                total number of bytes needed
+    """
+    layout = []
+    offset = 0
+    for name, array in arrays.items():
+        # The numpy descriptor (unlike dtype.str) keeps the fields of structured dtypes
+        layout.append((name, np.lib.format.dtype_to_descr(array.dtype), list(array.shape), offset))
+        offset += -(-array.nbytes // ALIGNMENT) * ALIGNMENT
+    return layout, max(offset, 1)
+
+def _views(buffer, layout, offset=0):
+    """Creates read-only numpy views of the arrays described by layout inside buffer."""
+    views = {}
+    for name, descr, shape, start in layout:
+        dtype = np.lib.format.descr_to_dtype(descr)
+        view = np.ndarray(shape, dtype=dtype, buffer=buffer, offset=offset + start)
+        view.flags.writeable = False
+        views[name] = view
+    return views
+
+class SharedArrays:
+    """This class keeps a set of named numpy arrays, such as the solver tables of
+    ttt.solver.build_tables or a transposition table, in a single block of memory that
+    can be shared between processes without copying:
+
+        - The owning process creates the block with SharedArrays.create and passes
+          SharedArrays.handle (a small, picklable tuple) to its workers.
+        - Each worker calls SharedArrays.attach(handle) and gets read-only views of the
+          same physical memory, so starting a worker costs neither the time to build the
+          tables nor a copy of them.
+
+    Alternatively, the arrays can be written to a file with SharedArrays.save and mapped
+    into any number of processes with SharedArrays.load, which lets the operating system
+    share the pages between them.
+
+    The arrays are available through indexing, e.g. shared["values"].
+    """
+
+    def __init__(self, arrays, shm=None, mmap=None, owner=False):
+        """Initializes the object. Use create, attach or load instead of calling this directly.
+
+        Args:
+            arrays (dict): The read-only views, keyed by name
+            shm (SharedMemory): The shared memory block backing the views, if any
+            mmap (np.memmap): The memory-mapped file backing the views, if any
+            owner (bool): Whether this process created the shared memory block
+        """
+        self.arrays = arrays
+        self._shm = shm
+        self._mmap = mmap
+        self._owner = owner
+        self._layout = None
+
+    def __getitem__(self, name):
+        return self.arrays[name]
+
+    def __contains__(self, name):
+        return name in self.arrays
+
+    @classmethod
+    def create(cls, arrays, name=None):
+        """Copies the given arrays into a new shared memory block.
+
+        Args:
+            arrays (dict): The numpy arrays to share, keyed by name
+            name (str): The name of the shared memory block (default: chosen by the system)
+
+        Returns:
+            SharedArrays: The owner of the block, which is responsible for calling unlink
+        """
+        layout, size = _layout(arrays)
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        for (key, descr, shape, offset) in layout:
+            target = np.ndarray(shape, dtype=arrays[key].dtype, buffer=shm.buf, offset=offset)
+            target[...] = arrays[key]
+            del target
+        shared = cls(_views(shm.buf, layout), shm=shm, owner=True)
+        shared._layout = layout
+        return shared
+
+    @property
+    def handle(self):
+        """A picklable description of the shared block that can be passed to attach."""
+        if self._shm is None:
+            raise ValueError("Only arrays in shared memory have a handle.")
+        return (self._shm.name, self._layout)
+
+    @classmethod
+    def attach(cls, handle):
+        """Attaches to a shared memory block created by another process.
+
+        Args:
+            handle (tuple): The handle of the block (see SharedArrays.handle)
+
+        Returns:
+            SharedArrays: Read-only views of the shared arrays
+        """
+        name, layout = handle
+        shm = shared_memory.SharedMemory(name=name)
+        # Only the owner may remove the block. Without this, the resource tracker would
+        # unlink it as soon as the first worker exits.
+        resource_tracker.unregister(shm._name, "shared_memory")
+        shared = cls(_views(shm.buf, layout), shm=shm)
+        shared._layout = layout
+        return shared
+
+    def save(self, path):
+        """Writes the arrays to a file that can be memory-mapped by SharedArrays.load.
+
+        The file consists of a small JSON header describing the layout, padded to
+        ALIGNMENT bytes, followed by the raw array data.
+
+        Args:
+            path (str): The name of the file
+        """
+        save_arrays(path, self.arrays)
+
+    @classmethod
+    def load(cls, path):
+        """Memory-maps a file written by SharedArrays.save or save_arrays.
+
+        Args:
+            path (str): The name of the file
+
+        Returns:
+            SharedArrays: Read-only views of the arrays in the file
+        """
+        layout, data_offset = _read_header(path)
+        mmap = np.memmap(path, dtype=np.uint8, mode="r")
+        return cls(_views(mmap, layout, offset=data_offset), mmap=mmap)
+
+    def close(self):
+        """Releases this process's views of the arrays. The arrays must not be used afterwards."""
+        self.arrays = {}
+        if self._shm is not None:
+            self._shm.close()
+        self._mmap = None
+
+    def unlink(self):
+        """Closes the arrays and, if this process created them, frees the shared memory block."""
+        owner = self._owner
+        shm = self._shm
+        self.close()
+        if owner and shm is not None:
+            shm.unlink()
+        self._owner = False
+
+def save_arrays(path, arrays):
+    """Function that writes numpy arrays to a file in the format read by SharedArrays.load.
+
+    Args:
+        path (str): The name of the file
+        arrays (dict): The numpy arrays to store, keyed by name
+    """
+    layout, size = _layout(arrays)
+    header = json.dumps(layout).encode()
+    data_offset = -(-(8 + len(header)) // ALIGNMENT) * ALIGNMENT
+    with open(path, "wb") as f:
+        f.write(len(header).to_bytes(8, "little"))
+        f.write(header)
+        f.write(b"\0" * (data_offset - 8 - len(header)))
+        for (name, descr, shape, offset) in layout:
+            f.seek(data_offset + offset)
+            f.write(np.ascontiguousarray(arrays[name]).tobytes())
+        f.truncate(data_offset + size)
+
+def _read_header(path):
+    """Reads the layout of a file written by save_arrays and the offset of its data."""
+    with open(path, "rb") as f:
+        header_size = int.from_bytes(f.read(8), "little")
+        layout = json.loads(f.read(header_size))
+    return layout, -(-(8 + header_size) // ALIGNMENT) * ALIGNMENT
+
+def load_arrays(path, mode="r"):
+    """Function that memory-maps each array of a file written by save_arrays separately.
+
+    Args:
+        path (str): The name of the file
+        mode (str): "r" for read-only arrays, "c" for copy-on-write arrays (changes stay
+                    private to this process) or "r+" to write changes back to the file
+
+    Returns:
+        dict: The np.memmap arrays, keyed by name
+    """
+    layout, data_offset = _read_header(path)
+    return {name: np.memmap(path, dtype=np.lib.format.descr_to_dtype(descr), mode=mode,
+                            shape=tuple(shape), offset=data_offset + start)
+            for name, descr, shape, start in layout}
+
+def shared_position_tables(name=None):
+    """Function that builds the solver tables (see ttt.solver.build_tables) and places them
+    in shared memory as the arrays "values" and "moves".
+
+    Args:
+        name (str): The name of the shared memory block (default: chosen by the system)
+
+    Returns:
+        SharedArrays: The owner of the shared tables
+    """
+    values, moves = build_tables()
+    return SharedArrays.create({"values": values, "moves": moves}, name=name)
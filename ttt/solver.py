@@ -0,0 +1,219 @@
+import numpy as np
+
+from ttt.board import FULL_MASK, grid_to_mask, is_winning_mask
+
+# Position codes
+#
+# Every 3 by 3 position can be written as a number in base 3 where digit p - 1 is 0 if
+# position p is empty, 1 if it holds an X and 2 if it holds an O. This gives each of the
+# 3**9 possible grids a unique index into flat lookup tables.
+
+TABLE_SIZE = 3 ** 9
+POWERS = 3 ** np.arange(9)
+
+def masks_to_code(x_bits, o_bits):
+    """Function that converts the bit masks of both players to a position code.
+
+    Args:
+        x_bits (int): The positions of the X markers as a 9 bit mask
+        o_bits (int): The positions of the O markers as a 9 bit mask
+
+    Returns:
+        int: The position code
+    """
+    code = 0
+    for index in range(9):
+        if x_bits >> index & 1:
+            code += 3 ** index
+        elif o_bits >> index & 1:
+            code += 2 * 3 ** index
+    return code
+
+def code_to_masks(code):
+    """Function that converts a position code back to the bit masks of both players.
+
+    Args:
+        code (int): The position code
+
+    Returns:
+        (x_bits, o_bits) (tuple): The positions of the X and O markers as 9 bit masks
+    """
+    x_bits = o_bits = 0
+    for index in range(9):
+        code, digit = divmod(code, 3)
+        if digit == 1:
+            x_bits |= 1 << index
+        elif digit == 2:
+            o_bits |= 1 << index
+    return x_bits, o_bits
+
+def position_code(board):
+    """Function that returns the position code of a Board.
+
+    Args:
+        board (Board): The board to encode
+
+    Returns:
+        int: The position code
+    """
+    return int(position_codes(board.grid[np.newaxis])[0])
+
+def position_codes(grids):
+    """Vectorized version of position_code for many grids at once.
+
+    Args:
+        grids (np.ndarray): Array of shape (n, 3, 3) holding "X", "O" and ""
+
+    Returns:
+        np.ndarray: The n position codes
+    """
+    grids = np.asarray(grids).reshape(-1, 9)
+    digits = (grids == "X") + 2 * (grids == "O")
+    return digits @ POWERS
+
+def side_to_move(x_bits, o_bits):
+    """Returns the marker ("X" or "O") of the player to move, given that X always starts."""
+    return "X" if bin(x_bits).count("1") == bin(o_bits).count("1") else "O"
+
+# Symmetries
+#
+# Rotating or mirroring a position doesn't change its value, so caches and books only need
+# to store one representative ("canonical") position out of up to 8 equivalent ones. Each
+# symmetry is given as a permutation of the 9 cell indices: cell i of the transformed grid
+# holds the marker of cell perm[i] of the original grid.
+
+def _symmetries():
+    """Returns the 8 rotations and reflections of the 3 by 3 grid as index permutations."""
+    cells = np.arange(9).reshape(3, 3)
+    perms = []
+    for k in range(4):
+        rotated = np.rot90(cells, k)
+        perms.append(tuple(int(i) for i in rotated.flatten()))
+        perms.append(tuple(int(i) for i in np.fliplr(rotated).flatten()))
+    return tuple(perms)
+
+SYMMETRIES = _symmetries()
+
+def transform_code(code, perm):
+    """Function that applies a symmetry to a position code.
+
+    Args:
+        code (int): The position code
+        perm (tuple): The symmetry as a permutation of the cell indices (see SYMMETRIES)
+
+    Returns:
+        int: The position code of the transformed grid
+    """
+    digits = [(code // 3 ** index) % 3 for index in range(9)]
+    return sum(digits[perm[index]] * 3 ** index for index in range(9))
+
+def canonical_code(code):
+    """Function that finds the smallest position code among all symmetric variants of a position.
+
+    Args:
+        code (int): The position code
+
+    Returns:
+        (canonical, perm) (tuple): The canonical code and the symmetry that produces it
+                                   from code. Position p of the canonical grid corresponds
+                                   to position perm[p - 1] + 1 of the original grid.
+    """
+    return min((transform_code(code, perm), perm) for perm in SYMMETRIES)
+
+# Solver
+
+def _negamax(x_bits, o_bits, table, exhaustive=False):
+    """Solves the position given by the two bit masks and stores the (value, best move)
+    pair of it and of the positions searched from it in table, keyed by position code.
+    Values are given from the point of view of the player to move (1 = win, 0 = draw,
+    -1 = loss), the best move is 0 if the game is already over.
+
+    Once a winning move is found, the remaining moves are skipped, unless exhaustive is set:
+    then every position reachable from the given one ends up in table. The best move is the
+    same either way (the first move with the highest value).
+    """
+    code = masks_to_code(x_bits, o_bits)
+    if code in table:
+        return table[code]
+
+    x_to_move = side_to_move(x_bits, o_bits) == "X"
+    opponent = o_bits if x_to_move else x_bits
+    if is_winning_mask(opponent):
+        entry = (-1, 0)
+    elif x_bits | o_bits == FULL_MASK:
+        entry = (0, 0)
+    else:
+        entry = (-2, 0)
+        for index in range(9):
+            bit = 1 << index
+            if (x_bits | o_bits) & bit:
+                continue
+            if x_to_move:
+                value = -_negamax(x_bits | bit, o_bits, table, exhaustive)[0]
+            else:
+                value = -_negamax(x_bits, o_bits | bit, table, exhaustive)[0]
+            if value > entry[0]:
+                entry = (value, index + 1)
+                if value == 1 and not exhaustive:
+                    break
+
+    table[code] = entry
+    return entry
+
+def solve(board):
+    """Function that solves a TicTacToe position by searching the whole game tree.
+
+    Args:
+        board (Board): The position to solve. The player to move is derived from the
+                       number of markers on the board (X always starts).
+
+    Returns:
+        (value, best_move) (tuple): The value of the position for the player to move
+                                    (1 = win, 0 = draw, -1 = loss) and a position (1-9)
+                                    reaching this value, or 0 if the game is over.
+    """
+    return _negamax(grid_to_mask(board.grid, "X"), grid_to_mask(board.grid, "O"), {})
+
+def build_tables():
+    """Function that solves every position reachable from the empty board.
+
+    Returns:
+        (values, moves) (tuple): Two int8 arrays of length TABLE_SIZE, indexed by position
+                                 code, holding the value and best move of each position
+                                 as returned by solve. Unreachable codes hold 0.
+    """
+    table = {}
+    _negamax(0, 0, table, exhaustive=True)
+    values = np.zeros(TABLE_SIZE, dtype=np.int8)
+    moves = np.zeros(TABLE_SIZE, dtype=np.int8)
+    codes = np.fromiter(table.keys(), dtype=np.int64, count=len(table))
+    entries = np.array(list(table.values()), dtype=np.int8)
+    values[codes] = entries[:, 0]
+    moves[codes] = entries[:, 1]
+    return values, moves
+
+class TablePolicy:
+    """This class picks moves by looking up positions in a best-move table indexed by
+    position code, such as the one returned by build_tables. It can be used as the policy of
+    a ttt.player.AIPlayer, and self.batch answers many positions with a single indexing
+    operation.
+    """
+
+    def __init__(self, moves=None):
+        """Initializes the policy.
+
+        Args:
+            moves (np.ndarray): The best move for every position code. If None, the tables
+                                are built with build_tables.
+        """
+        if moves is None:
+            moves = build_tables()[1]
+        self.moves = moves
+
+    def __call__(self, board):
+        """Returns the best move for a Board (0 if the game is over)."""
+        return int(self.moves[position_code(board)])
+
+    def batch(self, grids):
+        """Returns the best moves for an array of grids of shape (n, 3, 3)."""
+        return self.moves[position_codes(grids)]
@@ -0,0 +1,332 @@
+import itertools
+import json
+import os
+import random
+
+from ttt.journal import atomic_write, read_journal
+
+DEFAULT_RATING = 1500.0
+K_FACTOR = 32.0
+
+# Helper functions
+
+def expected_score(rating, opponent_rating):
+    """Function that returns the expected score (between 0 and 1) of a player with the given
+    Elo rating against an opponent with opponent_rating.
+
+    Args:
+        rating (float): The rating of the player
+        opponent_rating (float): The rating of the opponent
+
+    Returns:
+        float: The expected score, 0.5 for equally rated players
+    """
+    return 1.0 / (1.0 + 10.0 ** ((opponent_rating - rating) / 400.0))
+
+class _Node:
+    """A node of a _Ranking."""
+
+    __slots__ = ("value", "next", "width")
+
+    def __init__(self, value, height):
+        self.value = value
+        self.next = [None] * height
+        self.width = [1] * height
+
+class _Ranking:
+    """A sorted list with O(log n) expected time for inserting, removing and ranking entries
+    (an indexable skip list). Every link of the skip list stores how many entries it skips,
+    so the number of entries before a value is the sum of the widths along the search path,
+    and an update only changes the links on that path.
+    """
+
+    MAX_HEIGHT = 32
+
+    def __init__(self, seed=0):
+        self._head = _Node(None, self.MAX_HEIGHT)
+        self._rng = random.Random(seed)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        node = self._head.next[0]
+        while node is not None:
+            yield node.value
+            node = node.next[0]
+
+    def _path(self, value):
+        """Returns the last node before value on every level and the index of each
+        (the head has index 0, the first entry index 1)."""
+        chain = [None] * self.MAX_HEIGHT
+        indices = [0] * self.MAX_HEIGHT
+        node, index = self._head, 0
+        for level in reversed(range(self.MAX_HEIGHT)):
+            while node.next[level] is not None and node.next[level].value < value:
+                index += node.width[level]
+                node = node.next[level]
+            chain[level], indices[level] = node, index
+        return chain, indices
+
+    def insert(self, value):
+        """Inserts a value at its sorted position."""
+        chain, indices = self._path(value)
+        height = 1
+        while height < self.MAX_HEIGHT and self._rng.random() < 0.5:
+            height += 1
+        node = _Node(value, height)
+        index = indices[0] + 1
+        for level in range(height):
+            previous = chain[level]
+            node.next[level] = previous.next[level]
+            previous.next[level] = node
+            node.width[level] = previous.width[level] - (index - 1 - indices[level])
+            previous.width[level] = index - indices[level]
+        for level in range(height, self.MAX_HEIGHT):
+            chain[level].width[level] += 1
+        self._size += 1
+
+    def remove(self, value):
+        """Removes a value.
+
+        Raises:
+            ValueError, if the value is not in the list
+        """
+        chain, indices = self._path(value)
+        node = chain[0].next[0]
+        if node is None or node.value != value:
+            raise ValueError(f"{value!r} is not in the ranking.")
+        for level in range(self.MAX_HEIGHT):
+            previous = chain[level]
+            if previous.next[level] is node:
+                previous.width[level] += node.width[level] - 1
+                previous.next[level] = node.next[level]
+            else:
+                previous.width[level] -= 1
+        self._size -= 1
+
+    def rank(self, value):
+        """Returns the number of entries smaller than value."""
+        return self._path(value)[1][0]
+
+class StatsStore:
+    """This class keeps wins, losses, draws, games played and an Elo rating for every player.
+
+    Unlike write_stats in ttt.game, which reads and rewrites the whole stats file for every
+    win, recording a game only updates the two players involved in memory and appends one
+    line to a journal file. The full state is written as a snapshot by self.save, which also
+    starts a new journal. Loading reads the snapshot and replays its journal.
+
+    Players are stored in parallel lists indexed by a slot number, so updating the counters
+    and ratings of a game is O(1). Leaderboard and rank queries are served by a ranking of
+    (-rating, name, slot) tuples kept in sorted order in a skip list (see _Ranking), whose
+    updates and rank queries take O(log n) expected time for n players.
+
+    With a ttt.registry.PlayerRegistry, players may also be given by their ids, names are
+    interned, and the journal stores ids instead of names.
+    """
+
+    def __init__(self, path=None, k_factor=K_FACTOR, registry=None):
+        """Initializes the store and loads existing data from path.
+
+        Args:
+            path (str): The snapshot file. The journal is stored next to it, named after the
+                        snapshot and its generation (e.g. "ratings.json.3.journal"). If None,
+                        the stats are only kept in memory.
+            k_factor (float): The Elo K-factor, i.e. the maximum rating change per game
+            registry (PlayerRegistry): Optional registry assigning ids to the player names. It
+                                       must be persistent (have a path) if the store is.
+        """
+        self.path = path
+        self.k_factor = k_factor
+        self.registry = registry
+        self._journal = None
+        self._reset()
+        if path is not None:
+            self.load()
+
+    def _reset(self):
+        """Removes all players from memory."""
+        self._index = {}
+        self.names = []
+        self.wins = []
+        self.losses = []
+        self.draws = []
+        self.ratings = []
+        self._ranking = _Ranking()
+        self._generation = 0
+
+    @property
+    def journal_path(self):
+        """The name of the current journal file, or None for in-memory stores."""
+        if self.path is None:
+            return None
+        return f"{self.path}.{self._generation}.journal"
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self._index
+
+    def _name(self, player):
+        """Returns the name of a player given by name or by registry id."""
+        if self.registry is not None and isinstance(player, int):
+            return self.registry.name(player)
+        return player
+
+    def _slot(self, name):
+        """Returns the slot of a player, creating a new one if necessary."""
+        slot = self._index.get(name)
+        if slot is None:
+            if self.registry is not None:
+                name = self.registry.name(self.registry.id(name))
+            slot = len(self.names)
+            self._index[name] = slot
+            self.names.append(name)
+            self.wins.append(0)
+            self.losses.append(0)
+            self.draws.append(0)
+            self.ratings.append(DEFAULT_RATING)
+            self._ranking.insert((-DEFAULT_RATING, name, slot))
+        return slot
+
+    def _set_rating(self, slot, rating):
+        """Updates a rating and its entry in the sorted ranking."""
+        self._ranking.remove((-self.ratings[slot], self.names[slot], slot))
+        self.ratings[slot] = rating
+        self._ranking.insert((-rating, self.names[slot], slot))
+
+    def _apply(self, player1, player2, score):
+        """Updates the counters and ratings of both players for one game."""
+        slot1, slot2 = self._slot(player1), self._slot(player2)
+        if score == 1:
+            self.wins[slot1] += 1
+            self.losses[slot2] += 1
+        elif score == 0:
+            self.losses[slot1] += 1
+            self.wins[slot2] += 1
+        else:
+            self.draws[slot1] += 1
+            self.draws[slot2] += 1
+
+        rating1, rating2 = self.ratings[slot1], self.ratings[slot2]
+        change = self.k_factor * (score - expected_score(rating1, rating2))
+        self._set_rating(slot1, rating1 + change)
+        self._set_rating(slot2, rating2 - change)
+
+    def record_game(self, player1, player2, score):
+        """Records the result of a game.
+
+        Args:
+            player1 (str or int): The name of the first player (or their registry id)
+            player2 (str or int): The name of the second player (or their registry id)
+            score (float): 1 if player1 won, 0 if player2 won and 0.5 for a draw
+
+        Raises:
+            ValueError, if the score is invalid or both players are the same
+        """
+        if score not in (0, 0.5, 1):
+            raise ValueError("Score must be 0, 0.5 or 1.")
+        player1, player2 = self._name(player1), self._name(player2)
+        if player1 == player2:
+            raise ValueError("A player cannot play against themselves.")
+        self._apply(player1, player2, score)
+        if self.path is not None:
+            if self._journal is None:
+                self._journal = open(self.journal_path, "a")
+            if self.registry is not None:
+                entry = [self.registry.id(player1), self.registry.id(player2), score]
+            else:
+                entry = [player1, player2, score]
+            self._journal.write(json.dumps(entry) + "\n")
+            self._journal.flush()
+
+    def record_win(self, winner, loser):
+        """Records a game won by winner against loser."""
+        self.record_game(winner, loser, 1)
+
+    def record_draw(self, player1, player2):
+        """Records a drawn game between player1 and player2."""
+        self.record_game(player1, player2, 0.5)
+
+    def get(self, name):
+        """Returns the stats of a player.
+
+        Args:
+            name (str): The name of the player
+
+        Returns:
+            dict: With the keys "name", "wins", "losses", "draws", "games" and "rating"
+
+        Raises:
+            KeyError, if the player has not played yet
+        """
+        name = self._name(name)
+        slot = self._index[name]
+        wins, losses, draws = self.wins[slot], self.losses[slot], self.draws[slot]
+        return {"name": name, "wins": wins, "losses": losses, "draws": draws,
+                "games": wins + losses + draws, "rating": self.ratings[slot]}
+
+    def rating(self, name):
+        """Returns the rating of a player, or DEFAULT_RATING if they have not played yet."""
+        slot = self._index.get(self._name(name))
+        return DEFAULT_RATING if slot is None else self.ratings[slot]
+
+    def rank(self, name):
+        """Returns the rank (1 = highest rating) of a player.
+
+        Raises:
+            KeyError, if the player has not played yet
+        """
+        name = self._name(name)
+        slot = self._index[name]
+        return self._ranking.rank((-self.ratings[slot], name, slot)) + 1
+
+    def leaderboard(self, count=10):
+        """Returns the stats of the count highest rated players, best first."""
+        return [self.get(name) for (_, name, _) in itertools.islice(self._ranking, count)]
+
+    def load(self):
+        """Loads the snapshot and replays the journal, replacing the stats in memory."""
+        self.close()
+        self._reset()
+        if os.path.exists(self.path):
+            with open(self.path, "r") as f:
+                snapshot = json.load(f)
+            self._generation = snapshot["generation"]
+            for name, (wins, losses, draws, rating) in snapshot["players"].items():
+                slot = self._slot(name)
+                self.wins[slot], self.losses[slot], self.draws[slot] = wins, losses, draws
+                self._set_rating(slot, rating)
+
+        for player1, player2, score in read_journal(self.journal_path):
+            if isinstance(player1, int):
+                player1, player2 = self.registry.name(player1), self.registry.name(player2)
+            self._apply(player1, player2, score)
+
+    def save(self):
+        """Writes a snapshot of all stats and starts a new, empty journal.
+
+        The snapshot records the generation of the journal that belongs to it, so that a crash
+        between writing the snapshot and removing the old journal can't replay games twice.
+        """
+        if self.path is None:
+            raise ValueError("In-memory stats cannot be saved.")
+        old_journal = self.journal_path
+        self.close()
+        self._generation += 1
+
+        players = {name: [self.wins[slot], self.losses[slot], self.draws[slot], self.ratings[slot]]
+                   for name, slot in self._index.items()}
+        with atomic_write(self.path) as f:
+            json.dump({"generation": self._generation, "players": players}, f)
+        if os.path.exists(old_journal):
+            os.remove(old_journal)
+
+    def close(self):
+        """Closes the journal file."""
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
@@ -0,0 +1,229 @@
+import time
+
+import numpy as np
+
+class ThreatTracker:
+    """This class keeps track of the threats on a Board with the k-in-a-row rules, i.e. of all
+    segments of k cells (see Board.windows) that contain markers of only one player:
+
+        - A segment with k - 1 markers of a player is a "four" (on the five-in-a-row variants):
+          its empty cell wins immediately.
+        - A segment with k - 2 markers is a "three": one more marker turns it into a four.
+
+    For every segment, the number of X and O markers is stored. Moves are made through
+    self.place and self.remove, which forward them to the board and update only the few
+    segments through the changed cell, so the threats are always available without scanning
+    the board.
+    """
+
+    def __init__(self, board):
+        """Initializes the tracker from the markers already on board.
+
+        Args:
+            board (Board): The board to track. Further moves must be made through the tracker.
+        """
+        self.board = board
+        self.k = board.k
+        self.windows = board.windows()
+        self._through = board.windows_through()
+        flat = board.grid.ravel()
+        self.counts = {"X": (flat == "X")[self.windows].sum(axis=1),
+                       "O": (flat == "O")[self.windows].sum(axis=1)}
+        self.empty = flat == ""
+
+    def place(self, position, marker):
+        """Places a marker on the board (see Board.place) and updates the threats."""
+        self.board.place(position, marker)
+        self.counts[marker][self._through[position - 1]] += 1
+        self.empty[position - 1] = False
+
+    def remove(self, position, last_move=0):
+        """Takes back a marker (see Board.remove) and updates the threats."""
+        marker = self.board.grid.flat[position - 1]
+        self.board.remove(position, last_move)
+        self.counts[marker][self._through[position - 1]] -= 1
+        self.empty[position - 1] = True
+
+    def _cells(self, marker, markers):
+        """Returns the empty positions in segments holding exactly markers of marker and none
+        of the opponent's. Positions lying in more such segments come first."""
+        other = "O" if marker == "X" else "X"
+        open_windows = self.windows[(self.counts[marker] == markers) & (self.counts[other] == 0)]
+        cells, counts = np.unique(open_windows, return_counts=True)
+        empty = self.empty[cells]
+        cells, counts = cells[empty], counts[empty]
+        return [int(cell) + 1 for cell in cells[np.argsort(-counts, kind="stable")]]
+
+    def winning_moves(self, marker):
+        """Returns the positions where marker would complete k in a row."""
+        return self._cells(marker, self.k - 1)
+
+    def four_moves(self, marker):
+        """Returns the positions where marker would create a four (k - 1 in a segment)."""
+        return self._cells(marker, self.k - 2)
+
+    def three_moves(self, marker):
+        """Returns the positions where marker would create a three (k - 2 in a segment)."""
+        return self._cells(marker, self.k - 3) if self.k >= 3 else []
+
+    def threat_counts(self, marker):
+        """Returns the number of fours and threes of marker that the opponent hasn't blocked.
+
+        Returns:
+            dict: With the keys "fours" and "threes", counting segments
+        """
+        other = "O" if marker == "X" else "X"
+        unblocked = self.counts[other] == 0
+        return {"fours": int(np.count_nonzero(unblocked & (self.counts[marker] == self.k - 1))),
+                "threes": int(np.count_nonzero(unblocked & (self.counts[marker] == self.k - 2)))}
+
+class _Timeout(Exception):
+    """Raised inside a threat search when the deadline has passed."""
+
+class ThreatSearch:
+    """This class looks for forced wins on the k-in-a-row variants (made for five in a row).
+    Instead of all moves, it only looks at threats, which keeps the tree tiny:
+
+        - find_vcf searches a victory by continuous fours: every attacking move creates a four,
+          so the defender's reply is forced (they have to block the empty cell), until the
+          attacker has two fours at once or completes a line.
+        - find_vct searches a victory by continuous threats: attacking moves may also create a
+          three that would win by VCF if ignored. Then every move that touches the threatened
+          segments, as well as every four of the defender, is tried as a defence.
+
+    The attacker is the player to move. Both searches stop at a deadline and return None if
+    no forced win was found in time.
+    """
+
+    def __init__(self, board):
+        """Initializes the search for the given board.
+
+        Args:
+            board (Board): The current position. It is modified during the search, but
+                           restored afterwards.
+        """
+        self.tracker = ThreatTracker(board)
+        self.nodes = 0
+        self._deadline = float("inf")
+
+    def _tick(self):
+        self.nodes += 1
+        if self.nodes & 255 == 0 and time.monotonic() > self._deadline:
+            raise _Timeout()
+
+    def find_vcf(self, marker, max_depth=30, time_limit=None):
+        """Searches a victory by continuous fours for marker.
+
+        Args:
+            marker (str): The marker of the attacker, who is to move
+            max_depth (int): The maximum number of attacking moves
+            time_limit (float): The time limit in seconds (default: no limit)
+
+        Returns:
+            list: The attacking moves of a forced win (the first one is to be played now), or
+                  None if none was found
+        """
+        self._deadline = time.monotonic() + time_limit if time_limit is not None else float("inf")
+        try:
+            return self._vcf(marker, max_depth)
+        except _Timeout:
+            return None
+
+    def find_vct(self, marker, max_depth=4, time_limit=None):
+        """Searches a victory by continuous threats (fours and threes) for marker.
+
+        Args:
+            marker (str): The marker of the attacker, who is to move
+            max_depth (int): The maximum number of attacking threes
+            time_limit (float): The time limit in seconds (default: no limit)
+
+        Returns:
+            list: The attacking moves of the main line of a forced win (the first one is to be
+                  played now), or None if none was found
+        """
+        self._deadline = time.monotonic() + time_limit if time_limit is not None else float("inf")
+        try:
+            return self._vct(marker, max_depth)
+        except _Timeout:
+            return None
+
+    def _vcf(self, marker, depth):
+        """Recursive part of find_vcf."""
+        tracker = self.tracker
+        self._tick()
+        wins = tracker.winning_moves(marker)
+        if wins:
+            return [wins[0]]
+        other = "O" if marker == "X" else "X"
+        opponent_wins = tracker.winning_moves(other)
+        if depth == 0 or len(opponent_wins) > 1:
+            return None
+
+        candidates = tracker.four_moves(marker)
+        if opponent_wins:
+            # The opponent threatens to win, so only blocking moves can keep the initiative
+            candidates = [move for move in candidates if move == opponent_wins[0]]
+
+        board = tracker.board
+        for move in candidates:
+            previous = board.last_move
+            tracker.place(move, marker)
+            try:
+                threats = tracker.winning_moves(marker)
+                if len(threats) >= 2 and not tracker.winning_moves(other):
+                    return [move, threats[0]]
+                if len(threats) == 1 and not tracker.winning_moves(other):
+                    reply = threats[0]
+                    tracker.place(reply, other)
+                    try:
+                        line = None if board.check_win() else self._vcf(marker, depth - 1)
+                    finally:
+                        tracker.remove(reply, move)
+                    if line is not None:
+                        return [move] + line
+            finally:
+                tracker.remove(move, previous)
+        return None
+
+    def _defences(self, marker):
+        """Returns the defender's candidate replies to a threat of marker."""
+        tracker = self.tracker
+        other = "O" if marker == "X" else "X"
+        threatened = tracker.windows[(tracker.counts[marker] >= tracker.k - 2) & (tracker.counts[other] == 0)]
+        cells = np.unique(threatened)
+        defences = {int(cell) + 1 for cell in cells[tracker.empty[cells]]}
+        defences.update(tracker.four_moves(other))
+        return sorted(defences)
+
+    def _vct(self, marker, depth):
+        """Recursive part of find_vct."""
+        line = self._vcf(marker, 30)
+        if line is not None or depth == 0:
+            return line
+
+        tracker = self.tracker
+        board = tracker.board
+        other = "O" if marker == "X" else "X"
+        if tracker.winning_moves(other):
+            return None
+
+        for move in tracker.three_moves(marker):
+            previous = board.last_move
+            tracker.place(move, marker)
+            try:
+                # Only real threats: ignoring them must lose to a VCF
+                if tracker.winning_moves(other) or self._vcf(marker, 30) is None:
+                    continue
+                for defence in self._defences(marker):
+                    tracker.place(defence, other)
+                    try:
+                        refuted = board.check_win() or self._vct(marker, depth - 1) is None
+                    finally:
+                        tracker.remove(defence, move)
+                    if refuted:
+                        break
+                else:
+                    return [move]
+            finally:
+                tracker.remove(move, previous)
+        return None
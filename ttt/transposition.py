@@ -0,0 +1,157 @@
+import numpy as np
+
+from ttt.shared import load_arrays, save_arrays
+
+# Bounds stored with a value. EMPTY marks unused slots.
+
+EMPTY = 0
+EXACT = 1
+LOWER = 2
+UPPER = 3
+
+# One slot of the table: 14 bytes without padding
+SLOT_DTYPE = np.dtype([("key", np.uint64), ("value", np.int16), ("depth", np.uint8),
+                       ("bound", np.uint8), ("move", np.uint16)])
+
+# Helper functions
+
+def zobrist_keys(cells, seed=0):
+    """Function that creates random Zobrist keys for hashing positions. The hash of a position
+    is the XOR of keys[p - 1, 0] for every position p holding an X and keys[p - 1, 1] for
+    every position holding an O, which can be updated with a single XOR per move.
+
+    Args:
+        cells (int): The number of cells of the board
+        seed (int): The random seed. Tables saved to disk are only valid for the same keys.
+
+    Returns:
+        np.ndarray: Array of shape (cells, 2) of random uint64 keys
+    """
+    rng = np.random.default_rng(seed)
+    return rng.integers(1, 2 ** 64, size=(cells, 2), dtype=np.uint64)
+
+def board_hash(board, keys):
+    """Function that computes the Zobrist hash of a Board from scratch.
+
+    Args:
+        board (Board): The board to hash
+        keys (np.ndarray): The keys returned by zobrist_keys
+
+    Returns:
+        int: The hash of the position
+    """
+    flat = board.grid.ravel()
+    return int(np.bitwise_xor.reduce(keys[flat == "X", 0], initial=np.uint64(0))
+               ^ np.bitwise_xor.reduce(keys[flat == "O", 1], initial=np.uint64(0)))
+
+class TranspositionTable:
+    """This class stores search results (value, bound, depth and best move) for positions
+    identified by a 64 bit hash, in a fixed number of slots:
+
+        - Each position maps to one slot (hash modulo the number of slots), so the table never
+          grows beyond the size it was created with.
+        - When two positions compete for a slot, the result of the deeper search is kept
+          (depth-preferred replacement), since it is the more expensive one to recompute.
+          Results for the same position always replace older ones.
+
+    The slots are a single numpy array of SLOT_DTYPE, so a table can be saved to disk and
+    loaded or memory-mapped by new processes, which then start with a hot cache.
+    """
+
+    def __init__(self, size=1 << 20, slots=None):
+        """Initializes an empty table.
+
+        Args:
+            size (int): The number of slots
+            slots (np.ndarray): Existing slots to use instead of allocating new ones
+        """
+        if slots is None:
+            if size < 1:
+                raise ValueError("Size must be positive.")
+            slots = np.zeros(size, dtype=SLOT_DTYPE)
+        self.slots = slots
+        self.size = len(slots)
+        self.hits = 0
+        self.probes = 0
+
+    @classmethod
+    def from_memory(cls, max_bytes):
+        """Creates the largest table that fits into max_bytes.
+
+        Args:
+            max_bytes (int): The memory cap in bytes
+
+        Returns:
+            TranspositionTable: The empty table
+        """
+        return cls(max(int(max_bytes) // SLOT_DTYPE.itemsize, 1))
+
+    @property
+    def nbytes(self):
+        """The number of bytes used by the slots."""
+        return self.slots.nbytes
+
+    def __len__(self):
+        """Returns the number of used slots."""
+        return int(np.count_nonzero(self.slots["bound"]))
+
+    def clear(self):
+        """Empties all slots."""
+        self.slots[...] = 0
+
+    def store(self, key, depth, value, bound, move=0):
+        """Stores a search result, unless the slot holds a deeper result for another position.
+
+        Args:
+            key (int): The 64 bit hash of the position
+            depth (int): The remaining search depth the result was computed with (0-255)
+            value (int): The value of the position (fits into int16)
+            bound (int): EXACT, LOWER (value is a lower bound) or UPPER (an upper bound)
+            move (int): The best move found, or 0
+        """
+        slot = self.slots[key % self.size]
+        if slot["bound"] != EMPTY and slot["key"] != key and slot["depth"] > depth:
+            return
+        self.slots[key % self.size] = (key, value, depth, bound, move)
+
+    def probe(self, key):
+        """Looks up the result stored for a position.
+
+        Args:
+            key (int): The 64 bit hash of the position
+
+        Returns:
+            (value, depth, bound, move) (tuple): The stored result, or None if the position is
+                                                 not in the table
+        """
+        self.probes += 1
+        slot = self.slots[key % self.size]
+        if slot["bound"] == EMPTY or slot["key"] != key:
+            return None
+        self.hits += 1
+        return int(slot["value"]), int(slot["depth"]), int(slot["bound"]), int(slot["move"])
+
+    def save(self, path):
+        """Writes the table to a file that can be read by TranspositionTable.load.
+
+        Args:
+            path (str): The name of the file
+        """
+        save_arrays(path, {"slots": self.slots})
+
+    @classmethod
+    def load(cls, path, mmap=False):
+        """Loads a table written by self.save.
+
+        Args:
+            path (str): The name of the file
+            mmap (bool): If True, the slots are memory-mapped copy-on-write instead of read
+                         into memory. Startup is then nearly free, the pages are shared with
+                         other processes mapping the same file, and only slots this process
+                         overwrites get private copies. Changes are never written back.
+
+        Returns:
+            TranspositionTable: The table
+        """
+        slots = load_arrays(path, mode="c" if mmap else "r")["slots"]
+        return cls(slots=slots if mmap else np.array(slots))
@@ -0,0 +1,240 @@
+import math
+import random
+import time
+
+import numpy as np
+
+from ttt.board import FULL_MASK, is_winning_mask
+
+# Ultimate tic-tac-toe is played on nine small 3 by 3 boards arranged like the cells of a
+# 3 by 3 meta-board. Small board b (0 to 8) and its cells c (0 to 8) are numbered like the
+# positions of a Board minus one, and position 9 * b + c + 1 (1 to 81) is cell c of board b.
+# Playing in cell c sends the opponent to board c, unless that board is already decided, in
+# which case they may play on any board that isn't. Winning a small board claims its cell of
+# the meta-board, and three claimed cells in a row win the game.
+
+# Lookup tables over all 9 bit masks: whether a mask contains a win (see ttt.board.WIN_MASKS)
+# and which cells are set
+WINS = tuple(is_winning_mask(bits) for bits in range(FULL_MASK + 1))
+CELLS = tuple(tuple(cell for cell in range(9) if bits >> cell & 1) for bits in range(FULL_MASK + 1))
+ANY_BOARD = -1
+
+class UltimateBoard:
+    """This class is the board of Ultimate tic-tac-toe (see the comment at the top of this
+    module). Each small board is stored as two 9 bit masks, one per player. The results of the
+    small boards are cached in three 9 bit masks of the meta-board (won by X, won by O, and
+    decided, i.e. won or full), so checking for a win of the whole game is a single lookup.
+
+    Legal moves are computed with mask operations: the free cells of a small board are the
+    cells set in neither mask, and the boards the player may choose from are the ones not set
+    in the decided mask. The board has the methods Game needs (place, check_win, check_full,
+    grid, last_move), and an UltimateMCTS can play on it as the policy of an AIPlayer.
+    """
+
+    def __init__(self):
+        """Initializes an empty board."""
+        self.size = 9
+        self.bits = {"X": [0] * 9, "O": [0] * 9}
+        self.meta = {"X": 0, "O": 0}
+        self.decided = 0
+        self.next_board = ANY_BOARD
+        self.last_move = 0
+        self.last_marker = ""
+
+    def copy(self):
+        """Returns an independent copy of the board, e.g. for a playout."""
+        board = UltimateBoard.__new__(UltimateBoard)
+        board.size = 9
+        board.bits = {"X": self.bits["X"][:], "O": self.bits["O"][:]}
+        board.meta = dict(self.meta)
+        board.decided = self.decided
+        board.next_board = self.next_board
+        board.last_move = self.last_move
+        board.last_marker = self.last_marker
+        return board
+
+    @property
+    def grid(self):
+        """The markers as a 9 by 9 array, laid out like the boards on the meta-board."""
+        grid = np.empty((9, 9), dtype=str)
+        for marker in "XO":
+            for board, bits in enumerate(self.bits[marker]):
+                for cell in CELLS[bits]:
+                    grid[3 * (board // 3) + cell // 3, 3 * (board % 3) + cell % 3] = marker
+        return grid
+
+    def __str__(self):
+        """Shows the 9 by 9 grid with the small boards separated by double lines."""
+        lines = []
+        for row, cells in enumerate(self.grid):
+            if row and row % 3 == 0:
+                lines.append("=" * 29)
+            lines.append(" || ".join(" ".join(cell or "." for cell in cells[i:i + 3]).center(7)
+                                     for i in range(0, 9, 3)))
+        return "\n".join(lines)
+
+    def legal_boards(self):
+        """Returns the 9 bit mask of the small boards the player to move may play on."""
+        if self.next_board != ANY_BOARD:
+            return 1 << self.next_board
+        return ~self.decided & FULL_MASK
+
+    def free_cells(self, board):
+        """Returns the 9 bit mask of the free cells of a small board."""
+        return ~(self.bits["X"][board] | self.bits["O"][board]) & FULL_MASK
+
+    def legal_moves(self):
+        """Returns the positions (1-81) the player to move may play, in increasing order."""
+        if WINS[self.meta["X"]] or WINS[self.meta["O"]]:
+            return []
+        return [9 * board + cell + 1 for board in CELLS[self.legal_boards()]
+                for cell in CELLS[self.free_cells(board)]]
+
+    def is_valid(self, position):
+        """Checks whether a move follows the rules.
+
+        Raises:
+            ValueError, if the position is not between 1 and 81, is occupied, or is on a board
+            the player may not play on
+        """
+        if not (1 <= position <= 81):
+            raise ValueError("Position must be an integer between 1 and 81.")
+        board, cell = divmod(position - 1, 9)
+        if not self.free_cells(board) >> cell & 1:
+            raise ValueError("Position already occupied.")
+        if not self.legal_boards() >> board & 1:
+            raise ValueError(f"Moves must be played on board {self.next_board + 1}.")
+
+    def place(self, position, marker):
+        """Places a marker, updates the meta-board and sends the opponent to their next board.
+
+        Args:
+            position (int): The position (1-81) to play
+            marker (str): The marker (X or O) to place
+        """
+        self.is_valid(position)
+        self._play(position - 1, marker)
+
+    def _play(self, index, marker):
+        """Plays a legal move given as 0-based index."""
+        board, cell = divmod(index, 9)
+        bits = self.bits[marker][board] | 1 << cell
+        self.bits[marker][board] = bits
+        if WINS[bits]:
+            self.meta[marker] |= 1 << board
+            self.decided |= 1 << board
+        elif not self.free_cells(board):
+            self.decided |= 1 << board
+        self.next_board = ANY_BOARD if self.decided >> cell & 1 else cell
+        self.last_move = index + 1
+        self.last_marker = marker
+
+    def check_win(self):
+        """Returns whether the player who moved last has won three small boards in a row."""
+        return bool(self.last_marker) and WINS[self.meta[self.last_marker]]
+
+    def check_full(self):
+        """Returns whether every small board is decided, so no move is left."""
+        return self.decided == FULL_MASK
+
+    def playout(self, marker, rng=random):
+        """Plays random moves (a random legal board, then a random free cell on it) until the
+        game ends, modifying this board.
+
+        Args:
+            marker (str): The marker of the player to move
+            rng (random.Random): The random number generator
+
+        Returns:
+            str: The marker of the winner, or "" for a draw
+        """
+        meta = self.meta
+        if self.check_win():
+            return self.last_marker
+        while self.decided != FULL_MASK:
+            boards = CELLS[self.legal_boards()]
+            board = boards[0] if len(boards) == 1 else rng.choice(boards)
+            cell = rng.choice(CELLS[self.free_cells(board)])
+            self._play(9 * board + cell, marker)
+            if WINS[meta[marker]]:
+                return marker
+            marker = "O" if marker == "X" else "X"
+        return ""
+
+class _Node:
+    """A node of the UltimateMCTS search tree."""
+
+    __slots__ = ("move", "parent", "children", "untried", "visits", "wins")
+
+    def __init__(self, move, parent, untried):
+        self.move = move
+        self.parent = parent
+        self.children = []
+        self.untried = untried
+        self.visits = 0
+        self.wins = 0.0
+
+class UltimateMCTS:
+    """This class chooses moves on an UltimateBoard with Monte Carlo tree search (UCT): the
+    tree is grown one node per iteration along the moves with the best upper confidence bound,
+    and each new node is scored with a random playout (see UltimateBoard.playout). It can be
+    used as the policy of a ttt.player.AIPlayer.
+    """
+
+    def __init__(self, playouts=2000, time_limit=None, exploration=1.4, seed=None):
+        """Initializes the search.
+
+        Args:
+            playouts (int): The number of playouts per move
+            time_limit (float): Optional time limit per move in seconds
+            exploration (float): The exploration constant of UCT
+            seed (int): The random seed
+        """
+        self.playouts = playouts
+        self.time_limit = time_limit
+        self.exploration = exploration
+        self.rng = random.Random(seed)
+        self.playouts_per_second = 0.0
+
+    def __call__(self, board):
+        """Returns the move with the most visits after the search, a random legal move if no
+        playout finished in time, or 0 if there is no legal move (like AlphaBetaSearch)."""
+        start = time.monotonic()
+        deadline = start + self.time_limit if self.time_limit is not None else math.inf
+        marker = "O" if board.last_marker == "X" else "X"
+        root = _Node(0, None, board.legal_moves())
+        if len(root.untried) <= 1:
+            return root.untried[0] if root.untried else 0
+
+        count = 0
+        while count < self.playouts and time.monotonic() < deadline:
+            node, state, to_move = root, board.copy(), marker
+            # Selection: the score of a child is from the view of the player who made its move
+            while not node.untried and node.children:
+                log_visits = math.log(node.visits)
+                node = max(node.children, key=lambda child: child.wins / child.visits
+                           + self.exploration * math.sqrt(log_visits / child.visits))
+                state._play(node.move - 1, to_move)
+                to_move = "O" if to_move == "X" else "X"
+            # Expansion
+            if node.untried and not state.check_win():
+                move = node.untried.pop(self.rng.randrange(len(node.untried)))
+                state._play(move - 1, to_move)
+                to_move = "O" if to_move == "X" else "X"
+                child = _Node(move, node, state.legal_moves())
+                node.children.append(child)
+                node = child
+            # Simulation and backpropagation
+            winner = state.playout(to_move, self.rng)
+            mover = "O" if to_move == "X" else "X"  # Made the move leading to node
+            while node is not None:
+                node.visits += 1
+                node.wins += 1.0 if winner == mover else (0.5 if not winner else 0.0)
+                mover = "O" if mover == "X" else "X"
+                node = node.parent
+            count += 1
+
+        self.playouts_per_second = count / max(time.monotonic() - start, 1e-9)
+        if not root.children:
+            return self.rng.choice(root.untried)
+        return max(root.children, key=lambda child: child.visits).move